@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('images', 'images'), ('music', 'music')],
+    datas=[('images', 'images'), ('music', 'music'), ('tts_cache', 'tts_cache')],
     hiddenimports=['numpy', 'OpenGL'],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,193 @@
+# autosave.py
+"""
+Autosave without blocking the GUI.
+
+GameWindow hands over small, already encoded pieces of state: journal records for moves,
+changed rooms and the character, or a copy of the state for a full snapshot.  Taking them is
+cheap and leaves nothing shared with the game, so a background thread can encode the
+snapshot (the message history above all), write to the SaveGame and fsync at its own pace.  Changes are debounced: the writer waits until
+the player pauses (or max_delay passes) and writes one batch, in which repeated moves and
+character updates collapse into the latest one.
+"""
+
+import threading
+import time
+
+from game_log import get_logger
+from instrumentation import count
+from save_format import (
+    capture_state, character_record, encode_captured, mission_record, move_record, rng_record, room_record
+)
+
+DEBOUNCE_SECONDS = 0.5  # Quiet time after the last change before a batch is written
+MAX_DELAY_SECONDS = 3.0  # A batch is written after this long even if the player keeps moving
+CLOSE_TIMEOUT_SECONDS = 5.0
+
+logger = get_logger(__name__)
+
+
+class AutosaveService:
+    """Debounced background writer for a save_format.SaveGame."""
+
+    def __init__(self, save_game, debounce=DEBOUNCE_SECONDS, max_delay=MAX_DELAY_SECONDS):
+        self.save_game = save_game
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.snapshot_wanted = not save_game.has_snapshot()
+        self.batches = 0
+        self.snapshots = 0
+        self.errors = 0
+        self.last_error = None
+        self.last_latency = None
+        self.max_latency = 0.0
+        self._snapshot = None  # capture_state() of a full snapshot waiting to be written
+        self._latest = {}  # Record kind -> the newest record of that kind ("move", ...)
+        self._rooms = []  # Changed-room records, all kept and in order
+        self._first_change = None
+        self._last_change = None
+        self._writing = False
+        self._flush_requested = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def snapshot(self, character, game_map=None, mission=None, history=None, rng_state=None):
+        """Queue a full snapshot; whatever was queued before it is already part of it.
+
+        Only copies are taken here (see save_format.capture_state); the writer thread encodes them.
+        """
+        state = capture_state(character, game_map, mission, history, rng_state)
+        with self._condition:
+            self._snapshot = state
+            self._latest.clear()
+            self._rooms.clear()
+            self.snapshot_wanted = False
+            self._changed()
+
+    def moved(self, game_map):
+        self._queue_latest("move", move_record(game_map))
+
+    def room_changed(self, x, y, room):
+        record = room_record(x, y, room)
+        with self._condition:
+            self._rooms.append(record)
+            self._changed()
+
+    def character_changed(self, character):
+        self._queue_latest("character", character_record(character))
+
+    def mission_changed(self, mission):
+        self._queue_latest("mission", mission_record(mission))
+
+    def rng_changed(self, rng_counters):
+        self._queue_latest("rng", rng_record(rng_counters))
+
+    def _queue_latest(self, kind, record):
+        with self._condition:
+            self._latest[kind] = record
+            self._changed()
+
+    def _changed(self):
+        now = time.monotonic()
+        if self._first_change is None:
+            self._first_change = now
+        self._last_change = now
+        self._condition.notify()
+
+    def queue_depth(self):
+        """Records (and snapshots) waiting to be written."""
+        with self._condition:
+            return len(self._latest) + len(self._rooms) + (self._snapshot is not None)
+
+    def status(self):
+        """Latency in ms from the oldest queued change to its fsync, queue depth and counters."""
+        with self._condition:
+            return {
+                "queue_depth": len(self._latest) + len(self._rooms) + (self._snapshot is not None),
+                "writing": self._writing,
+                "last_latency_ms": None if self.last_latency is None else self.last_latency * 1000,
+                "max_latency_ms": self.max_latency * 1000,
+                "batches": self.batches,
+                "snapshots": self.snapshots,
+                "errors": self.errors,
+                "last_error": self.last_error,
+            }
+
+    def flush(self, timeout=None):
+        """Write what is queued now instead of waiting out the debounce; True once written."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            try:
+                while self._first_change is not None or self._writing:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self._flush_requested = False
+        return True
+
+    def close(self, timeout=CLOSE_TIMEOUT_SECONDS):
+        """Write what is still queued and stop the writer thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        self.save_game.close()
+
+    def _next_batch(self):
+        """Wait for changes and the end of the debounce; None once closed with nothing left."""
+        with self._condition:
+            while self._first_change is None and not self._closed:
+                self._condition.wait()
+            while self._first_change is not None and not (self._closed or self._flush_requested):
+                now = time.monotonic()
+                remaining = min(self._last_change + self.debounce, self._first_change + self.max_delay) - now
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            if self._first_change is None:
+                return None
+            batch = (self._snapshot, self._rooms + list(self._latest.values()), self._first_change)
+            self._snapshot = None
+            self._latest = {}
+            self._rooms = []
+            self._first_change = self._last_change = None
+            self._writing = True
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                break
+            state, records, queued_at = batch
+            try:
+                self._write(state, records)
+            except Exception as e:
+                logger.error("Autosave failed: %s", e)
+                with self._condition:
+                    self.errors += 1
+                    self.last_error = str(e)
+            with self._condition:
+                self._writing = False
+                self.last_latency = time.monotonic() - queued_at
+                self.max_latency = max(self.max_latency, self.last_latency)
+                self._condition.notify_all()
+
+    def _write(self, state, records):
+        if state is not None:
+            self.save_game.write_sections(encode_captured(state))
+            self.snapshots += 1
+            count("autosave.snapshots")
+        if records and self.save_game.has_snapshot():  # Without a snapshot there is nothing to extend
+            for record in records:
+                self.save_game.append(record)
+            self.save_game.sync()
+        self.batches += 1
+        count("autosave.batches")
+        if self.save_game.needs_compaction():
+            self.snapshot_wanted = True  # The next change from GameWindow brings a full snapshot
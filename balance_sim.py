@@ -0,0 +1,181 @@
+# balance_sim.py
+"""
+Monte Carlo balance simulator.
+
+Runs large numbers of seeded missions across a process pool and reduces them into
+survival rate, XP per hour and damage-taken distributions for every mission type and
+skill profile.  Work is cut into fixed-size shards whose seeds come from one master seed,
+so a run gives the same numbers no matter how many workers execute it.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import game_log
+from events import event_data
+from headless import MISSION_TYPES, new_character, run_mission
+from mission_bot import Mission
+from rng import seed as seed_streams, seed_for
+
+# Rough wall-clock time a player spends per move, used to turn turns into XP/hour
+SECONDS_PER_TURN = 20
+SHARD_SIZE = 2000
+DAMAGE_BUCKET = 5
+
+SKILL_PROFILES = {
+    "weak": {"Strength": 5, "Agility": 5, "Intelligence": 5},
+    "average": {"Strength": 10, "Agility": 10, "Intelligence": 10},
+    "strong": {"Strength": 15, "Agility": 15, "Intelligence": 15},
+    "brawler": {"Strength": 15, "Agility": 8, "Intelligence": 5},
+    "scholar": {"Strength": 5, "Agility": 8, "Intelligence": 15},
+}
+
+
+def shard_seeds(master_seed, count):
+    """Derive count independent 64-bit shard seeds from the master seed."""
+    return [seed_for(master_seed, "shard", index) for index in range(count)]
+
+
+def run_grid_mission(player_character, mission_type):
+    """Play a mission_bot.Mission grid to its objective (or the character's death)."""
+    mission = Mission(mission_type)
+    start_health = player_character.health
+    start_xp = player_character.xp
+    turns = 0
+    while not mission.completed and player_character.health > 0:
+        x, _ = mission.current_position
+        direction = "Move East" if x < mission.objective_position[0] else "Move South"
+        mission.perform_turn(direction, player_character)
+        turns += 1
+    return {
+        "mission_type": mission_type,
+        "completed": mission.completed,
+        "died": player_character.health <= 0,
+        "turns": turns,
+        "xp_gained": player_character.xp - start_xp,
+        "damage_taken": max(start_health - player_character.health, 0),
+    }
+
+
+def empty_stats():
+    return {"missions": 0, "survived": 0, "completed": 0, "xp": 0, "turns": 0, "damage": {}}
+
+
+def merge_stats(total, part):
+    """Fold one shard's stats into a running total."""
+    for key in ["missions", "survived", "completed", "xp", "turns"]:
+        total[key] += part[key]
+    for bucket, count in part["damage"].items():
+        total["damage"][bucket] = total["damage"].get(bucket, 0) + count
+    return total
+
+
+def run_shard(shard):
+    """Worker entry point: run one shard of missions and return its aggregated stats."""
+    seed, mission_type, skills, count, engine, overrides = shard
+    saved = {room: dict(event_data[room]) for room in overrides}
+    for room, changes in overrides.items():
+        event_data[room].update(changes)
+
+    seed_streams(seed)  # Each shard gets its own set of streams
+    try:
+        with game_log.quiet():
+            stats = run_missions_for_shard(mission_type, skills, count, engine)
+        return stats
+    finally:
+        for room, values in saved.items():
+            event_data[room].clear()
+            event_data[room].update(values)
+
+
+def run_missions_for_shard(mission_type, skills, count, engine):
+    """Play count missions and fold them into one stats dict."""
+    stats = empty_stats()
+    for _ in range(count):
+        player_character = new_character(skills=skills)
+        if engine == "grid":
+            result = run_grid_mission(player_character, mission_type)
+        else:
+            result = run_mission(player_character, mission_type, quiet=False)
+        stats["missions"] += 1
+        stats["survived"] += not result["died"]
+        stats["completed"] += result["completed"]
+        stats["xp"] += result["xp_gained"]
+        stats["turns"] += result["turns"]
+        bucket = result["damage_taken"] // DAMAGE_BUCKET * DAMAGE_BUCKET
+        stats["damage"][bucket] = stats["damage"].get(bucket, 0) + 1
+    return stats
+
+
+def damage_percentile(damage, fraction):
+    """Read a percentile (bucket lower bound) off a damage histogram."""
+    total = sum(damage.values())
+    seen = 0
+    for bucket in sorted(damage):
+        seen += damage[bucket]
+        if seen >= total * fraction:
+            return bucket
+    return 0
+
+
+def summarize(stats):
+    missions = stats["missions"] or 1
+    hours = stats["turns"] * SECONDS_PER_TURN / 3600
+    return {
+        "missions": stats["missions"],
+        "survival_rate": stats["survived"] / missions,
+        "completion_rate": stats["completed"] / missions,
+        "xp_per_hour": stats["xp"] / hours if hours else 0.0,
+        "damage_histogram": dict(sorted(stats["damage"].items())),
+        "damage_p50": damage_percentile(stats["damage"], 0.5),
+        "damage_p95": damage_percentile(stats["damage"], 0.95),
+    }
+
+
+def simulate(missions_per_cell, master_seed=0, mission_types=None, profiles=None,
+             engine="map", overrides=None, workers=None, shard_size=SHARD_SIZE):
+    """
+    Simulate missions_per_cell missions for every (mission type, skill profile) pair.
+    overrides maps a room type to event_data changes, e.g. {"Enemy": {"difficulty": 14}}.
+    Returns {(mission_type, profile_name): summary dict}.
+    """
+    mission_types = mission_types or MISSION_TYPES
+    profiles = profiles or SKILL_PROFILES
+    overrides = overrides or {}
+
+    cells = [(mission_type, name) for mission_type in mission_types for name in profiles]
+    shards = []
+    owners = []
+    for cell in cells:
+        remaining = missions_per_cell
+        while remaining > 0:
+            count = min(shard_size, remaining)
+            shards.append([None, cell[0], profiles[cell[1]], count, engine, overrides])
+            owners.append(cell)
+            remaining -= count
+    for shard, seed in zip(shards, shard_seeds(master_seed, len(shards))):
+        shard[0] = seed
+
+    totals = {cell: empty_stats() for cell in cells}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        for cell, stats in zip(owners, executor.map(run_shard, [tuple(shard) for shard in shards])):
+            merge_stats(totals[cell], stats)
+    return {cell: summarize(stats) for cell, stats in totals.items()}
+
+
+def main(missions_per_cell=10000, master_seed=0):
+    start = time.perf_counter()
+    report = simulate(missions_per_cell, master_seed)
+    elapsed = time.perf_counter() - start
+    total = missions_per_cell * len(report)
+    print(f"Simulated {total} missions in {elapsed:.2f}s ({total / elapsed:.0f} missions/s)")
+    for (mission_type, profile), summary in report.items():
+        print(f"{mission_type:12} {profile:8} survival {summary['survival_rate']:6.1%}  "
+              f"completed {summary['completion_rate']:6.1%}  XP/h {summary['xp_per_hour']:7.1f}  "
+              f"damage p50 {summary['damage_p50']:3}  p95 {summary['damage_p95']:3}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
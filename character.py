@@ -1,22 +1,140 @@
 # character.py
 
+from game_log import get_logger
+from inventory import SELL_PRICE_FACTOR, Inventory, item_effect, item_price
+
+logger = get_logger(__name__)
+
+
+DEFAULT_SKILLS = {"Strength": 10, "Agility": 8, "Intelligence": 8}
+DEFAULT_ITEMS = ["Basic Sword", "Health Potion"]
+
+
+def watched(field):
+    """A field kept in the slot "_<field>" whose listeners are told every time it is assigned."""
+    slot = "_" + field
+
+    def get(self):
+        return getattr(self, slot)
+
+    def set(self, value):
+        setattr(self, slot, value)
+        self.notify(field)
+
+    return property(get, set)
+
+
 class Character:
-    def __init__(self, name, species):
-        self.name = name
-        self.species = species
-        self.health = 100
-        self.energy = 100
-        self.level = 1
-        self.xp = 0
-        self.skill_points = 0  # Points earned for leveling up that can be used to improve skills
-        self.skills = {"Strength": 10, "Agility": 8, "Intelligence": 8}
-        self.items = ["Basic Sword", "Health Potion"]
-        self.gold = 50  # Currency the player can use for trading
+    """
+    The one character model used by the UI, the events and the simulations.
+    Attributes are fixed by __slots__, so an instance carries no __dict__ and the game's hot
+    paths use plain attribute access.  Code written for the old dict-shaped character
+    (character['health'], character.get('xp', 0)) keeps working through the mapping methods.
+    Listeners added with subscribe() hear about changes to the fields the character sheet
+    shows (WATCHED_FIELDS); the other fields are plain slots that cost nothing extra to set.
+    """
+
+    FIELDS = ("name", "species", "health", "energy", "level", "xp", "skill_points",
+              "skills", "items", "gold")
+    WATCHED_FIELDS = ("name", "species", "health", "skills", "items")
+    # Watched fields live in "_<field>" slots behind properties
+    __slots__ = ("energy", "level", "xp", "skill_points", "gold",
+                 "_name", "_species", "_health", "_skills", "_items", "listeners")
+
+    name = watched("name")
+    species = watched("species")
+    health = watched("health")
+    skills = watched("skills")
+
+    def __init__(self, name, species, health=100, energy=100, level=1, xp=0, skill_points=0,
+                 skills=None, items=None, gold=50):
+        self.listeners = []
+        self.name = str(name)
+        self.species = str(species)
+        self.health = int(health)
+        self.energy = int(energy)
+        self.level = int(level)
+        self.xp = int(xp)
+        self.skill_points = int(skill_points)  # Points earned for leveling up that can be used to improve skills
+        self.skills = {skill: int(value) for skill, value in (skills or DEFAULT_SKILLS).items()}
+        self.items = Inventory(items if items is not None else DEFAULT_ITEMS)
+        self.gold = int(gold)  # Currency the player can use for trading
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a character from a dict such as the ones older saves and callers use."""
+        return cls(**{field: data[field] for field in cls.FIELDS if field in data})
+
+    def to_dict(self):
+        """Plain data (JSON-ready); items become {item id: count}."""
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        data["skills"] = dict(self.skills)
+        data["items"] = self.items.to_dict()
+        return data
+
+    @property
+    def items(self):
+        return self._items
+
+    @items.setter
+    def items(self, items):
+        """Takes an Inventory, or anything Inventory() accepts (a list of names, {id: count})."""
+        if not isinstance(items, Inventory):
+            items = Inventory(items)
+        items.on_change = self.items_changed
+        self._items = items
+        self.notify("items")
+
+    def subscribe(self, listener):
+        """Call listener(character, field) after a field in WATCHED_FIELDS changes."""
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def notify(self, field):
+        """Tell the listeners about a change made inside a field, e.g. to the skills dict."""
+        for listener in self.listeners:
+            listener(self, field)
+
+    def items_changed(self):
+        self.notify("items")
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        # Also restores characters pickled before the class had __slots__
+        self.__init__(**{field: state[field] for field in self.FIELDS if field in state})
+
+    def __repr__(self):
+        return f"Character({self.name!r}, {self.species!r}, health={self.health}, level={self.level}, xp={self.xp})"
+
+    # Mapping interface for code that still treats the character as a dict
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def keys(self):
+        return self.FIELDS
 
     def gain_xp(self, amount):
         """Gain experience points and level up if enough XP is accumulated."""
         self.xp += amount
-        print(f"{self.name} gained {amount} XP! Current XP: {self.xp}/{self.level * 100}")
+        logger.info("%s gained %s XP! Current XP: %s/%s", self.name, amount, self.xp, self.level * 100)
 
         # Check if the character can level up
         while self.xp >= self.level * 100:
@@ -28,38 +146,40 @@ class Character:
         self.xp -= (self.level - 1) * 100  # Subtract XP needed for the previous level
         self.skill_points += 3  # Award skill points upon leveling up
         self.health = 100  # Fully restore health on level up
-        print(f"{self.name} has leveled up to Level {self.level}!")
-        print(f"You have gained 3 skill points! Total skill points: {self.skill_points}")
+        logger.info("%s has leveled up to Level %s!", self.name, self.level)
+        logger.info("You have gained 3 skill points! Total skill points: %s", self.skill_points)
 
     def increase_skill(self, skill_name):
         """Increase a specific skill using skill points."""
         if self.skill_points > 0:
             if skill_name in self.skills:
                 self.skills[skill_name] += 1
+                self.notify("skills")
                 self.skill_points -= 1
-                print(
-                    f"Increased {skill_name} to {self.skills[skill_name]}. Remaining skill points: {self.skill_points}")
+                logger.info("Increased %s to %s. Remaining skill points: %s", skill_name, self.skills[skill_name], self.skill_points)
             else:
-                print(f"Skill '{skill_name}' not found.")
+                logger.info("Skill '%s' not found.", skill_name)
         else:
-            print("No skill points available.")
+            logger.info("No skill points available.")
 
     def use_item(self, item_name):
         """Use an item from the inventory."""
         if item_name in self.items:
-            if item_name == "Health Potion":
-                self.health = min(self.health + 50, 100)
+            effect = item_effect(item_name)
+            if effect:
+                self.health = min(self.health + effect.get("health", 0), 100)
+                self.energy = min(self.energy + effect.get("energy", 0), 100)
                 self.items.remove(item_name)
-                print(f"{self.name} used a Health Potion. Health restored to {self.health}.")
+                logger.info("%s used a %s. Health: %s, energy: %s.", self.name, item_name, self.health, self.energy)
             else:
-                print(f"{item_name} can't be used right now.")
+                logger.info("%s can't be used right now.", item_name)
         else:
-            print(f"{item_name} not in inventory.")
+            logger.info("%s not in inventory.", item_name)
 
     def add_item(self, item_name):
         """Add an item to the character's inventory."""
-        self.items.append(item_name)
-        print(f"{item_name} has been added to your inventory.")
+        self.items.add(item_name)
+        logger.info("%s has been added to your inventory.", item_name)
 
     def show_status(self):
         """Display the character's status."""
@@ -72,31 +192,35 @@ class Character:
             f"Energy: {self.energy}/100\n"
             f"Skill Points: {self.skill_points}\n"
             f"Skills: {self.skills}\n"
-            f"Items: {self.items}\n"
+            f"Items: {', '.join(self.items.labels())}\n"
             f"Gold: {self.gold}"
         )
-        print(status)
+        logger.info("%s", status)
         return status
 
-    def buy_item(self, item_name, cost):
-        """Purchase an item if the player has enough gold."""
+    def buy_item(self, item_name, cost=None):
+        """Purchase an item if the player has enough gold; cost defaults to the catalog price."""
+        if cost is None:
+            cost = item_price(item_name)
         if self.gold >= cost:
             self.gold -= cost
             self.add_item(item_name)
-            print(f"You bought {item_name} for {cost} gold. Remaining gold: {self.gold}")
+            logger.info("You bought %s for %s gold. Remaining gold: %s", item_name, cost, self.gold)
         else:
-            print(f"Not enough gold to purchase {item_name}. You need {cost - self.gold} more gold.")
+            logger.info("Not enough gold to purchase %s. You need %s more gold.", item_name, cost - self.gold)
 
-    def sell_item(self, item_name, sell_price):
-        """Sell an item from the inventory for gold."""
+    def sell_item(self, item_name, sell_price=None):
+        """Sell an item from the inventory for gold; by default for part of its catalog price."""
+        if sell_price is None:
+            sell_price = int(item_price(item_name) * SELL_PRICE_FACTOR)
         if item_name in self.items:
             self.items.remove(item_name)
             self.gold += sell_price
-            print(f"Sold {item_name} for {sell_price} gold. Total gold: {self.gold}")
+            logger.info("Sold %s for %s gold. Total gold: %s", item_name, sell_price, self.gold)
         else:
-            print(f"You don't have {item_name} to sell.")
+            logger.info("You don't have %s to sell.", item_name)
 
     def rest(self):
         """Rest and restore energy."""
         self.energy = 100
-        print(f"{self.name} rested and restored their energy to full (100).")
+        logger.info("%s rested and restored their energy to full (100).", self.name)
@@ -0,0 +1,72 @@
+# dice_batch.py
+"""
+Batched dice rolls and skill checks on NumPy arrays.
+
+Same rules as the scalar code: events.perform_skill_check succeeds when d20 + skill is at
+least the difficulty, dice_roll.is_successful when d20 + skill is strictly above
+SUCCESS_THRESHOLD.  All rolls for a batch come from a single Generator call and nothing
+is printed, so bulk balance sweeps don't pay per-roll Python overhead.  Generators made
+without a seed take theirs from the "dice" stream, so rng.seed() makes the batches repeat.
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from dice_roll import SUCCESS_THRESHOLD
+from events import event_data
+from rng import stream
+
+DIE_SIDES = 20
+
+
+def make_rng(seed=None):
+    """Create the NumPy Generator used by the batch functions; seeded from the "dice" stream by default."""
+    return np.random.default_rng(seed if seed is not None else stream("dice").getrandbits(64))
+
+
+def roll_dice_batch(count, rng=None):
+    """Roll count d20s at once (the batched roll_dice)."""
+    rng = rng if rng is not None else make_rng()
+    return rng.integers(1, DIE_SIDES + 1, size=count, dtype=np.int16)
+
+
+def skill_check_batch(skill_values, difficulties, rng=None):
+    """
+    Batched perform_skill_check: d20 + skill >= difficulty.
+    skill_values and difficulties broadcast against each other; returns (success, rolls, totals).
+    """
+    skill_values = np.asarray(skill_values, dtype=np.int16)
+    difficulties = np.asarray(difficulties, dtype=np.int16)
+    shape = np.broadcast_shapes(skill_values.shape, difficulties.shape)
+    rolls = roll_dice_batch(shape, rng)
+    totals = rolls + skill_values
+    return totals >= difficulties, rolls, totals
+
+
+def threshold_check_batch(skill_values, rng=None, threshold=SUCCESS_THRESHOLD):
+    """Batched dice_roll.is_successful: d20 + skill > threshold. Returns (success, rolls, totals)."""
+    skill_values = np.asarray(skill_values, dtype=np.int16)
+    rolls = roll_dice_batch(skill_values.shape, rng)
+    totals = rolls + skill_values
+    return totals > threshold, rolls, totals
+
+
+def event_check_batch(room_type, skill_values, rng=None):
+    """Run the skill check of an events.event_data entry for every skill value in the batch."""
+    return skill_check_batch(skill_values, event_data[room_type]["difficulty"], rng)
+
+
+def main(count=10_000_000):
+    rng = make_rng(0)
+    skill_values = rng.integers(5, 16, size=count, dtype=np.int16)
+    start = time.perf_counter()
+    success, _, _ = event_check_batch("Enemy", skill_values, rng)
+    elapsed = time.perf_counter() - start
+    print(f"{count} Enemy checks in {elapsed * 1000:.1f} ms ({count / elapsed / 1e6:.1f} M checks/s), "
+          f"success rate {success.mean():.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
@@ -1,10 +1,12 @@
-import random
+from rng import stream
 
 SUCCESS_THRESHOLD = 15
 
+combat = stream("combat")
+
 
 def roll_dice():
-    return random.randint(1, 20)  # Simulating a 20-sided dice roll
+    return combat.d20()  # Simulating a 20-sided dice roll
 
 
 def is_successful(dice_roll, player_skill):
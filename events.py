@@ -1,8 +1,12 @@
 # events.py
 
-import random
+from game_log import get_logger
+from instrumentation import count, timed
+from rng import stream
 
-from PyQt6.QtWidgets import QInputDialog
+logger = get_logger(__name__)
+combat = stream("combat")
+loot = stream("loot")
 
 # Event data contains various encounters such as traps, enemies, puzzles, etc.
 event_data = {
@@ -59,53 +63,63 @@ event_data = {
 }
 
 
+@timed("events.perform_skill_check")
 def perform_skill_check(player_character, skill, difficulty):
     """
     Perform a skill check by rolling a die and adding the character's skill value.
     Returns True for success and False for failure.
     """
-    # Ensure player_character['skills'] is initialized correctly
-    if 'skills' not in player_character or not isinstance(player_character['skills'], dict):
-        print("Error: player_character['skills'] is not initialized correctly. Initializing with default values.")
-        player_character['skills'] = {"Strength": 0, "Agility": 0, "Intelligence": 0}
-
-    skill_value = player_character['skills'].get(skill, 0)
-    dice_roll = random.randint(1, 20)
+    skill_value = player_character.skills.get(skill, 0)
+    dice_roll = combat.d20()
     total = dice_roll + skill_value
-    print(f"Skill check: Rolled {dice_roll} + {skill_value} (skill) = {total} against difficulty {difficulty}")
+    logger.debug("Skill check: Rolled %s + %s (skill) = %s against difficulty %s", dice_roll, skill_value, total, difficulty)
 
     return total >= difficulty
 
 
-def trigger_event(room_type, player_character, game_window):
+def ask_player(game_window, prompt, choices):
+    """Ask the player to pick one of the event options through a Qt dialog."""
+    from PyQt6.QtWidgets import QInputDialog  # Imported lazily so headless runs don't need a display
+
+    player_choice, ok = QInputDialog.getItem(game_window, "Event Encounter", prompt, choices, 0, False)
+    return player_choice if ok else None
+
+
+@timed("events.trigger_event")
+def trigger_event(room_type, player_character, game_window, choose_option=None):
     """
     Trigger an event based on the room type and process player choices.
+    choose_option(game_window, prompt, choices) returns the picked option or None if the
+    player backed out; it defaults to the Qt dialog.
     """
-    print(f"Triggering event for room type: {room_type}")
+    logger.debug("Triggering event for room type: %s", room_type)
+    count("events.triggered")
 
     # Check if the room type is "Empty" and exit early
     if room_type == "Empty":
-        print("Encountered an Empty room. No event will be triggered.")
+        logger.debug("Encountered an Empty room. No event will be triggered.")
         game_window.interactive_window.append("The room is empty. Nothing of interest here.")
         return True  # Return True to indicate the encounter is complete
 
     # Retrieve the event data for the given room type
     event = event_data.get(room_type)
     if not event:
-        print(f"No event data found for room type: {room_type}.")
+        logger.debug("No event data found for room type: %s.", room_type)
         return False
 
     # Display the event prompt and choices to the player
     prompt = event["prompt"]
     choices = event["options"]
-    player_choice, ok = QInputDialog.getItem(game_window, "Event Encounter", prompt, choices, 0, False)
+    if choose_option is None:
+        choose_option = ask_player
+    player_choice = choose_option(game_window, prompt, choices)
 
-    if not ok or player_choice == "Leave it alone":
+    if player_choice is None or player_choice == "Leave it alone":
         game_window.interactive_window.append("You chose to avoid the situation.")
-        print("Player chose to avoid the situation.")
+        logger.debug("Player chose to avoid the situation.")
         return True
 
-    print(f"Player chose: {player_choice}")
+    logger.debug("Player chose: %s", player_choice)
 
     # Handling player choices with skill checks
     if player_choice in ["Fight", "Disarm", "Analyze", "Take it", "Open it", "Inspect it"]:
@@ -115,19 +129,11 @@ def trigger_event(room_type, player_character, game_window):
             try:
                 # Success handling for specific event types
                 if room_type == "Item" or room_type == "Treasure":
-                    found_item = random.choice(["Ancient Artifact", "Healing Potion", "Mystic Amulet", "Gold Coins"])
-                    print(f"Attempting to add item to inventory: {found_item}")
-
-                    # Ensure player_character['items'] is properly initialized
-                    if 'items' not in player_character or not isinstance(player_character['items'], list):
-                        player_character['items'] = []
-
-                    player_character['items'].append(found_item)
+                    found_item = loot.choice(["Ancient Artifact", "Healing Potion", "Mystic Amulet", "Gold Coins"])
+                    logger.debug("Attempting to add item to inventory: %s", found_item)
 
-                    # Ensure XP is initialized and updated correctly
-                    if 'xp' not in player_character:
-                        player_character['xp'] = 0
-                    player_character['xp'] += event["xp_reward"]
+                    player_character.items.add(found_item)
+                    player_character.xp += event["xp_reward"]
 
                     game_window.interactive_window.append(
                         f"Success! You acquired a {found_item} and gained {event['xp_reward']} XP.")
@@ -135,72 +141,71 @@ def trigger_event(room_type, player_character, game_window):
                     # Safely update character sheet
                     try:
                         game_window.update_character_sheet()
-                        print("Character sheet updated successfully.")
+                        logger.debug("Character sheet updated successfully.")
                     except Exception as e:
-                        print(f"Error updating character sheet: {e}")
+                        logger.error("Error updating character sheet: %s", e)
 
-                    print(f"Item acquired: {found_item}. XP awarded: {event['xp_reward']}")
-                    print(f"Current Inventory: {player_character['items']}")
-                    print(f"Current XP: {player_character['xp']}")
+                    logger.debug("Item acquired: %s. XP awarded: %s", found_item, event['xp_reward'])
+                    logger.debug("Current Inventory: %s", player_character.items)
+                    logger.debug("Current XP: %s", player_character.xp)
                 else:
-                    player_character['xp'] += event["xp_reward"]
+                    player_character.xp += event["xp_reward"]
                     game_window.interactive_window.append(event["success_message"])
 
                     try:
                         game_window.update_character_sheet()
-                        print("Character sheet updated successfully after gaining XP.")
+                        logger.debug("Character sheet updated successfully after gaining XP.")
                     except Exception as e:
-                        print(f"Error updating character sheet after gaining XP: {e}")
+                        logger.error("Error updating character sheet after gaining XP: %s", e)
 
-                    print(f"Skill check succeeded. Gained {event['xp_reward']} XP.")
+                    logger.debug("Skill check succeeded. Gained %s XP.", event['xp_reward'])
             except Exception as e:
-                print(f"Error while handling success outcome: {e}")
+                logger.error("Error while handling success outcome: %s", e)
         else:
             # Failure handling for each event type
             try:
-                player_character['health'] -= event["failure_penalty"]
+                player_character.health -= event["failure_penalty"]
                 game_window.interactive_window.append(event["failure_message"])
                 game_window.update_character_sheet()
-                print(
-                    f"Skill check failed. Lost {event['failure_penalty']} health. Current health: {player_character['health']}")
+                logger.debug("Skill check failed. Lost %s health. Current health: %s", event['failure_penalty'], player_character.health)
             except Exception as e:
-                print(f"Error during failure handling: {e}")
+                logger.error("Error during failure handling: %s", e)
 
-            if player_character['health'] <= 0:
+            if player_character.health <= 0:
                 game_window.interactive_window.append("You have died. Game over.")
                 game_window.update_command_buttons(['Create Character', 'Start Mission', 'Explore', 'Quit'])
-                print("Game Over: Player has died.")
+                logger.info("Game Over: Player has died.")
                 return True
         return True
 
     elif player_choice == "Flee":
         # Flee action handling
         game_window.interactive_window.append("You fled from the encounter, avoiding any damage.")
-        print("Player fled the encounter.")
+        logger.debug("Player fled the encounter.")
         return True
 
     elif player_choice == "Negotiate":
         # Handling negotiation choice
         success = perform_skill_check(player_character, "Intelligence", event["difficulty"])
         if success:
-            random_reward = random.choice(["Gold", "Healing Potion", "Weapon Upgrade"])
-            player_character['items'].append(random_reward)
+            random_reward = loot.choice(["Gold", "Healing Potion", "Weapon Upgrade"])
+            player_character.items.add(random_reward)
 
             try:
                 game_window.update_character_sheet()
                 game_window.interactive_window.append(f"Negotiation succeeded! You gained a {random_reward}.")
-                print(f"Negotiation succeeded. Rewarded with {random_reward}.")
+                logger.debug("Negotiation succeeded. Rewarded with %s.", random_reward)
             except Exception as e:
-                print(f"Error updating character sheet after negotiation: {e}")
+                logger.error("Error updating character sheet after negotiation: %s", e)
         else:
-            player_character['health'] -= 5
+            player_character.health -= 5
 
             try:
                 game_window.update_character_sheet()
                 game_window.interactive_window.append("Negotiation failed, and you had to retreat. Lost 5 health.")
-                print("Negotiation failed. Lost 5 health.")
+                logger.debug("Negotiation failed. Lost 5 health.")
             except Exception as e:
-                print(f"Error updating character sheet after failed negotiation: {e}")
+                logger.error("Error updating character sheet after failed negotiation: %s", e)
         return True
 
     return False
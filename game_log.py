@@ -0,0 +1,93 @@
+# game_log.py
+"""
+Logging for the game modules.
+
+Every module logs through get_logger(__name__) instead of print.  Records go into a
+queue and a background listener thread does the actual writing, so the game never waits
+on stdout or a log file.  Messages use %-style arguments, which logging only formats when
+a handler will really emit the record; below the configured level a call costs one cached
+level check.
+
+AWAY_MISSION_LOG_LEVEL sets the level (default INFO), AWAY_MISSION_LOG_FILE sends the log to
+a file instead of stdout (the packaged windowed build has no stdout at all).
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from contextlib import contextmanager
+
+LOG_LEVEL_ENV_VAR = "AWAY_MISSION_LOG_LEVEL"
+LOG_FILE_ENV_VAR = "AWAY_MISSION_LOG_FILE"
+DEFAULT_LEVEL = "INFO"
+ROOT_LOGGER_NAME = "away_mission"
+LOG_FORMAT = "%(message)s"
+FILE_LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_listener = None
+
+
+def configure(level=None, filename=None):
+    """(Re)build the queue handler and its background writer. Called on first get_logger."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    level = level or os.environ.get(LOG_LEVEL_ENV_VAR, DEFAULT_LEVEL)
+    filename = filename or os.environ.get(LOG_FILE_ENV_VAR)
+    if filename:
+        sink = logging.FileHandler(filename, encoding="utf-8")
+        sink.setFormatter(logging.Formatter(FILE_LOG_FORMAT))
+    elif sys.stdout is not None:
+        sink = logging.StreamHandler(sys.stdout)
+        sink.setFormatter(logging.Formatter(LOG_FORMAT))
+    else:
+        sink = logging.NullHandler()
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.handlers.clear()
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(records, sink)
+    _listener.start()
+
+
+def shutdown():
+    """Flush everything still queued; registered to run at exit."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name):
+    if _listener is None:
+        configure()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+def set_level(level):
+    if _listener is None:
+        configure()
+    logging.getLogger(ROOT_LOGGER_NAME).setLevel(level)
+
+
+@contextmanager
+def quiet(level=logging.WARNING):
+    """Temporarily drop game log records below level, e.g. for bulk simulation."""
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    previous = root.level
+    root.setLevel(level)
+    try:
+        yield
+    finally:
+        root.setLevel(previous)
+
+
+atexit.register(shutdown)
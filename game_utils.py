@@ -1,7 +1,9 @@
-import pickle
+import rng
+from instrumentation import timed
+from save_format import SAVE_FILE, SaveGame
 
-def save_game(player_character, filename='savegame.pkl'):
+
+@timed("game_utils.save_game")
+def save_game(player_character, filename=SAVE_FILE, game_map=None, mission=None, history=None):
     """Save the current game state to a file."""
-    with open(filename, 'wb') as save_file:
-        pickle.dump(player_character, save_file)
-    print("Game successfully saved!")
\ No newline at end of file
+    SaveGame(filename).save(player_character, game_map, mission, history, rng.snapshot())
@@ -0,0 +1,204 @@
+# headless.py
+"""
+Run full missions without a display.
+
+GameWindow normally supplies the player's choices (QInputDialog) and shows the results
+(interactive_window).  Here both are pluggable: a choice policy picks event options,
+a move policy picks directions and a sink collects the text the player would have seen.
+"""
+
+import sys
+import time
+from contextlib import nullcontext
+
+import game_log
+from character import Character
+from events import trigger_event
+from map_bot import GameMap
+from mission_constants import STARTING_ITEMS
+from npc_bot import interact_with_npc
+from pathfinding import SearchTooLarge
+from rng import seed as seed_streams, stream
+from story_bot import get_mission_story
+
+MISSION_TYPES = ["rescue", "exploration", "stealth"]
+DEFAULT_MAP_SIZE = (7, 7)
+
+# Rooms that GameWindow.check_room_encounter marks as "Cleared" once visited
+CLEARABLE_ROOMS = ["Enemy", "Trap", "Puzzle", "Item", "NPC"]
+
+
+class ListSink:
+    """Collects every line of game text, like the interactive window would."""
+
+    def __init__(self):
+        self.lines = []
+
+    def append(self, text):
+        self.lines.append(text)
+
+
+class NullSink:
+    """Throws game text away; the cheapest sink for bulk runs."""
+
+    def append(self, text):
+        pass
+
+
+class HeadlessSession:
+    """Stands in for GameWindow when trigger_event runs without Qt."""
+
+    def __init__(self, sink=None):
+        self.interactive_window = sink if sink is not None else NullSink()
+
+    def update_character_sheet(self):
+        pass
+
+    def update_command_buttons(self, commands):
+        pass
+
+
+# Choice policies: called as policy(game_window, prompt, choices) like events.ask_player
+
+def first_option_policy(game_window, prompt, choices):
+    """Always take the first option (Fight, Disarm, Analyze, ...)."""
+    return choices[0]
+
+
+class RandomChoicePolicy:
+    """Pick a random option; by default from the "choices" stream, so runs can be seeded."""
+
+    def __init__(self, rng=None):
+        self.rng = rng or stream("choices")
+
+    def __call__(self, game_window, prompt, choices):
+        return self.rng.choice(choices)
+
+
+# Move policies: called as policy(game_map) and return a GameMap.move_player direction
+
+def toward_objective(game_map):
+    """Walk straight at the objective, east/west first and then north/south."""
+    if game_map.player_x < game_map.objective_x:
+        return "right"
+    if game_map.player_x > game_map.objective_x:
+        return "left"
+    if game_map.player_y < game_map.objective_y:
+        return "down"
+    return "up"
+
+
+def along_shortest_path(game_map):
+    """Follow the shortest path to the objective, walking around cells without a room."""
+    position = (game_map.player_x, game_map.player_y)
+    objective = (game_map.objective_x, game_map.objective_y)
+    try:
+        return game_map.paths().next_step(position, objective) or toward_objective(game_map)
+    except SearchTooLarge:
+        return toward_objective(game_map)
+
+
+def new_character(name="Ensign", species="Human", skills=None):
+    """Create a character like the one GameWindow builds."""
+    if skills is None:
+        skills = {"Strength": 10, "Agility": 10, "Intelligence": 10,
+                  "Charisma": 10, "Endurance": 10, "Dexterity": 10}
+    return Character(name, species, skills=skills, items=STARTING_ITEMS)
+
+
+def handle_room(game_map, player_character, session, choose_option=first_option_policy):
+    """Resolve the room the player is standing in, mirroring GameWindow.check_room_encounter."""
+    x, y = game_map.player_x, game_map.player_y
+    room_type = game_map.map_grid[y][x]
+
+    if room_type == "Empty":
+        session.interactive_window.append("The room is empty. Nothing of interest here.")
+        return room_type
+
+    if room_type == "NPC":
+        npc_name = stream("dialogue").choice(["Trader", "QuestGiver"])
+        session.interactive_window.append(f"{npc_name}: {interact_with_npc(npc_name)}")
+    elif not trigger_event(room_type, player_character, session, choose_option):
+        session.interactive_window.append("The event failed or no further action was required.")
+
+    if room_type in CLEARABLE_ROOMS:
+        game_map.set_room(x, y, "Cleared")
+    return room_type
+
+
+def run_mission(player_character=None, mission_type="exploration", width=None, height=None,
+                choose_option=first_option_policy, choose_move=along_shortest_path,
+                sink=None, max_turns=None, quiet=True):
+    """
+    Play one mission to the end and return a summary dict.
+    The mission ends when the objective is reached, the character dies or max_turns runs out.
+    """
+    if player_character is None:
+        player_character = new_character()
+    if width is None or height is None:
+        width, height = DEFAULT_MAP_SIZE
+    if max_turns is None:
+        max_turns = width * height * 4
+
+    session = HeadlessSession(sink)
+    start_health = player_character.health
+    start_xp = player_character.xp
+    encounters = {}
+    completed = False
+    turns = 0
+
+    with game_log.quiet() if quiet else nullcontext():
+        session.interactive_window.append(f"Mission Start: {get_mission_story(mission_type, 'start')}")
+        game_map = GameMap(width, height, mission_type)
+
+        while turns < max_turns:
+            turns += 1
+            if game_map.move_player(choose_move(game_map)) is None:
+                session.interactive_window.append("You can't move in that direction.")
+                continue
+
+            room_type = handle_room(game_map, player_character, session, choose_option)
+            encounters[room_type] = encounters.get(room_type, 0) + 1
+
+            if player_character.health <= 0:
+                break
+            if room_type == "Objective":
+                completed = True
+                session.interactive_window.append(
+                    f"Mission Complete: {get_mission_story(mission_type, 'end')}")
+                break
+
+    return {
+        "mission_type": mission_type,
+        "completed": completed,
+        "died": player_character.health <= 0,
+        "turns": turns,
+        "xp_gained": player_character.xp - start_xp,
+        "damage_taken": max(start_health - player_character.health, 0),
+        "encounters": encounters
+    }
+
+
+def run_missions(count, seed=None, mission_type=None, **mission_options):
+    """Run count independent missions with a fresh character each and return their summaries."""
+    if seed is not None:
+        seed_streams(seed)
+    results = []
+    for _ in range(count):
+        current_type = mission_type or stream("map").choice(MISSION_TYPES)
+        results.append(run_mission(new_character(), current_type, **mission_options))
+    return results
+
+
+def main(count=1000):
+    start = time.perf_counter()
+    results = run_missions(count, seed=0)
+    elapsed = time.perf_counter() - start
+    completed = sum(result["completed"] for result in results)
+    died = sum(result["died"] for result in results)
+    print(f"Ran {count} missions in {elapsed:.2f}s ({count / elapsed:.0f} missions/s)")
+    print(f"Completed: {completed}  Died: {died}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,142 @@
+# instrumentation.py
+"""
+Optional timers and counters for finding where the game spends its time.
+
+Set AWAY_MISSION_PROFILE before starting the game:
+    report   - time the instrumented functions and print p50/p95/max and call counts at exit
+    trace    - as report, and also write a Chrome trace (open in chrome://tracing or Perfetto)
+    cprofile - as report, and also cProfile the whole session
+Anything else (or unset) turns instrumentation off.  When it is off, timed() hands back the
+undecorated function and span()/count() do nothing, so instrumented code runs as before.
+"""
+
+import atexit
+import functools
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+PROFILE_ENV_VAR = "AWAY_MISSION_PROFILE"
+REPORT_FILE = "profile_report.txt"
+TRACE_FILE = "away_mission_trace.json"
+CPROFILE_FILE = "away_mission.prof"
+
+MODE = os.environ.get(PROFILE_ENV_VAR, "").strip().lower()
+ENABLED = MODE in ("1", "report", "trace", "cprofile")
+
+_durations = {}  # name -> list of seconds
+_counters = {}  # name -> count
+_trace_events = []
+_lock = threading.Lock()
+_NULL_SPAN = nullcontext()
+_profiler = None
+
+
+class Span:
+    """Times one block of code under a name."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        record(self.name, self.started, time.perf_counter())
+        return False
+
+
+def record(name, started, ended):
+    with _lock:
+        _durations.setdefault(name, []).append(ended - started)
+        if MODE == "trace":
+            _trace_events.append({
+                "name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                "ts": started * 1e6, "dur": (ended - started) * 1e6
+            })
+
+
+def span(name):
+    """Context manager timing a block; free when instrumentation is off."""
+    if not ENABLED:
+        return _NULL_SPAN
+    return Span(name)
+
+
+def timed(name=None):
+    """Decorator timing every call of a function; returns the function untouched when off."""
+    def decorate(function):
+        if not ENABLED:
+            return function
+        label = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(label, started, time.perf_counter())
+
+        return wrapper
+
+    return decorate
+
+
+def _count(name, amount=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def _no_count(name, amount=1):
+    pass
+
+
+count = _count if ENABLED else _no_count
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def report():
+    """Text table of call counts and p50/p95/max latency (ms) for everything recorded."""
+    with _lock:
+        durations = {name: list(values) for name, values in _durations.items()}
+        counters = dict(_counters)
+    lines = [f"{'name':48} {'calls':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'total ms':>10}"]
+    for name, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+        lines.append(f"{name:48} {len(values):8} {percentile(values, 0.5) * 1000:9.3f} "
+                     f"{percentile(values, 0.95) * 1000:9.3f} {max(values) * 1000:9.3f} "
+                     f"{sum(values) * 1000:10.1f}")
+    for name, value in sorted(counters.items()):
+        lines.append(f"{name:48} {value:8}")
+    return "\n".join(lines)
+
+
+def dump():
+    """Write the session report (and trace/profile, depending on the mode)."""
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(CPROFILE_FILE)
+    if MODE == "trace":
+        import json
+
+        with open(TRACE_FILE, 'w') as trace_file:
+            json.dump({"traceEvents": _trace_events, "displayTimeUnit": "ms"}, trace_file)
+    text = report()
+    with open(REPORT_FILE, 'w') as report_file:
+        report_file.write(text + "\n")
+    print(text)
+
+
+if ENABLED:
+    if MODE == "cprofile":
+        import cProfile
+
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    atexit.register(dump)
@@ -0,0 +1,133 @@
+# inventory.py
+"""
+Item catalog and stacked inventories.
+
+Items are identified by a short id ("health_potion"); the catalog gives each one the name
+the game shows, a price in gold and what using it does.  An Inventory keeps one count per
+item id, so finding the same potion ten times is one entry with a count of ten, and adding,
+removing and looking up an item are single dict operations.
+"""
+
+# item id -> name, price in gold and the effect of using it (None: can't be used)
+ITEM_CATALOG = {
+    "basic_sword": {"name": "Basic Sword", "price": 15, "effect": None},
+    "shield": {"name": "Shield", "price": 20, "effect": None},
+    "health_potion": {"name": "Health Potion", "price": 25, "effect": {"health": 50}},
+    "healing_potion": {"name": "Healing Potion", "price": 25, "effect": {"health": 50}},
+    "energy_crystal": {"name": "Energy Crystal", "price": 30, "effect": {"energy": 50}},
+    "ancient_artifact": {"name": "Ancient Artifact", "price": 120, "effect": None},
+    "rare_artifact": {"name": "Rare Artifact", "price": 100, "effect": None},
+    "mystic_amulet": {"name": "Mystic Amulet", "price": 80, "effect": None},
+    "gold_coins": {"name": "Gold Coins", "price": 30, "effect": None},
+    "gold": {"name": "Gold", "price": 10, "effect": None},
+    "weapon_upgrade": {"name": "Weapon Upgrade", "price": 60, "effect": None},
+}
+ITEM_IDS = {item["name"]: item_id for item_id, item in ITEM_CATALOG.items()}
+SELL_PRICE_FACTOR = 0.5  # Traders pay half the catalog price
+
+
+def item_id(item):
+    """Id of an item given by id or by name; names missing from the catalog get a derived id."""
+    if item in ITEM_CATALOG:
+        return item
+    return ITEM_IDS.get(item) or item.strip().lower().replace(" ", "_")
+
+
+def item_name(item):
+    entry = ITEM_CATALOG.get(item_id(item))
+    return entry["name"] if entry else item_id(item).replace("_", " ").title()
+
+
+def item_price(item):
+    entry = ITEM_CATALOG.get(item_id(item))
+    return entry["price"] if entry else 0
+
+
+def item_effect(item):
+    entry = ITEM_CATALOG.get(item_id(item))
+    return entry["effect"] if entry else None
+
+
+class Inventory:
+    """
+    Item id -> stack count.  Also accepts item names wherever it takes an item, and
+    iterates like the old list of names (one name per item), so len(), `in` and for
+    loops behave as before.  on_change, if set, is called after every add or remove.
+    """
+
+    __slots__ = ("counts", "total", "on_change")
+
+    def __init__(self, items=None):
+        self.counts = {}
+        self.total = 0
+        self.on_change = None
+        if isinstance(items, Inventory):
+            items = items.counts
+        if isinstance(items, dict):
+            for item, amount in items.items():
+                self.add(item, amount)
+        else:
+            for item in items or ():
+                self.add(item)
+
+    def add(self, item, amount=1):
+        """Put amount of an item in; adding none does nothing, a negative amount is a ValueError."""
+        if amount <= 0:
+            if amount < 0:
+                raise ValueError(f"Can't add {amount} of {item_name(item)}; use remove().")
+            return
+        key = item_id(item)
+        self.counts[key] = self.counts.get(key, 0) + amount
+        self.total += amount
+        if self.on_change is not None:
+            self.on_change()
+
+    append = add  # For code written against the old list of item names
+
+    def remove(self, item, amount=1):
+        """Take amount of an item out; ValueError if there aren't that many."""
+        key = item_id(item)
+        held = self.counts.get(key, 0)
+        if held < amount:
+            raise ValueError(f"Only {held} of {item_name(key)} in the inventory.")
+        if held == amount:
+            del self.counts[key]
+        else:
+            self.counts[key] = held - amount
+        self.total -= amount
+        if self.on_change is not None:
+            self.on_change()
+
+    def count(self, item):
+        return self.counts.get(item_id(item), 0)
+
+    def __contains__(self, item):
+        return item_id(item) in self.counts
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        for key, amount in self.counts.items():
+            name = item_name(key)
+            for _ in range(amount):
+                yield name
+
+    def stacks(self):
+        """(name, count) per kind of item, in the order they were first picked up."""
+        return [(item_name(key), amount) for key, amount in self.counts.items()]
+
+    def labels(self):
+        """One display line per stack, e.g. "Healing Potion x3"."""
+        return [f"{name} x{amount}" if amount > 1 else name for name, amount in self.stacks()]
+
+    def to_dict(self):
+        return dict(self.counts)
+
+    def __eq__(self, other):
+        if isinstance(other, Inventory):
+            return self.counts == other.counts
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Inventory({', '.join(self.labels())})"
@@ -1,14 +1,18 @@
 import os
 import sys
 import time
-import pickle
+STARTED_AT = time.perf_counter()  # Taken before the heavy imports so they count towards startup time
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QPixmap
 from PyQt6.QtWidgets import QApplication, QSplashScreen
+from game_log import get_logger
+from instrumentation import timed
+import rng
+from save_format import SAVE_FILE, SaveFormatError, SaveGame
+from startup import StartupPipeline
 from ui import GameWindow  # Import the GameWindow class
 
-# Constants for the default save file
-SAVE_FILE = 'savegame.pkl'
+logger = get_logger(__name__)
 
 # Function to get the correct path whether running as a packaged executable or directly from the script
 def resource_path(relative_path):
@@ -17,21 +21,24 @@ def resource_path(relative_path):
         return os.path.join(sys._MEIPASS, relative_path)  # Use PyInstaller's temp directory
     return os.path.join(os.getcwd(), relative_path)  # Use current working directory in dev
 
-def load_game():
-    """Load the game state from a save file."""
-    if os.path.exists(SAVE_FILE):
-        with open(SAVE_FILE, 'rb') as file:
-            player_character = pickle.load(file)
-            print("Game loaded successfully.")
-            return player_character
-    else:
+@timed("main.load_game")
+def load_game(save_game=None):
+    """Load the saved game state ({"character", "game_map", "mission", "history", "rng"}), or None."""
+    if save_game is None:
+        save_game = SaveGame(SAVE_FILE)
+    try:
+        state = save_game.load()
+    except (OSError, SaveFormatError) as e:
+        logger.error("Could not load the saved game: %s", e)
         return None
+    if state is not None:
+        logger.info("Game loaded successfully.")
+    return state
 
-def save_game(player_character):
+@timed("main.save_game")
+def save_game(player_character, game_map=None, mission=None, history=None):
     """Save the current game state to a file."""
-    with open(SAVE_FILE, 'wb') as file:
-        pickle.dump(player_character, file)
-    print("Game successfully saved!")
+    SaveGame(SAVE_FILE).save(player_character, game_map, mission, history, rng.snapshot())
 
 
 def start_game():
@@ -49,30 +56,52 @@ def start_game():
 
     # Process events to ensure the splash screen displays immediately
     app.processEvents()
-    time.sleep(3)  # Display the splash screen for 3 seconds (adjust as needed)
 
     # Check if a saved game exists and ask the user what to do
-    player_character = load_game()
+    save_game_file = SaveGame(SAVE_FILE)
+    state = load_game(save_game_file)
 
-    if player_character:
+    if state:
         # Ask the user if they want to load the saved game
         reply = input("A saved game was found. Do you want to load it? (y/n): ").strip().lower()
 
         if reply == 'y':
-            game_window = GameWindow(player_character)  # Start with the loaded character
-            game_window.show()
-            print("Loaded saved game.")
+            # Start with the loaded character; autosave continues the same save file
+            if state["rng"] is not None:
+                rng.restore(state["rng"])  # Continue every random stream where the save left it
+            game_window = GameWindow(state["character"], run_startup=False, save_game=save_game_file)
+            if state["game_map"] is not None:
+                game_window.resume_mission(state["game_map"], state["mission"], state["history"])
+            logger.info("Loaded saved game.")
         else:
-            game_window = GameWindow(None)  # Start with no character (new game)
-            game_window.show()
-            print("Starting a new game.")
+            game_window = GameWindow(None, run_startup=False)  # Start with no character (new game)
+            logger.info("Starting a new game.")
     else:
-        game_window = GameWindow(None)  # Start with no character (new game)
-        game_window.show()
-        print("Starting a new game.")
+        game_window = GameWindow(None, run_startup=False)  # Start with no character (new game)
+        logger.info("Starting a new game.")
+    window_shown = time.perf_counter() - STARTED_AT
+
+    # Audio and speech start in the background; the splash shows their progress
+    pipeline = StartupPipeline(game_window.startup_stages(), game_window)
+
+    def show_progress(label, percent):
+        splash.showMessage(f"{label}... {percent}%", alignment=Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignCenter,
+                           color=Qt.GlobalColor.white)
+
+    def startup_finished(timings):
+        # Close the splash screen once the background work is really done
+        splash.finish(game_window)
+        ready = time.perf_counter() - STARTED_AT
+        stages = ", ".join(f"{label} {seconds:.2f}s" for label, seconds in timings.items())
+        report = f"Time to interactive: {window_shown:.2f}s, fully started: {ready:.2f}s ({stages})"
+        game_window.startup_report = report
+        game_window.statusBar().showMessage(report, 10000)
+        logger.info("%s", report)
+        game_window.introduce_game()
 
-    # Close the splash screen once the main window is ready
-    splash.finish(game_window)
+    pipeline.progress.connect(show_progress)
+    pipeline.finished.connect(startup_finished)
+    pipeline.start()
 
     # Start the PyQt event loop
     sys.exit(app.exec())
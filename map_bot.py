@@ -1,63 +1,314 @@
 import random
-from PyQt6.QtWidgets import QInputDialog  # Import QInputDialog for GUI input handling
+import struct
+from collections import OrderedDict
 from events import perform_skill_check  # Update the import statement to use perform_skill_check
 from mission_bot import generate_mission  # Import the mission generator
+from game_log import get_logger
+from map_generator import MapLayout
+from pathfinding import Pathfinder
+from rng import seed_for, stream
+from room_grid import ROOM_CODES, ROOM_NAMES, RoomGrid, RoomType
+
+# Rooms of the original generator, which picked every room uniformly from ROOM_TYPES
+ROOM_TYPES = ["Empty", "Enemy", "Trap", "Puzzle", "Item"]
+ROOM_TYPE_CODES = [ROOM_CODES[room] for room in ROOM_TYPES]
+# How a ChunkedGameMap makes its rooms; saves record it so old maps regenerate unchanged
+UNIFORM_GENERATOR = 1
+LAYOUT_GENERATOR = 2
+
+# Maps with more cells than this are generated lazily, chunk by chunk
+CHUNKED_MAP_THRESHOLD = 256 * 256
+CHUNK_SIZE = 64
+MAX_RESIDENT_CHUNKS = 256
+# One changed room of a ChunkedGameMap as stored in a save: x, y, RoomType code
+CHANGE_RECORD = struct.Struct("<iiB")
+OBSTACLE_LABEL = "####"  # How display_map prints a cell without a room
+
+logger = get_logger(__name__)
+map_rng = stream("map")
 
 class GameMap:
-    def __init__(self, width, height, mission_type):
+    def __init__(self, width, height, mission_type, seed=None, densities=None):
         self.width = width
         self.height = height
         self.mission_type = mission_type
-        self.map_grid = [[None for _ in range(width)] for _ in range(height)]
+        self.seed = seed if seed is not None else map_rng.getrandbits(64)
+        self.layout = MapLayout(width, height, mission_type, self.seed, densities)
+        self.map_grid = RoomGrid(width, height)
+        self.pathfinder = None
         self.player_x = 0
         self.player_y = 0
         self.objective_x, self.objective_y = self.place_objective()
         self.populate_map()
 
+    @classmethod
+    def from_grid(cls, map_grid, mission_type, objective):
+        """Rebuild a map around existing rooms (e.g. from a save) instead of generating them."""
+        game_map = cls.__new__(cls)
+        game_map.width = map_grid.width
+        game_map.height = map_grid.height
+        game_map.mission_type = mission_type
+        game_map.seed = None
+        game_map.layout = None
+        game_map.map_grid = map_grid
+        game_map.pathfinder = None
+        game_map.player_x = 0
+        game_map.player_y = 0
+        game_map.objective_x, game_map.objective_y = objective
+        return game_map
+
     def place_objective(self):
-        """Randomly place the main mission objective."""
-        return random.randint(0, self.width - 1), random.randint(0, self.height - 1)
+        """Place the main mission objective where the seeded layout puts it."""
+        return self.layout.objective
 
     def populate_map(self):
-        room_types = ["Empty", "Enemy", "Trap", "Puzzle", "Item"]
-        for y in range(self.height):
-            for x in range(self.width):
-                if (x, y) == (self.objective_x, self.objective_y):
-                    self.map_grid[y][x] = "Objective"
-                else:
-                    self.map_grid[y][x] = random.choice(room_types)
-
-        # Ensure the start and exit points are defined
-        self.map_grid[0][0] = "Start"
-        self.map_grid[self.height - 1][self.width - 1] = "Exit"
+        """Fill the grid from the seeded layout, with the start, objective and exit pinned."""
+        self.layout.fill(self.map_grid)
+
+    def get_room(self, x, y):
+        return self.map_grid.get_name(x, y)
+
+    def get_code(self, x, y):
+        return self.map_grid.get(x, y)
+
+    def set_room(self, x, y, room):
+        self.map_grid.set_name(x, y, room)
+        if self.pathfinder is not None:
+            self.pathfinder.cell_changed(x, y)
+
+    def paths(self):
+        """The map's Pathfinder, created on first use; set_room keeps it up to date."""
+        if self.pathfinder is None:
+            self.pathfinder = Pathfinder(self)
+        return self.pathfinder
+
+    def region_codes(self, x, y, width, height):
+        """RoomType codes of a rectangle of the map, row by row, as bytes."""
+        cells = self.map_grid.cells
+        return b"".join(cells[row * self.width + x:row * self.width + x + width]
+                        for row in range(y, y + height))
 
     def display_map(self):
         for row in self.map_grid:
-            print(" | ".join(row))
+            print(" | ".join(room or OBSTACLE_LABEL for room in row))
 
     def move_player(self, direction):
-        """Move the player in the specified direction."""
-        if direction == "up" and self.player_y > 0:
-            self.player_y -= 1
-        elif direction == "down" and self.player_y < self.height - 1:
-            self.player_y += 1
-        elif direction == "left" and self.player_x > 0:
-            self.player_x -= 1
-        elif direction == "right" and self.player_x < self.width - 1:
-            self.player_x += 1
-        else:
-            print("You can't move in that direction.")
+        """Move the player in the specified direction; cells without a room block the way."""
+        x, y = self.player_x, self.player_y
+        if direction == "up" and y > 0:
+            y -= 1
+        elif direction == "down" and y < self.height - 1:
+            y += 1
+        elif direction == "left" and x > 0:
+            x -= 1
+        elif direction == "right" and x < self.width - 1:
+            x += 1
+        if (x, y) == (self.player_x, self.player_y) or self.get_code(x, y) == RoomType.NONE:
+            logger.info("You can't move in that direction.")
             return None
+        self.player_x, self.player_y = x, y
 
         current_room = self.map_grid[self.player_y][self.player_x]
-        print(f"You moved to a {current_room} room.")
+        logger.debug("You moved to a %s room.", current_room)
         return current_room
 
     def is_objective_reached(self):
         return self.player_x == self.objective_x and self.player_y == self.objective_y
 
+
+class ChunkedGameMap(GameMap):
+    """
+    GameMap for very large maps.  Rooms are generated per chunk from a hash of
+    (seed, chunk_x, chunk_y) the first time a chunk is looked at, so opening the map
+    costs nothing and only recently explored chunks stay in memory.  Rooms the game
+    changes (e.g. "Cleared") are kept separately, which lets any chunk be dropped and
+    regenerated later.  map_grid[y][x] keeps working as on a regular GameMap.
+    chunk_size only sets how much is generated and kept at a time: layouts come out the
+    same as a GameMap's whatever it is.  (Maps of the UNIFORM_GENERATOR hash their rooms
+    per chunk, so their saves record the chunk size.)
+    """
+
+    def __init__(self, width, height, mission_type, seed=None,
+                 chunk_size=CHUNK_SIZE, max_resident_chunks=MAX_RESIDENT_CHUNKS,
+                 generator=LAYOUT_GENERATOR, densities=None):
+        self.width = width
+        self.height = height
+        self.mission_type = mission_type
+        self.seed = seed if seed is not None else map_rng.getrandbits(64)
+        self.generator = generator
+        self.densities = densities
+        self.layout = None
+        if generator == LAYOUT_GENERATOR:
+            self.layout = MapLayout(width, height, mission_type, self.seed, densities)
+        self.chunk_size = chunk_size
+        self.max_resident_chunks = max_resident_chunks
+        self.chunks = OrderedDict()  # (chunk_x, chunk_y) -> bytes of generated RoomType codes
+        self.changes = {}  # (x, y) -> RoomType code that replaced the generated one
+        self.saved_changes = None  # Changed rooms still sitting in a save, read chunk by chunk
+        self.unpacked_chunks = set()
+        self.map_grid = ChunkedRows(self)
+        self.pathfinder = None
+        self.player_x = 0
+        self.player_y = 0
+        self.objective_x, self.objective_y = self.place_objective()
+        self.populate_map()
+
+    def _hash(self, *parts):
+        return seed_for(self.seed, *parts)
+
+    def place_objective(self):
+        """Place the objective deterministically from the map seed."""
+        if self.layout is not None:
+            return self.layout.objective
+        rng = random.Random(self._hash("objective"))
+        return rng.randint(0, self.width - 1), rng.randint(0, self.height - 1)
+
+    def populate_map(self):
+        """Pin the fixed rooms; everything else is generated on demand."""
+        self.changes[(self.objective_x, self.objective_y)] = RoomType.OBJECTIVE
+        self.changes[(0, 0)] = RoomType.START
+        self.changes[(self.width - 1, self.height - 1)] = RoomType.EXIT
+
+    def load_chunk(self, chunk_x, chunk_y):
+        """Return the generated rooms of a chunk, generating it if it isn't resident."""
+        key = (chunk_x, chunk_y)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if self.layout is not None:
+                size = self.chunk_size
+                chunk = self.layout.region(chunk_x * size, chunk_y * size, size, size)
+            else:
+                rng = random.Random(self._hash(chunk_x, chunk_y))
+                chunk = bytes(rng.choices(ROOM_TYPE_CODES, k=self.chunk_size * self.chunk_size))
+            self.chunks[key] = chunk
+            if len(self.chunks) > self.max_resident_chunks:
+                self.chunks.popitem(last=False)  # Evict the least recently used chunk
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def use_saved_changes(self, saved_changes):
+        """
+        Take the changed rooms from a save.  saved_changes.read(chunk_x, chunk_y) returns
+        one chunk's packed CHANGE_RECORDs (or None) and saved_changes.chunks() lists the
+        chunks that have any; a chunk is only read the first time the map uses it.
+        """
+        self.saved_changes = saved_changes
+        self.unpacked_chunks = set()
+
+    def unpack_changes(self, chunk_x, chunk_y):
+        if self.saved_changes is None or (chunk_x, chunk_y) in self.unpacked_chunks:
+            return
+        self.unpacked_chunks.add((chunk_x, chunk_y))
+        packed = self.saved_changes.read(chunk_x, chunk_y)
+        if packed is not None:
+            for x, y, code in CHANGE_RECORD.iter_unpack(packed):
+                self.changes.setdefault((x, y), code)  # Rooms changed since the save win
+
+    def all_changes(self):
+        """Every changed room, reading whatever is still in the save."""
+        if self.saved_changes is not None:
+            for chunk_x, chunk_y in self.saved_changes.chunks():
+                self.unpack_changes(chunk_x, chunk_y)
+            self.saved_changes = None
+        return self.changes
+
+    def get_code(self, x, y):
+        """RoomType code at (x, y)."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"Cell ({x}, {y}) is outside the map.")
+        if self.saved_changes is not None:
+            self.unpack_changes(x // self.chunk_size, y // self.chunk_size)
+        code = self.changes.get((x, y))
+        if code is not None:
+            return code
+        size = self.chunk_size
+        return self.load_chunk(x // size, y // size)[(y % size) * size + x % size]
+
+    def get_room(self, x, y):
+        return ROOM_NAMES[self.get_code(x, y)]
+
+    def set_room(self, x, y, room):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"Cell ({x}, {y}) is outside the map.")
+        self.changes[(x, y)] = ROOM_CODES[room]
+        if self.pathfinder is not None:
+            self.pathfinder.cell_changed(x, y)
+
+    def region_codes(self, x, y, width, height):
+        """RoomType codes of a rectangle of the map, row by row, as bytes."""
+        size = self.chunk_size
+        region = bytearray(width * height)
+        for chunk_y in range(y // size, (y + height - 1) // size + 1):
+            for chunk_x in range(x // size, (x + width - 1) // size + 1):
+                chunk = self.load_chunk(chunk_x, chunk_y)
+                self.unpack_changes(chunk_x, chunk_y)
+                left = max(x, chunk_x * size)
+                right = min(x + width, (chunk_x + 1) * size)
+                for row in range(max(y, chunk_y * size), min(y + height, (chunk_y + 1) * size)):
+                    start = (row % size) * size + left % size
+                    target = (row - y) * width + left - x
+                    region[target:target + right - left] = chunk[start:start + right - left]
+        for (change_x, change_y), code in self.changes.items():
+            if x <= change_x < x + width and y <= change_y < y + height:
+                region[(change_y - y) * width + change_x - x] = code
+        return bytes(region)
+
+    def display_map(self, radius=3):
+        """Print the rooms around the player; the whole map is far too big to print."""
+        for y in range(max(self.player_y - radius, 0), min(self.player_y + radius + 1, self.height)):
+            xs = range(max(self.player_x - radius, 0), min(self.player_x + radius + 1, self.width))
+            print(" | ".join(self.get_room(x, y) or OBSTACLE_LABEL for x in xs))
+
+
+class ChunkedRows:
+    """map_grid stand-in for ChunkedGameMap: map_grid[y][x] reads and writes single rooms."""
+
+    def __init__(self, game_map):
+        self.game_map = game_map
+
+    def __len__(self):
+        return self.game_map.height
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.game_map.height:
+            raise IndexError(f"Row {y} is outside the map.")
+        return ChunkedRow(self.game_map, y)
+
+    def __iter__(self):
+        for y in range(self.game_map.height):
+            yield ChunkedRow(self.game_map, y)
+
+
+class ChunkedRow:
+    def __init__(self, game_map, y):
+        self.game_map = game_map
+        self.y = y
+
+    def __len__(self):
+        return self.game_map.width
+
+    def __getitem__(self, x):
+        return self.game_map.get_room(x, self.y)
+
+    def __setitem__(self, x, room):
+        self.game_map.set_room(x, self.y, room)
+
+    def __iter__(self):
+        for x in range(self.game_map.width):
+            yield self.game_map.get_room(x, self.y)
+
+
+def create_game_map(width, height, mission_type, seed=None, densities=None):
+    """Build a GameMap, switching to the chunked variant for very large maps."""
+    if width * height > CHUNKED_MAP_THRESHOLD:
+        return ChunkedGameMap(width, height, mission_type, seed, densities=densities)
+    return GameMap(width, height, mission_type, seed, densities)
+
 # Example usage of map_bot.py
 def start_mission(player_character, mission_type, game_window):
+    from PyQt6.QtWidgets import QInputDialog  # Import QInputDialog for GUI input handling
+
     game_map = GameMap(5, 5, mission_type)  # Create a 5x5 grid with the given mission type
     mission = generate_mission(mission_type)  # Generate the mission using mission_bot
     game_window.update_map_display(game_map)  # Display the initial map
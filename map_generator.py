@@ -0,0 +1,298 @@
+# map_generator.py
+"""
+Seeded map layouts.
+
+A MapLayout turns (width, height, mission type, seed) into rooms, the same ones every time.
+Each mission type has a profile: how many cells are walls (RoomType.NONE), how common each
+room is near the start and how common far from it (the map gets harder as the player goes
+deeper), how far out the objective sits and how many extra corridors cut through the walls.
+
+Rooms are made 64x64 cells at a time: SHAKE-128 output seeded per chunk gives a byte per cell, and a
+256-entry translation table per difficulty band turns the bytes into room codes with
+bytes.translate, so the density targets hold to 1/256 and a 1000x1000 map takes tens of
+milliseconds.  Corridors are chains of straight runs from the start to the objective and on
+to the exit; walls on them are opened, so every layout can be finished.  That route is cut
+into legs of at most CORRIDOR_LEG cells between fixed waypoints, and the extra corridors
+start in a chunk and end within CORRIDOR_REACH of it, each seeded by its own position, so
+a chunk can work out the corridors crossing it without planning the rest of the map.
+Because each chunk only depends on the seed and its own position, ChunkedGameMap can make
+chunks on demand and get exactly the rooms a full GameMap of the same seed would have.
+"""
+
+import hashlib
+import random
+
+from rng import seed_for
+from room_grid import ROOM_CODES, RoomGrid, RoomType
+
+LAYOUT_CHUNK = 64  # Cells per side of the blocks that share one noise stream
+BANDS = 4  # Difficulty steps between the start corner and the far corner
+CORRIDOR_RUN = 8  # Longest straight stretch of a corridor
+CORRIDOR_LEG = 64  # Longest stretch of the start -> objective -> exit route between waypoints
+CORRIDOR_REACH = 64  # How far an extra corridor can end from the cell it starts at, per axis
+
+# Per mission type: wall fraction, room fractions as (near the start, far from it), the
+# objective's minimum distance from the start as a fraction of the map, and extra
+# corridors per LAYOUT_CHUNK x LAYOUT_CHUNK cells.  Whatever is left over is "Empty".
+MISSION_PROFILES = {
+    "rescue": {
+        "obstacles": 0.12,
+        "rooms": {"Enemy": (0.12, 0.25), "Trap": (0.05, 0.08), "Puzzle": (0.05, 0.05),
+                  "Item": (0.06, 0.06), "NPC": (0.03, 0.03)},
+        "objective_distance": 0.6,
+        "corridors": 4.0,
+    },
+    "exploration": {
+        "obstacles": 0.08,
+        "rooms": {"Enemy": (0.06, 0.12), "Trap": (0.04, 0.06), "Puzzle": (0.10, 0.10),
+                  "Item": (0.10, 0.12), "Treasure": (0.03, 0.06), "NPC": (0.03, 0.03)},
+        "objective_distance": 0.3,
+        "corridors": 8.0,
+    },
+    "stealth": {
+        "obstacles": 0.18,
+        "rooms": {"Enemy": (0.08, 0.18), "Trap": (0.10, 0.15), "Puzzle": (0.04, 0.04),
+                  "Item": (0.04, 0.04)},
+        "objective_distance": 0.7,
+        "corridors": 2.0,
+    },
+}
+DEFAULT_PROFILE = MISSION_PROFILES["exploration"]
+
+# Turns walls into empty rooms and leaves every other code alone
+OPEN_TABLE = bytes([RoomType.EMPTY]) + bytes(range(1, 256))
+
+_band_table_cache = {}  # (obstacles, rooms) -> tables
+
+
+def chunk_noise(seed, chunk_x, chunk_y, size, length):
+    """length pseudo-random bytes for one chunk; SHAKE-128 output, so any prefix is stable."""
+    key = f"{seed}:{chunk_x}:{chunk_y}:{size}".encode()
+    return hashlib.shake_128(key).digest(length)
+
+
+def make_profile(mission_type, densities=None):
+    """The mission type's profile with densities ({room name or "obstacles": fraction or (near, far)}) applied."""
+    base = MISSION_PROFILES.get(mission_type, DEFAULT_PROFILE)
+    profile = dict(base, rooms=dict(base["rooms"]))
+    for name, value in (densities or {}).items():
+        if name == "obstacles":
+            profile["obstacles"] = value
+        else:
+            profile["rooms"][name] = tuple(value) if isinstance(value, (tuple, list)) else (value, value)
+    return profile
+
+
+def band_tables(profile):
+    """One 256-byte translation table per difficulty band; cached, as layouts often share a profile."""
+    key = (profile["obstacles"], tuple(profile["rooms"].items()))
+    tables = _band_table_cache.get(key)
+    if tables is not None:
+        return tables
+    tables = []
+    for band in range(BANDS):
+        depth = band / (BANDS - 1) if BANDS > 1 else 0
+        table = bytearray([RoomType.EMPTY]) * 256
+        filled = 0
+        shares = [(RoomType.NONE, profile["obstacles"])]
+        shares += [(ROOM_CODES[name], near + (far - near) * depth)
+                   for name, (near, far) in profile["rooms"].items()]
+        for code, share in shares:
+            count = min(round(share * 256), 256 - filled)
+            table[filled:filled + count] = bytes([code]) * count
+            filled += count
+        tables.append(bytes(table))
+    _band_table_cache[key] = tables
+    return tables
+
+
+def staircase(rng, start, goal, max_run=CORRIDOR_RUN):
+    """Straight runs from start to goal, alternating between rows and columns."""
+    x, y = start
+    goal_x, goal_y = goal
+    runs = []  # ("row", y, x0, x1) or ("column", x, y0, y1), both ends included
+    across = rng.random() < 0.5
+    while (x, y) != (goal_x, goal_y):
+        if (across and x != goal_x) or y == goal_y:
+            step = min(rng.randint(1, max_run), abs(goal_x - x))
+            next_x = x + step if goal_x > x else x - step
+            runs.append(("row", y, min(x, next_x), max(x, next_x)))
+            x = next_x
+        else:
+            step = min(rng.randint(1, max_run), abs(goal_y - y))
+            next_y = y + step if goal_y > y else y - step
+            runs.append(("column", x, min(y, next_y), max(y, next_y)))
+            y = next_y
+        across = not across
+    return runs
+
+
+def run_in_box(run, left, top, right, bottom):
+    """Whether a run touches the cells left <= x < right, top <= y < bottom."""
+    kind, fixed, low, high = run
+    if kind == "row":
+        return top <= fixed < bottom and low < right and high >= left
+    return left <= fixed < right and low < bottom and high >= top
+
+
+class MapLayout:
+    """The rooms of one seeded map, produced chunk by chunk or for the whole grid."""
+
+    def __init__(self, width, height, mission_type, seed, densities=None, objective=None):
+        self.width = width
+        self.height = height
+        self.mission_type = mission_type
+        self.seed = seed
+        self.profile = make_profile(mission_type, densities)
+        self.tables = band_tables(self.profile)
+        rng = random.Random(seed_for(seed, "layout"))
+        self.objective = objective if objective is not None else self.place_objective(rng)
+        exit_cell = (width - 1, height - 1)
+        self.route = [((0, 0), self.objective), (self.objective, exit_cell)]
+
+    def place_objective(self, rng):
+        """A cell at least the profile's objective_distance out from the start corner."""
+        width, height = self.width, self.height
+        farthest = width + height - 2
+        nearest = int(self.profile["objective_distance"] * farthest)
+        for _ in range(32):
+            y = rng.randrange(height)
+            low = max(nearest - y, 0)
+            if low >= width:
+                continue
+            x = rng.randint(low, width - 1)
+            if (x, y) not in ((0, 0), (width - 1, height - 1)):
+                return x, y
+        return rng.randrange(width), rng.randrange(height)
+
+    def route_legs(self, left, top, right, bottom):
+        """Runs of the start -> objective -> exit route inside a box of cells."""
+        runs = []
+        for part, ((start_x, start_y), (goal_x, goal_y)) in enumerate(self.route):
+            span_x, span_y = goal_x - start_x, goal_y - start_y
+            legs = -(-max(abs(span_x), abs(span_y)) // CORRIDOR_LEG)
+            if not legs:
+                continue
+            # Waypoint i sits i/legs of the way along, so only the legs near where the
+            # longer axis crosses the box can reach it
+            if abs(span_x) >= abs(span_y):
+                ends = sorted(((left - start_x) * legs // span_x, (right - start_x) * legs // span_x))
+            else:
+                ends = sorted(((top - start_y) * legs // span_y, (bottom - start_y) * legs // span_y))
+            for leg in range(max(ends[0] - 2, 0), min(ends[1] + 2, legs - 1) + 1):
+                x0, y0 = start_x + span_x * leg // legs, start_y + span_y * leg // legs
+                x1, y1 = start_x + span_x * (leg + 1) // legs, start_y + span_y * (leg + 1) // legs
+                # A staircase stays inside its ends' box
+                if min(x0, x1) >= right or max(x0, x1) < left or min(y0, y1) >= bottom or max(y0, y1) < top:
+                    continue
+                rng = random.Random(seed_for(self.seed, "route", part, leg))
+                runs += [run for run in staircase(rng, (x0, y0), (x1, y1))
+                         if run_in_box(run, left, top, right, bottom)]
+        return runs
+
+    def extra_corridors(self, left, top, right, bottom):
+        """Runs of the extra corridors inside a box of cells."""
+        size, reach = LAYOUT_CHUNK, CORRIDOR_REACH
+        rate = self.profile["corridors"]
+        runs = []
+        for chunk_y in range(max(top - reach, 0) // size, (min(bottom + reach, self.height) - 1) // size + 1):
+            for chunk_x in range(max(left - reach, 0) // size, (min(right + reach, self.width) - 1) // size + 1):
+                chunk_left, chunk_top = chunk_x * size, chunk_y * size
+                columns = min(size, self.width - chunk_left)
+                rows = min(size, self.height - chunk_top)
+                rng = random.Random(seed_for(self.seed, "corridors", chunk_x, chunk_y))
+                # Chunks cut off by the map edge get their share of the corridors
+                expected = rate * columns * rows / (size * size)
+                count = int(expected) + (rng.random() < expected % 1)
+                for _ in range(count):
+                    x, y = chunk_left + rng.randrange(columns), chunk_top + rng.randrange(rows)
+                    goal = (min(max(x + rng.randint(-reach, reach), 0), self.width - 1),
+                            min(max(y + rng.randint(-reach, reach), 0), self.height - 1))
+                    runs += [run for run in staircase(rng, (x, y), goal)
+                             if run_in_box(run, left, top, right, bottom)]
+        return runs
+
+    def band_bounds(self):
+        """First x + y of each difficulty band, plus the end of the last one."""
+        span = self.width + self.height - 1
+        return [-(-band * span // BANDS) for band in range(BANDS)] + [span]
+
+    def runs_in_chunk(self, chunk_x, chunk_y):
+        """Every corridor run that crosses a chunk."""
+        size = LAYOUT_CHUNK
+        left, top = chunk_x * size, chunk_y * size
+        box = (left, top, min(left + size, self.width), min(top + size, self.height))
+        if box[2] <= left or box[3] <= top:
+            return []
+        return self.route_legs(*box) + self.extra_corridors(*box)
+
+    def chunk(self, chunk_x, chunk_y):
+        """
+        Room codes of a LAYOUT_CHUNK x LAYOUT_CHUNK chunk, row by row; cells past the map
+        edge stay walls.  The noise is keyed on the chunk size, so the layout is always made
+        in chunks of this one size; region() cuts other shapes out of them.
+        """
+        size = LAYOUT_CHUNK
+        left, top = chunk_x * size, chunk_y * size
+        right = min(left + size, self.width)
+        rows = max(min(size, self.height - top), 0)
+        noise = chunk_noise(self.seed, chunk_x, chunk_y, size, rows * size)
+        cells = bytearray(size * size)
+        bounds = self.band_bounds()
+        bounds[-1] = self.width + self.height + 2 * size  # The last band takes the rest of the chunk
+        tables = self.tables
+        for y in range(top, top + rows):
+            start = (y - top) * size - left
+            # Each band covers a stretch of the row, between two values of x + y
+            for band in range(BANDS):
+                first, end = max(left, bounds[band] - y), min(right, bounds[band + 1] - y)
+                if first < end:
+                    cells[start + first:start + end] = noise[start + first:start + end].translate(tables[band])
+        for kind, fixed, low, high in self.runs_in_chunk(chunk_x, chunk_y):
+            if kind == "row":
+                row = fixed - top
+                first, last = max(low, left) - left, min(high, left + size - 1) - left
+                segment = slice(row * size + first, row * size + last + 1)
+                cells[segment] = cells[segment].translate(OPEN_TABLE)
+            else:
+                column = fixed - left
+                for y in range(max(low, top), min(high, top + size - 1) + 1):
+                    index = (y - top) * size + column
+                    if cells[index] == RoomType.NONE:
+                        cells[index] = RoomType.EMPTY
+        return bytes(cells)
+
+    def region(self, left, top, width, height):
+        """Room codes of a rectangle, row by row, put together from the chunks it overlaps."""
+        size = LAYOUT_CHUNK
+        if width == height == size and left % size == 0 and top % size == 0:
+            return self.chunk(left // size, top // size)
+        cells = bytearray(width * height)
+        for chunk_y in range(top // size, (top + height - 1) // size + 1):
+            for chunk_x in range(left // size, (left + width - 1) // size + 1):
+                chunk = self.chunk(chunk_x, chunk_y)
+                first, end = max(left, chunk_x * size), min(left + width, (chunk_x + 1) * size)
+                for y in range(max(top, chunk_y * size), min(top + height, (chunk_y + 1) * size)):
+                    source = (y - chunk_y * size) * size + first - chunk_x * size
+                    target = (y - top) * width + first - left
+                    cells[target:target + end - first] = chunk[source:source + end - first]
+        return bytes(cells)
+
+    def fill(self, grid):
+        """Write the whole layout into a RoomGrid, with Start, Objective and Exit pinned."""
+        width, height, size = self.width, self.height, LAYOUT_CHUNK
+        for chunk_y in range((height + size - 1) // size):
+            for chunk_x in range((width + size - 1) // size):
+                chunk = self.chunk(chunk_x, chunk_y)
+                left = chunk_x * size
+                columns = min(size, width - left)
+                for row in range(min(size, height - chunk_y * size)):
+                    target = (chunk_y * size + row) * width + left
+                    grid.cells[target:target + columns] = chunk[row * size:row * size + columns]
+        grid.set(self.objective[0], self.objective[1], RoomType.OBJECTIVE)
+        grid.set(0, 0, RoomType.START)
+        grid.set(width - 1, height - 1, RoomType.EXIT)
+        return grid
+
+    def grid(self):
+        return self.fill(RoomGrid(self.width, self.height))
@@ -0,0 +1,205 @@
+# map_renderer.py
+"""
+Map view for grids too big for one QGraphicsRectItem per cell.
+
+MapView paints the map itself in drawBackground.  The map is cut into square chunks and
+each chunk becomes one indexed QImage built straight from the RoomType codes (one pixel
+per room), which is scaled up to TILE_SIZE when drawn.  Only the chunks under the visible
+viewport are drawn, so a frame costs the same on a 100x100 map as on a 10000x10000 one.
+Zoomed far out, the view switches to an aggregated overview image instead.
+"""
+
+import math
+from collections import OrderedDict
+
+from PyQt6.QtCore import QLineF, QRectF
+from PyQt6.QtGui import QColor, QImage, QPainter
+from PyQt6.QtWidgets import QGraphicsView
+
+from map_bot import CHUNK_SIZE
+from room_grid import ROOM_NAMES
+
+TILE_SIZE = 40
+
+# Tile colors for each room type; anything not listed is drawn white
+TILE_COLORS = {
+    "Start": "blue",
+    "Objective": "green",
+    "Exit": "green",
+    "Enemy": "red",
+    "Trap": "black",
+    "Treasure": "yellow",
+    "Item": "orange",
+    "Cleared": "lightgray",
+    "Empty": "white",
+    "NPC": "purple"
+}
+PLAYER_COLOR = "darkmagenta"
+OBSTACLE_COLOR = "dimgray"
+
+# Same as ChunkedGameMap chunks, so drawing one never generates its neighbours
+RENDER_CHUNK_SIZE = CHUNK_SIZE
+MAX_CHUNK_IMAGES = 512
+# Below this many screen pixels per tile the overview is drawn instead of chunks
+OVERVIEW_TILE_PIXELS = 2
+OVERVIEW_SIZE = 1024
+# Grid lines are only drawn once tiles are at least this many pixels wide
+GRID_LINE_TILE_PIXELS = 8
+ZOOM_STEP = 1.25
+
+
+def color_table():
+    """Indexed-image color table: entry i is the color of RoomType i."""
+    table = []
+    for name in ROOM_NAMES:
+        if name is None:
+            table.append(QColor(OBSTACLE_COLOR).rgb())
+        else:
+            table.append(QColor(TILE_COLORS.get(name, "white")).rgb())
+    return table + [QColor("white").rgb()] * (256 - len(table))
+
+
+def codes_to_image(codes, width, height, table):
+    """Wrap row-major RoomType codes in an indexed QImage that owns its own copy."""
+    image = QImage(codes, width, height, width, QImage.Format.Format_Indexed8)
+    image.setColorTable(table)
+    return image.copy()
+
+
+class MapView(QGraphicsView):
+    """QGraphicsView that draws a GameMap (or ChunkedGameMap) from cached chunk images."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.game_map = None
+        self.chunk_images = OrderedDict()  # (chunk_x, chunk_y) -> QImage
+        self.overview_image = None
+        self.table = color_table()
+        self.player_color = QColor(PLAYER_COLOR)
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+
+    def set_map(self, game_map):
+        """Start drawing game_map (None hands the view back to scene items)."""
+        self.game_map = game_map
+        self.chunk_images.clear()
+        self.overview_image = None
+        if self.scene() is None:
+            return
+        if game_map is None:
+            self.scene().setSceneRect(QRectF())
+        else:
+            self.scene().setSceneRect(0, 0, game_map.width * TILE_SIZE, game_map.height * TILE_SIZE)
+            self.center_on_player()
+        self.viewport().update()
+
+    def invalidate_cells(self, cells):
+        """Drop the cached images holding the given (x, y) cells and repaint."""
+        for x, y in cells:
+            self.chunk_images.pop((x // RENDER_CHUNK_SIZE, y // RENDER_CHUNK_SIZE), None)
+        self.overview_image = None
+        self.viewport().update()
+
+    def center_on_player(self):
+        if self.game_map is not None:
+            self.centerOn((self.game_map.player_x + 0.5) * TILE_SIZE,
+                          (self.game_map.player_y + 0.5) * TILE_SIZE)
+
+    def tile_pixels(self):
+        """How many screen pixels one tile currently covers."""
+        return TILE_SIZE * self.transform().m11()
+
+    def chunk_rect(self, chunk_x, chunk_y):
+        """Cells covered by a render chunk, clipped to the map: (x, y, width, height)."""
+        x, y = chunk_x * RENDER_CHUNK_SIZE, chunk_y * RENDER_CHUNK_SIZE
+        return (x, y, min(RENDER_CHUNK_SIZE, self.game_map.width - x),
+                min(RENDER_CHUNK_SIZE, self.game_map.height - y))
+
+    def chunk_target(self, chunk_x, chunk_y):
+        """Scene rectangle a render chunk is drawn into."""
+        x, y, width, height = self.chunk_rect(chunk_x, chunk_y)
+        return QRectF(x * TILE_SIZE, y * TILE_SIZE, width * TILE_SIZE, height * TILE_SIZE)
+
+    def chunk_image(self, chunk_x, chunk_y):
+        key = (chunk_x, chunk_y)
+        image = self.chunk_images.get(key)
+        if image is not None:
+            self.chunk_images.move_to_end(key)
+            return image
+        x, y, width, height = self.chunk_rect(chunk_x, chunk_y)
+        image = codes_to_image(self.game_map.region_codes(x, y, width, height), width, height, self.table)
+        self.chunk_images[key] = image
+        if len(self.chunk_images) > MAX_CHUNK_IMAGES:
+            self.chunk_images.popitem(last=False)
+        return image
+
+    def build_overview(self):
+        """One small image of the whole map, sampling a room from every block of cells."""
+        step = max(math.ceil(max(self.game_map.width, self.game_map.height) / OVERVIEW_SIZE), 1)
+        cells = self.game_map.map_grid.cells
+        width = self.game_map.width
+        rows = [cells[y * width:(y + 1) * width:step] for y in range(0, self.game_map.height, step)]
+        return codes_to_image(b"".join(rows), len(rows[0]), len(rows), self.table)
+
+    def drawBackground(self, painter, rect):
+        if self.game_map is None:
+            super().drawBackground(painter, rect)
+            return
+
+        painter.fillRect(rect, QColor(OBSTACLE_COLOR))
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
+        map_rect = QRectF(0, 0, self.game_map.width * TILE_SIZE, self.game_map.height * TILE_SIZE)
+        visible = rect.intersected(map_rect)
+        if visible.isEmpty():
+            return
+
+        if self.tile_pixels() < OVERVIEW_TILE_PIXELS:
+            self.draw_overview(painter, visible, map_rect)
+            return
+
+        chunk_span = RENDER_CHUNK_SIZE * TILE_SIZE
+        first_x, last_x = int(visible.left() // chunk_span), int((visible.right() - 1) // chunk_span)
+        first_y, last_y = int(visible.top() // chunk_span), int((visible.bottom() - 1) // chunk_span)
+        for chunk_y in range(first_y, last_y + 1):
+            for chunk_x in range(first_x, last_x + 1):
+                painter.drawImage(self.chunk_target(chunk_x, chunk_y), self.chunk_image(chunk_x, chunk_y))
+
+        if self.tile_pixels() >= GRID_LINE_TILE_PIXELS:
+            self.draw_grid_lines(painter, visible)
+
+    def draw_overview(self, painter, visible, map_rect):
+        if hasattr(self.game_map, "chunks"):
+            # Sampling a chunked map would generate all of it; show the resident chunks only
+            for chunk_x, chunk_y in list(self.game_map.chunks):
+                target = self.chunk_target(chunk_x, chunk_y)
+                if target.intersects(visible):
+                    painter.drawImage(target, self.chunk_image(chunk_x, chunk_y))
+            return
+        if self.overview_image is None:
+            self.overview_image = self.build_overview()
+        painter.drawImage(map_rect, self.overview_image)
+
+    def draw_grid_lines(self, painter, visible):
+        """Outline the visible tiles with one line per row and column."""
+        first_x, last_x = int(visible.left() // TILE_SIZE), int(math.ceil(visible.right() / TILE_SIZE))
+        first_y, last_y = int(visible.top() // TILE_SIZE), int(math.ceil(visible.bottom() / TILE_SIZE))
+        lines = [QLineF(x * TILE_SIZE, first_y * TILE_SIZE, x * TILE_SIZE, last_y * TILE_SIZE)
+                 for x in range(first_x, last_x + 1)]
+        lines += [QLineF(first_x * TILE_SIZE, y * TILE_SIZE, last_x * TILE_SIZE, y * TILE_SIZE)
+                  for y in range(first_y, last_y + 1)]
+        painter.setPen(QColor("black"))
+        painter.drawLines(lines)
+
+    def drawForeground(self, painter, rect):
+        super().drawForeground(painter, rect)
+        if self.game_map is not None:
+            painter.fillRect(QRectF(self.game_map.player_x * TILE_SIZE, self.game_map.player_y * TILE_SIZE,
+                                    TILE_SIZE, TILE_SIZE), self.player_color)
+
+    def wheelEvent(self, event):
+        if self.game_map is None:
+            super().wheelEvent(event)
+            return
+        factor = ZOOM_STEP if event.angleDelta().y() > 0 else 1 / ZOOM_STEP
+        self.scale(factor, factor)
+        self.viewport().update()
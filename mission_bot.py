@@ -1,33 +1,39 @@
 # mission_bot.py
 
-import random
-from events import perform_skill_check  # Ensure this matches the updated function in events.py
+from events import event_data, perform_skill_check  # Ensure this matches the updated function in events.py
+from game_log import get_logger
+from map_generator import MapLayout
+from rng import stream
+from room_grid import RoomType
+
+# Densities for Mission grids: every room can be walked and 20% hold an encounter
+MISSION_GRID_DENSITIES = {"obstacles": 0, "Enemy": 0.04, "Trap": 0.04, "Treasure": 0.04,
+                          "Puzzle": 0.04, "NPC": 0.04, "Item": 0}
+
+logger = get_logger(__name__)
+loot = stream("loot")
+dialogue_rng = stream("dialogue")
 
 class Mission:
-    def __init__(self, mission_type):
+    def __init__(self, mission_type, seed=None):
         self.mission_type = mission_type
+        self.seed = seed if seed is not None else stream("map").getrandbits(64)
         self.grid = self.generate_mission_grid()
         self.current_position = (0, 0)
         self.objective_position = (len(self.grid) - 1, len(self.grid[0]) - 1)
         self.completed = False
 
     def generate_mission_grid(self, width=5, height=5):
-        """Generate a random mission grid with different encounters."""
-        grid = [["Empty" for _ in range(width)] for _ in range(height)]
-        grid[0][0] = "Start"
-        grid[height - 1][width - 1] = "Objective"
-
-        item_types = ["Enemy", "Trap", "Treasure", "Puzzle", "NPC"]
-        for y in range(height):
-            for x in range(width):
-                if grid[y][x] == "Empty" and random.random() < 0.2:
-                    grid[y][x] = random.choice(item_types)
-
+        """Generate the seeded mission grid: no walls, encounters in a fifth of the rooms."""
+        layout = MapLayout(width, height, self.mission_type, self.seed, MISSION_GRID_DENSITIES,
+                           objective=(width - 1, height - 1))
+        grid = layout.grid()
+        grid.set(width - 1, height - 1, RoomType.OBJECTIVE)  # The exit corner is the objective here
         return grid
 
     def perform_turn(self, direction, player_character):
         """Move the player in the specified direction and handle encounters."""
-        print(f"Player attempting to move {direction}")
+        logger.debug("Player attempting to move %s", direction)
         x, y = self.current_position
 
         if direction == "Move North" and y > 0:
@@ -43,13 +49,13 @@ class Mission:
 
         self.current_position = (x, y)
         encounter = self.grid[y][x]
-        print(f"Moved to position {self.current_position}, encountered {encounter}")
+        logger.debug("Moved to position %s, encountered %s", self.current_position, encounter)
         encounter_result = self.handle_encounter(encounter, player_character)
 
         # Check if the mission is complete
         if self.current_position == self.objective_position:
             self.completed = True
-            print(f"Mission objective reached at position {self.objective_position}")
+            logger.debug("Mission objective reached at position %s", self.objective_position)
             return f"Mission completed! You have reached the objective. {encounter_result}"
 
         return encounter_result
@@ -71,63 +77,66 @@ class Mission:
 
     def handle_combat(self, player_character):
         """Handle combat encounters."""
-        result = perform_skill_check(player_character, "Strength", difficulty=12)
+        event = event_data["Enemy"]
+        result = perform_skill_check(player_character, event["skill"], difficulty=event["difficulty"])
         if result:
-            player_character['xp'] += 20
-            return "You defeated the enemy and gained 20 XP!"
+            player_character.xp += event["xp_reward"]
+            return f"You defeated the enemy and gained {event['xp_reward']} XP!"
         else:
-            player_character['health'] -= 15
-            return "The enemy overpowered you, and you lost 15 health."
+            player_character.health -= event["failure_penalty"]
+            return f"The enemy overpowered you, and you lost {event['failure_penalty']} health."
 
     def handle_trap(self, player_character):
         """Handle trap encounters."""
-        print(f"Handling trap encounter for player at position {self.current_position}")
+        logger.debug("Handling trap encounter for player at position %s", self.current_position)
 
         # Perform skill check
-        result = perform_skill_check(player_character, "Agility", difficulty=10)
+        event = event_data["Trap"]
+        result = perform_skill_check(player_character, event["skill"], difficulty=event["difficulty"])
 
         if result:
-            player_character['xp'] += 15
-            print("Trap successfully disarmed. Gained 15 XP.")
-            return "You avoided the trap and gained 15 XP!"
+            player_character.xp += event["xp_reward"]
+            logger.debug("Trap successfully disarmed. Gained %s XP.", event['xp_reward'])
+            return f"You avoided the trap and gained {event['xp_reward']} XP!"
         else:
-            player_character['health'] -= 10
-            print(f"Trap triggered! Player health is now {player_character['health']}")
+            player_character.health -= event["failure_penalty"]
+            logger.debug("Trap triggered! Player health is now %s", player_character.health)
 
             # Check if health goes below zero
-            if player_character['health'] <= 0:
-                print("Player health reached 0 or below. Game over condition.")
-                return "You were caught in the trap and lost 10 health! You have died."
+            if player_character.health <= 0:
+                logger.info("Player health reached 0 or below. Game over condition.")
+                return f"You were caught in the trap and lost {event['failure_penalty']} health! You have died."
 
-            return "You were caught in the trap and lost 10 health."
+            return f"You were caught in the trap and lost {event['failure_penalty']} health."
 
     def handle_puzzle(self, player_character):
         """Handle puzzle encounters."""
-        result = perform_skill_check(player_character, "Intelligence", difficulty=14)
+        event = event_data["Puzzle"]
+        result = perform_skill_check(player_character, event["skill"], difficulty=event["difficulty"])
         if result:
-            player_character['xp'] += 25
-            return "You solved the puzzle and gained 25 XP!"
+            player_character.xp += event["xp_reward"]
+            return f"You solved the puzzle and gained {event['xp_reward']} XP!"
         else:
-            player_character['health'] -= 5
-            return "The puzzle was too complex, and you lost 5 health trying to solve it."
+            player_character.health -= event["failure_penalty"]
+            return f"The puzzle was too complex, and you lost {event['failure_penalty']} health trying to solve it."
 
     def handle_treasure(self, player_character):
         """Handle finding a treasure."""
-        found_item = random.choice(["Healing Potion", "Energy Crystal", "Rare Artifact"])
-        player_character['items'].append(found_item)
-        player_character['xp'] += 10
+        found_item = loot.choice(["Healing Potion", "Energy Crystal", "Rare Artifact"])
+        player_character.items.add(found_item)
+        player_character.xp += 10
         return f"You found a treasure containing a {found_item}! You gained 10 XP."
 
     def handle_npc_interaction(self, player_character):
         """Handle interaction with NPCs."""
-        dialogue = random.choice([
+        dialogue = dialogue_rng.choice([
             "The NPC offers you guidance on your mission.",
             "The NPC provides you with a healing potion.",
             "The NPC tells you about a hidden treasure nearby."
         ])
         if "healing potion" in dialogue.lower():
-            player_character['items'].append("Healing Potion")
-        player_character['xp'] += 10
+            player_character.items.add("Healing Potion")
+        player_character.xp += 10
         return f"You interacted with an NPC: {dialogue}. You gained 10 XP."
 
     def get_current_state(self):
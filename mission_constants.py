@@ -0,0 +1,29 @@
+# mission_constants.py
+
+# Fixed lines GameWindow speaks; kept here so they can be pre-rendered to audio
+EMPTY_NAME_MESSAGE = "Character name cannot be empty."
+NEED_CHARACTER_MESSAGE = "You need to create a character before starting a mission or exploring."
+CREATE_CHARACTER_PROMPT = "Please create your character."
+MISSION_STARTED_MESSAGE = "Mission started. Good luck!"
+MISSION_ENDED_MESSAGE = "Mission ended."
+EXIT_MESSAGE = "Exiting game."
+MISSION_COMPLETE_PREFIX = "Mission Complete: "
+MOVE_MESSAGES = {
+    "Move North": "Moving North",
+    "Move South": "Moving South",
+    "Move East": "Moving East",
+    "Move West": "Moving West"
+}
+
+# Skills a new character gets (each rolled 5-15) and the items it starts with
+CHARACTER_SKILLS = ["Strength", "Agility", "Intelligence", "Charisma", "Endurance", "Dexterity"]
+STARTING_ITEMS = ["Basic Sword", "Shield"]
+
+SPOKEN_UI_LINES = [
+    EMPTY_NAME_MESSAGE,
+    NEED_CHARACTER_MESSAGE,
+    CREATE_CHARACTER_PROMPT,
+    MISSION_STARTED_MESSAGE,
+    MISSION_ENDED_MESSAGE,
+    EXIT_MESSAGE
+] + list(MOVE_MESSAGES.values())
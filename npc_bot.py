@@ -1,5 +1,7 @@
 # npc_bot.py
-import random
+from rng import stream
+
+dialogue_rng = stream("dialogue")
 
 npc_dialogues = {
     "Trader": [
@@ -16,5 +18,5 @@ npc_dialogues = {
 
 def interact_with_npc(npc_name):
     """Interact with an NPC and return their dialogue."""
-    dialogue = random.choice(npc_dialogues.get(npc_name, ["The NPC remains silent."]))
+    dialogue = dialogue_rng.choice(npc_dialogues.get(npc_name, ["The NPC remains silent."]))
     return dialogue
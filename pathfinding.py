@@ -0,0 +1,435 @@
+# pathfinding.py
+"""
+Shortest paths and reachability on game maps.
+
+Only cells without a room (RoomType.NONE) block movement.  A Pathfinder answers single
+questions ("how do I get from here to there?") with A*, and keeps distance fields: the
+BFS distance from every cell to one target such as the objective or the exit.  A field
+costs one pass over the map (on large maps, over the window the search needs) to build
+and then answers "how far?" and "which way?" for any cell at once.  When a cell opens up
+or gets blocked, the fields are repaired around it instead of rebuilt, so map edits stay
+cheap even on 1000x1000 maps.
+
+Cells are handled by their index in the window internally; the public methods take (x, y).
+"""
+
+import heapq
+from array import array
+
+from room_grid import RoomType
+
+# Byte translation table: RoomType code -> 1 if the player can stand there, else 0
+PASSABLE = bytes(0 if code == RoomType.NONE else 1 for code in range(256))
+# Maps up to this size get one mask over the whole map; bigger ones a window around the search
+FULL_MASK_CELLS = 256 * 256
+WINDOW_MARGIN = 64  # Cells of room left around the start and goal when a window is made
+# Distance fields never cover more than this; farther goals are found with A*
+MAX_WINDOW_CELLS = 1024 * 1024
+MAX_ROUTE_CELLS = 1024 * 1024  # Cells A* may visit before giving up on a goal as too far
+UNREACHABLE = -1
+# Directions as GameMap.move_player spells them, with their (dx, dy)
+DIRECTIONS = {"up": (0, -1), "down": (0, 1), "left": (-1, 0), "right": (1, 0)}
+COMPASS = {"up": "North", "down": "South", "left": "West", "right": "East"}
+
+
+class SearchTooLarge(Exception):
+    """The goal is too far away to find a path to within MAX_ROUTE_CELLS."""
+
+
+def neighbours(index, width, height):
+    """Indexes of the cells next to index (no diagonals)."""
+    x = index % width
+    if x > 0:
+        yield index - 1
+    if x < width - 1:
+        yield index + 1
+    if index >= width:
+        yield index - width
+    if index < width * (height - 1):
+        yield index + width
+
+
+class DistanceField:
+    """BFS distance of every cell to one target cell; UNREACHABLE where there is no path."""
+
+    def __init__(self, mask, width, height, target):
+        self.mask = mask
+        self.width = width
+        self.height = height
+        self.target = target
+        self.distances = array("i", [UNREACHABLE]) * (width * height)
+        if mask[target]:
+            self.fill()
+
+    def fill(self):
+        """BFS from the target over the whole map, ticking cells off in a copy of the mask."""
+        distances, width = self.distances, self.width
+        unvisited = bytearray(self.mask)
+        unvisited[self.target] = 0
+        distances[self.target] = 0
+        last_row = width * (self.height - 1)
+        frontier = [self.target]
+        distance = 0
+        while frontier:
+            distance += 1
+            following = []
+            found = following.append
+            for index in frontier:
+                x = index % width
+                if x and unvisited[index - 1]:
+                    unvisited[index - 1] = 0
+                    found(index - 1)
+                if x != width - 1 and unvisited[index + 1]:
+                    unvisited[index + 1] = 0
+                    found(index + 1)
+                if index >= width and unvisited[index - width]:
+                    unvisited[index - width] = 0
+                    found(index - width)
+                if index < last_row and unvisited[index + width]:
+                    unvisited[index + width] = 0
+                    found(index + width)
+            for index in following:
+                distances[index] = distance
+            frontier = following
+
+    def spread(self, frontier):
+        """Breadth-first from frontier, lowering distances that a shorter path now reaches."""
+        distances, mask, width, height = self.distances, self.mask, self.width, self.height
+        last_row = width * (height - 1)
+        while frontier:
+            following = []
+            for index in frontier:
+                step = distances[index] + 1
+                x = index % width
+                for other in (index - 1 if x > 0 else -1, index + 1 if x < width - 1 else -1,
+                              index - width, index + width if index < last_row else -1):
+                    if other >= 0 and mask[other]:
+                        current = distances[other]
+                        if current == UNREACHABLE or current > step:
+                            distances[other] = step
+                            following.append(other)
+            frontier = following
+
+    def __getitem__(self, index):
+        return self.distances[index]
+
+    def opened(self, index):
+        """index became passable: distances can only shrink, starting next to it."""
+        best = min((self.distances[other] for other in neighbours(index, self.width, self.height)
+                    if self.distances[other] != UNREACHABLE), default=None)
+        if index == self.target:
+            self.distances[index] = 0
+        elif best is None:
+            return
+        else:
+            self.distances[index] = best + 1
+        self.spread([index])
+
+    def closed(self, index):
+        """index became blocked: re-route the cells whose shortest paths went through it."""
+        distances, width, height = self.distances, self.width, self.height
+        if distances[index] == UNREACHABLE:
+            return
+        if index == self.target:
+            self.distances = array("i", [UNREACHABLE]) * (width * height)
+            return
+        # Cells whose every shortest route runs through index, found level by level
+        lost = {index}
+        level = [index]
+        while level:
+            candidates = set()
+            for cell in level:
+                for other in neighbours(cell, width, height):
+                    if other not in lost and distances[other] == distances[cell] + 1:
+                        candidates.add(other)
+            level = [cell for cell in candidates
+                     if not any(distances[other] == distances[cell] - 1 and other not in lost
+                                for other in neighbours(cell, width, height))]
+            lost.update(level)
+        for cell in lost:
+            distances[cell] = UNREACHABLE
+        # Refill them from the cells around them that kept their distance
+        queue = []
+        for cell in lost:
+            if cell == index:
+                continue
+            best = min((distances[other] for other in neighbours(cell, width, height)
+                        if other not in lost and distances[other] != UNREACHABLE), default=None)
+            if best is not None:
+                queue.append((best + 1, cell))
+        heapq.heapify(queue)
+        while queue:
+            distance, cell = heapq.heappop(queue)
+            current = distances[cell]
+            if current != UNREACHABLE and current <= distance:
+                continue
+            distances[cell] = distance
+            for other in neighbours(cell, width, height):
+                if self.mask[other] and (distances[other] == UNREACHABLE or distances[other] > distance + 1):
+                    heapq.heappush(queue, (distance + 1, other))
+
+
+class Pathfinder:
+    """
+    Paths and distance fields for one GameMap (or ChunkedGameMap).  The map creates it on
+    first use (game_map.paths()) and reports changed rooms to it through cell_changed().
+
+    Maps up to FULL_MASK_CELLS get one passability mask over the whole map.  On bigger maps
+    the mask only covers a window around the cells being searched, widened when a search
+    doesn't reach its start, so a ChunkedGameMap only generates the chunks near the player.
+    A path through a window is the shortest inside it; WINDOW_MARGIN leaves enough room
+    around the start and goal that a shorter one outside is rare.
+    Goals too far away for a window of MAX_WINDOW_CELLS are found with A*, and the route is
+    kept so that following it step by step costs nothing.  If A* would have to visit more
+    than MAX_ROUTE_CELLS cells, distance() and next_step() raise SearchTooLarge.
+    """
+
+    def __init__(self, game_map):
+        self.game_map = game_map
+        self.width = game_map.width
+        self.height = game_map.height
+        self.mask = None  # One byte per cell of the window, 1 where passable; built when first needed
+        self.window = None  # (left, top, width, height) of the map the mask covers
+        self.blocked = None  # Number of blocked cells in the mask
+        self.fields = {}  # target index in the window -> DistanceField
+        self.route = None  # {(x, y): steps left} of the last A* path, and its goal
+        self.route_goal = None
+        self.too_far = None  # (goal, straight-line distance) of the last A* search that gave up
+
+    def in_window(self, x, y):
+        left, top, width, height = self.window
+        return left <= x < left + width and top <= y < top + height
+
+    def index(self, x, y):
+        """Index of (x, y) in the window's mask and fields."""
+        left, top, width, _ = self.window
+        return (y - top) * width + x - left
+
+    def passability_mask(self, cells=()):
+        """
+        The passable-cell mask over a window holding every (x, y) in cells, widening the
+        window if needed; None if that window would be bigger than MAX_WINDOW_CELLS.
+        """
+        if self.mask is not None and all(self.in_window(x, y) for x, y in cells):
+            return self.mask
+        if self.width * self.height <= FULL_MASK_CELLS:
+            return self.build_mask((0, 0, self.width, self.height))
+        if not cells:
+            return None
+        if self.window is not None:
+            # Grow the current window to take the cells in, or else start a new one around them
+            left, top, width, height = self.window
+            corners = [(left, top), (left + width - 1, top + height - 1)]
+            if self.build_mask(self.window_around(list(cells) + corners)) is not None:
+                return self.mask
+        return self.build_mask(self.window_around(cells))
+
+    def window_around(self, cells):
+        """The window holding cells with WINDOW_MARGIN to spare, cut off at the map's edges."""
+        xs = [x for x, _ in cells]
+        ys = [y for _, y in cells]
+        left, top = max(min(xs) - WINDOW_MARGIN, 0), max(min(ys) - WINDOW_MARGIN, 0)
+        right, bottom = min(max(xs) + WINDOW_MARGIN + 1, self.width), min(max(ys) + WINDOW_MARGIN + 1, self.height)
+        return left, top, right - left, bottom - top
+
+    def build_mask(self, window):
+        """Make window the searched part of the map; the old mask stays if window is too big."""
+        left, top, width, height = window
+        if width * height > MAX_WINDOW_CELLS:
+            return None
+        codes = self.game_map.region_codes(left, top, width, height)
+        self.mask = bytearray(codes.translate(PASSABLE))
+        self.window = window
+        self.blocked = self.mask.count(0)
+        self.fields = {}
+        return self.mask
+
+    def widen(self):
+        """Double the window each way (within the map); False if it can't grow any more."""
+        left, top, width, height = self.window
+        if (width, height) == (self.width, self.height):
+            return False
+        new_left, new_top = max(left - width // 2, 0), max(top - height // 2, 0)
+        new_right = min(left + width + width // 2 + 1, self.width)
+        new_bottom = min(top + height + height // 2 + 1, self.height)
+        return self.build_mask((new_left, new_top, new_right - new_left, new_bottom - new_top)) is not None
+
+    def whole_map(self):
+        return self.window == (0, 0, self.width, self.height)
+
+    def open_ground(self):
+        """True if nothing in the window blocks movement, so every Manhattan route in it is a shortest path."""
+        return self.mask is not None and self.blocked == 0
+
+    def is_passable(self, x, y):
+        if self.mask is not None and self.in_window(x, y):
+            return bool(self.mask[self.index(x, y)])
+        return bool(PASSABLE[self.game_map.get_code(x, y)])
+
+    def cell_changed(self, x, y):
+        """Bring the mask, the distance fields and the kept route up to date after the room at (x, y) changed."""
+        if self.route is not None and PASSABLE[self.game_map.get_code(x, y)] != ((x, y) in self.route):
+            self.route = self.route_goal = None  # The route may be blocked, or a shorter one opened
+        if self.mask is None or not self.in_window(x, y):
+            return
+        index = self.index(x, y)
+        passable = PASSABLE[self.game_map.get_code(x, y)]
+        if passable == self.mask[index]:
+            return  # One kind of room became another; paths stay the same
+        self.mask[index] = passable
+        self.blocked += -1 if passable else 1
+        for field in self.fields.values():
+            if passable:
+                field.opened(index)
+            else:
+                field.closed(index)
+
+    def distance_field(self, x, y):
+        """Cached DistanceField (over the window) towards (x, y); None if no window can hold it."""
+        if self.passability_mask(((x, y),)) is None:
+            return None
+        index = self.index(x, y)
+        field = self.fields.get(index)
+        if field is None:
+            _, _, width, height = self.window
+            field = self.fields[index] = DistanceField(self.mask, width, height, index)
+        return field
+
+    def field_from(self, start, goal):
+        """
+        The goal's distance field over a window that reaches start, or the whole map if
+        nothing does; None if the window would get too big.
+        """
+        if self.passability_mask((start, goal)) is None:
+            return None
+        while True:
+            field = self.distance_field(*goal)
+            if field[self.index(*start)] != UNREACHABLE or self.whole_map():
+                return field
+            if not self.widen():
+                return None
+
+    def routed_distance(self, start, goal):
+        """Steps from start to goal along the kept A* route, finding a new route if needed."""
+        if self.route_goal != goal or start not in self.route:
+            gap = abs(goal[0] - start[0]) + abs(goal[1] - start[1])
+            # Don't search again for a goal that was too far until half the gap is closed
+            if self.too_far is not None and self.too_far[0] == goal and gap > self.too_far[1] // 2:
+                raise SearchTooLarge(f"{goal} is too far from {start} to search")
+            try:
+                path = self.find_path(start, goal)
+            except SearchTooLarge:
+                self.too_far = (goal, gap)
+                raise
+            if path is None:
+                return None
+            self.route = {cell: len(path) - 1 - step for step, cell in enumerate(path)}
+            self.route_goal = goal
+        return self.route[start]
+
+    def distance(self, start, goal):
+        """Steps on the shortest path from start to goal, or None if goal can't be reached."""
+        if self.passability_mask((start, goal)) is not None and self.open_ground():
+            return abs(goal[0] - start[0]) + abs(goal[1] - start[1])
+        field = self.field_from(start, goal)
+        if field is None:
+            return self.routed_distance(start, goal)
+        distance = field[self.index(*start)]
+        return None if distance == UNREACHABLE else distance
+
+    def is_reachable(self, start, goal):
+        return self.distance(start, goal) is not None
+
+    def find_path(self, start, goal):
+        """
+        A* shortest path as a list of (x, y) from start to goal inclusive, or None if there
+        is none; SearchTooLarge if finding out means visiting more than MAX_ROUTE_CELLS cells.
+        """
+        width, height = self.width, self.height
+        if not (self.is_passable(*start) and self.is_passable(*goal)):
+            return None
+        goal_x, goal_y = goal
+        start_index = start[1] * width + start[0]
+        goal_index = goal_y * width + goal_x
+        came_from = {start_index: None}
+        cost = {start_index: 0}
+        # Ties on f go to the cell nearest the goal, so open ground is crossed in a straight line
+        heuristic = abs(goal_x - start[0]) + abs(goal_y - start[1])
+        queue = [(heuristic, heuristic, start_index)]
+        while queue:
+            _, _, index = heapq.heappop(queue)
+            if index == goal_index:
+                path = []
+                while index is not None:
+                    path.append((index % width, index // width))
+                    index = came_from[index]
+                return path[::-1]
+            step = cost[index] + 1
+            for other in neighbours(index, width, height):
+                if other in cost and cost[other] <= step:
+                    continue
+                x, y = other % width, other // width
+                if not self.is_passable(x, y):
+                    continue
+                if len(cost) >= MAX_ROUTE_CELLS:
+                    raise SearchTooLarge(f"No path from {start} to {goal} within {MAX_ROUTE_CELLS} cells")
+                cost[other] = step
+                came_from[other] = index
+                heuristic = abs(goal_x - x) + abs(goal_y - y)
+                heapq.heappush(queue, (step + heuristic, heuristic, other))
+        return None
+
+    def next_step(self, start, goal):
+        """The move_player direction of the first step from start towards goal, or None."""
+        if start == goal:
+            return None
+        x, y = start
+        if self.passability_mask((start, goal)) is not None and self.open_ground():
+            if x != goal[0]:
+                return "right" if x < goal[0] else "left"
+            return "down" if y < goal[1] else "up"
+        field = self.field_from(start, goal)
+        if field is None:
+            steps = self.routed_distance(start, goal)
+            if steps is None:
+                return None
+            return next(direction for direction, (dx, dy) in DIRECTIONS.items()
+                        if self.route.get((x + dx, y + dy)) == steps - 1)
+        here = field[self.index(x, y)]
+        if here == UNREACHABLE:
+            return None
+        for direction, (dx, dy) in DIRECTIONS.items():
+            next_x, next_y = x + dx, y + dy
+            if self.in_window(next_x, next_y) and field[self.index(next_x, next_y)] == here - 1:
+                return direction
+        return None
+
+    def is_solvable(self):
+        """Whether the objective and the exit can both be reached from the start corner."""
+        game_map = self.game_map
+        start = (0, 0)
+        return (self.is_reachable(start, (game_map.objective_x, game_map.objective_y))
+                and self.is_reachable(start, (game_map.width - 1, game_map.height - 1)))
+
+
+def path_hint(game_map):
+    """A line telling the player how far the objective is and which way to head."""
+    paths = game_map.paths()
+    position = (game_map.player_x, game_map.player_y)
+    objective = (game_map.objective_x, game_map.objective_y)
+    try:
+        distance = paths.distance(position, objective)
+    except SearchTooLarge:
+        # Too far to search: the straight-line distance is the least it can be
+        dx, dy = objective[0] - position[0], objective[1] - position[1]
+        if abs(dx) >= abs(dy):
+            direction = "right" if dx > 0 else "left"
+        else:
+            direction = "down" if dy > 0 else "up"
+        return f"The objective is at least {abs(dx) + abs(dy)} steps away. Head {COMPASS[direction]}."
+    if distance is None:
+        return "There is no way to reach the objective from here."
+    if distance == 0:
+        return "You are standing on the objective."
+    direction = COMPASS[paths.next_step(position, objective)]
+    return f"The objective is {distance} {'step' if distance == 1 else 'steps'} away. Head {direction}."
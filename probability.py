@@ -0,0 +1,150 @@
+# probability.py
+"""
+Exact odds for skill checks and whole missions, without rolling any dice.
+
+A d20 check is uniform over 20 faces, so every success chance is a multiple of 1/20 and
+can be tabulated once.  Walking a GameMap route then only needs the distribution of the
+character's health from room to room, which gives the survival chance and expected XP
+for the whole map in one pass.
+"""
+
+from fractions import Fraction
+from functools import lru_cache
+
+import game_log
+from dice_roll import SUCCESS_THRESHOLD
+from events import event_data
+from headless import CLEARABLE_ROOMS, along_shortest_path, first_option_policy
+
+DIE_SIDES = 20
+SKILL_RANGE = range(0, 31)
+
+# Options that trigger_event resolves with the event's own skill check
+SKILL_CHECK_OPTIONS = ["Fight", "Disarm", "Analyze", "Take it", "Open it", "Inspect it"]
+NEGOTIATION_PENALTY = 5
+
+
+@lru_cache(maxsize=None)
+def check_probability(skill_value, difficulty):
+    """Chance that d20 + skill_value >= difficulty (events.perform_skill_check)."""
+    lowest_roll = max(difficulty - skill_value, 1)
+    faces = max(DIE_SIDES - lowest_roll + 1, 0)
+    return Fraction(faces, DIE_SIDES)
+
+
+def threshold_probability(skill_value, threshold=SUCCESS_THRESHOLD):
+    """Chance that d20 + skill_value > threshold (dice_roll.is_successful)."""
+    return check_probability(skill_value, threshold + 1)
+
+
+@lru_cache(maxsize=None)
+def event_probability_table(skill_values=SKILL_RANGE):
+    """{room_type: {skill value: success chance}} for every event in events.event_data."""
+    return {
+        room_type: {skill: check_probability(skill, event["difficulty"]) for skill in skill_values}
+        for room_type, event in event_data.items()
+    }
+
+
+def threshold_probability_table(skill_values=SKILL_RANGE, threshold=SUCCESS_THRESHOLD):
+    """{skill value: success chance} for the dice_roll.SUCCESS_THRESHOLD rule."""
+    return {skill: threshold_probability(skill, threshold) for skill in skill_values}
+
+
+def room_outcomes(room_type, player_character, choose_option=first_option_policy):
+    """
+    List the (chance, xp gained, health lost) outcomes of entering a room, following
+    trigger_event.  choose_option must be deterministic, e.g. headless.first_option_policy.
+    """
+    event = event_data.get(room_type)
+    if not event:
+        return [(Fraction(1), 0, 0)]
+
+    skills = player_character.skills
+    choice = choose_option(None, event["prompt"], event["options"])
+    if choice in SKILL_CHECK_OPTIONS:
+        success = check_probability(skills.get(event["skill"], 0), event["difficulty"])
+        return [(success, event["xp_reward"], 0), (1 - success, 0, event["failure_penalty"])]
+    if choice == "Negotiate":
+        success = check_probability(skills.get("Intelligence", 0), event["difficulty"])
+        return [(success, 0, 0), (1 - success, 0, NEGOTIATION_PENALTY)]
+    return [(Fraction(1), 0, 0)]  # Flee, Leave it alone, ...
+
+
+def route_rooms(game_map, choose_move=along_shortest_path, max_turns=None):
+    """
+    Room types the player meets walking the map with choose_move, in order.
+    Rooms are cleared after the first visit, as GameWindow.check_room_encounter does.
+    """
+    if max_turns is None:
+        max_turns = game_map.width * game_map.height * 4
+    start = (game_map.player_x, game_map.player_y)
+    try:
+        with game_log.quiet():
+            rooms = _walk(game_map, choose_move, max_turns)
+    finally:
+        game_map.player_x, game_map.player_y = start
+    return rooms
+
+
+def _walk(game_map, choose_move, max_turns):
+    """Move the player along the route and record each room entered."""
+    visited = set()
+    rooms = []
+    for _ in range(max_turns):
+        if game_map.move_player(choose_move(game_map)) is None:
+            continue
+        position = (game_map.player_x, game_map.player_y)
+        room_type = game_map.map_grid[position[1]][position[0]]
+        if position in visited and room_type in CLEARABLE_ROOMS:
+            room_type = "Cleared"
+        visited.add(position)
+        rooms.append(room_type)
+        if room_type == "Objective":
+            break
+    return rooms
+
+
+def mission_outlook(game_map, player_character, choose_option=first_option_policy,
+                    choose_move=along_shortest_path, rooms=None, exact=False):
+    """
+    Exact survival chance, expected XP and health distribution for walking game_map.
+    The walk stops counting a character once their health reaches 0, like the game does.
+    Pass exact=True to get Fractions instead of floats.
+    """
+    if rooms is None:
+        rooms = route_rooms(game_map, choose_move)
+    convert = (lambda value: value) if exact else float
+
+    alive = {player_character.health: convert(Fraction(1))}
+    dead = convert(Fraction(0))
+    expected_xp = convert(Fraction(0))
+    outcome_cache = {}
+
+    for room_type in rooms:
+        if room_type not in outcome_cache:
+            outcome_cache[room_type] = [(convert(chance), xp, damage) for chance, xp, damage
+                                        in room_outcomes(room_type, player_character, choose_option)]
+        next_alive = {}
+        for health, chance in alive.items():
+            for outcome_chance, xp, damage in outcome_cache[room_type]:
+                if not outcome_chance:
+                    continue
+                weight = chance * outcome_chance
+                expected_xp += weight * xp
+                if health - damage <= 0:
+                    dead += weight
+                else:
+                    next_alive[health - damage] = next_alive.get(health - damage, 0) + weight
+        alive = next_alive
+
+    survival = sum(alive.values(), convert(Fraction(0)))
+    expected_health = sum((health * chance for health, chance in alive.items()), convert(Fraction(0)))
+    return {
+        "rooms": len(rooms),
+        "survival_probability": survival,
+        "death_probability": dead,
+        "expected_xp": expected_xp,
+        "expected_health": expected_health,
+        "health_distribution": dict(sorted(alive.items())),
+    }
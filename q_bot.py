@@ -1,17 +1,26 @@
 # q_bot.py
-from q_responses import get_response
+from q_generator import generate
+from q_intents import match, normalize
+from q_responses import DEFAULT_RESPONSES, Q_RESPONSES
+from rng import stream
 
 QUIT_COMMAND = "quit"
 
+dialogue = stream("dialogue")
+
 
 def query_chatbot(question):
-    return get_response(question)
+    """A canned answer if the question matches one of Q's intents, otherwise an improvised one."""
+    intent, _ = match(question)
+    if intent:
+        return dialogue.choice(Q_RESPONSES[intent])
+    return generate(normalize(question)) or dialogue.choice(DEFAULT_RESPONSES)
 
 
 def main_loop():
     while True:
         player_question = input("Ask Q a question: ")
-        if player_question.lower() == QUIT_COMMAND:
+        if normalize(player_question) == QUIT_COMMAND:
             break
         print(f"Q: {query_chatbot(player_question)}")
 
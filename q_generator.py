@@ -0,0 +1,176 @@
+# q_generator.py
+"""
+Q's improvised lines for questions none of the canned answers fit.
+
+A word-level Markov chain (each word chosen from the words that followed the previous two)
+is trained on Q's canned responses and the story text, and stored as a small zlib-packed
+binary model.  Nothing is loaded until Q is first asked something the intent matcher can't
+place, so a player who never talks to Q never pays for it.  If the model file is missing the
+chain is trained in memory instead, which takes a few milliseconds.  Each answer is drawn from
+its own generator, seeded from the session's seed and the question, so asking the same thing
+twice gets the same reply and recent answers can be kept in an LRU cache: whether a reply is
+cached or generated, the game's random streams are left exactly where they were.
+
+Build the model file with:  python q_generator.py
+"""
+
+import random
+import struct
+import sys
+import zlib
+from functools import lru_cache
+
+from game_log import get_logger
+from q_intents import INDEX, normalize
+from rng import RNG, seed_for, stream
+
+MODEL_FILE = "q_model.bin"
+MODEL_MAGIC = b"QMKV"
+MODEL_VERSION = 1
+MODEL_HEADER = struct.Struct("<4sHII")  # magic, version, word count, state count
+STATE_HEADER = struct.Struct("<HHH")  # first word, second word, number of followers
+FOLLOWER = struct.Struct("<HH")  # word, count
+START, END = 0, 1  # Word ids marking the start and end of a sentence
+MAX_WORDS = 40
+CANDIDATES = 8  # Sentences generated per answer; the one sharing most words with the question wins
+CACHE_SIZE = 256
+
+logger = get_logger(__name__)
+dialogue = stream("dialogue")
+
+
+def training_lines():
+    """Q's responses plus the story text, one line per sentence-ish chunk."""
+    from q_responses import DEFAULT_RESPONSES, Q_RESPONSES
+    from story_bot import story_elements
+
+    lines = list(DEFAULT_RESPONSES)
+    for responses in Q_RESPONSES.values():
+        lines += responses
+    lines += story_elements["intro"]
+    for stages in story_elements["missions"].values():
+        lines += stages.values()
+    return lines
+
+
+class MarkovModel:
+    """Second-order word chain: (word id, word id) -> [(next word id, count)]."""
+
+    def __init__(self, words, transitions):
+        self.words = words
+        self.transitions = transitions
+
+    @classmethod
+    def train(cls, lines):
+        words = ["", ""]  # START and END
+        ids = {}
+        counts = {}
+        for line in lines:
+            previous = (START, START)
+            for word in line.split() + [None]:
+                if word is None:
+                    number = END
+                else:
+                    number = ids.get(word)
+                    if number is None:
+                        number = ids[word] = len(words)
+                        words.append(word)
+                followers = counts.setdefault(previous, {})
+                followers[number] = followers.get(number, 0) + 1
+                previous = (previous[1], number)
+        transitions = {state: list(followers.items()) for state, followers in counts.items()}
+        return cls(words, transitions)
+
+    def to_bytes(self):
+        parts = [MODEL_HEADER.pack(MODEL_MAGIC, MODEL_VERSION, len(self.words), len(self.transitions))]
+        vocabulary = "\n".join(self.words).encode("utf-8")
+        parts.append(struct.pack("<I", len(vocabulary)))
+        parts.append(vocabulary)
+        for (first, second), followers in self.transitions.items():
+            parts.append(STATE_HEADER.pack(first, second, len(followers)))
+            for word, amount in followers:
+                parts.append(FOLLOWER.pack(word, amount))
+        return zlib.compress(b"".join(parts), 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        data = zlib.decompress(data)
+        magic, version, word_count, state_count = MODEL_HEADER.unpack_from(data)
+        if magic != MODEL_MAGIC or version != MODEL_VERSION:
+            raise ValueError(f"Not a version {MODEL_VERSION} Q model.")
+        offset = MODEL_HEADER.size
+        (length,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        words = data[offset:offset + length].decode("utf-8").split("\n")
+        offset += length
+        if len(words) != word_count:
+            raise ValueError("Q model vocabulary is damaged.")
+        transitions = {}
+        for _ in range(state_count):
+            first, second, amount = STATE_HEADER.unpack_from(data, offset)
+            offset += STATE_HEADER.size
+            followers = list(FOLLOWER.iter_unpack(data[offset:offset + amount * FOLLOWER.size]))
+            offset += amount * FOLLOWER.size
+            transitions[(first, second)] = followers
+        return cls(words, transitions)
+
+    def sentence(self, rng=dialogue):
+        """One generated sentence of at most MAX_WORDS words."""
+        state = (START, START)
+        chosen = []
+        for _ in range(MAX_WORDS):
+            followers = self.transitions[state]
+            word = rng.choices([follower for follower, _ in followers],
+                               weights=[amount for _, amount in followers])[0]
+            if word == END:
+                break
+            chosen.append(word)
+            state = (state[1], word)
+        return " ".join(self.words[word] for word in chosen)
+
+
+def save_model(model, path=MODEL_FILE):
+    with open(path, "wb") as model_file:
+        model_file.write(model.to_bytes())
+
+
+def load_model(path=MODEL_FILE):
+    """The model from path, or one trained now if the file is missing or unreadable."""
+    try:
+        with open(path, "rb") as model_file:
+            return MarkovModel.from_bytes(model_file.read())
+    except FileNotFoundError:
+        logger.debug("No Q model at %s; training one in memory.", path)
+    except (ValueError, struct.error, zlib.error) as e:
+        logger.warning("Could not read the Q model at %s (%s); training one in memory.", path, e)
+    return MarkovModel.train(training_lines())
+
+
+@lru_cache(maxsize=1)
+def get_model():
+    """The model, loaded on first use."""
+    return load_model()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _generate(session_seed, normalized):
+    model = get_model()
+    rng = random.Random(seed_for(session_seed, "q_generator", normalized))
+    topic = set(INDEX.terms(normalized))
+    candidates = [model.sentence(rng) for _ in range(CANDIDATES)]
+    return max(candidates, key=lambda line: len(topic & set(INDEX.terms(normalize(line)))))
+
+
+def generate(normalized_question):
+    """An improvised reply, leaning towards sentences that share words with the question."""
+    return _generate(RNG.seed, normalized_question)
+
+
+def main(path=MODEL_FILE):
+    model = MarkovModel.train(training_lines())
+    save_model(model, path)
+    print(f"Saved a Q model of {len(model.words)} words and {len(model.transitions)} states to {path}.")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,176 @@
+# q_intents.py
+"""
+Matches free-form questions to Q's intents.
+
+Q_RESPONSES is keyed by short questions ("who am i").  Each intent also gets a few example
+phrasings, and single words are folded onto the words the examples use (SYNONYMS), so
+"Who am I?", "What's my objective" and "any tips" all find an answer.  At import time every
+example becomes a TF-IDF vector stored in an inverted index (word -> examples containing it),
+so matching a question only touches the examples that share a word with it.  Words not in the
+index are looked up through their letter trigrams to forgive typos; words that still match
+nothing count against the score, so "tell me a joke" doesn't pass for "who am i" on the
+strength of one shared word.  Results are cached per normalized question.
+"""
+
+import math
+import re
+from functools import lru_cache
+
+from game_log import get_logger
+from q_responses import DEFAULT_RESPONSES, Q_RESPONSES
+from rng import stream
+
+MIN_SCORE = 0.5  # Weaker matches count as no match
+MIN_TRIGRAM_SIMILARITY = 0.5  # How close a misspelled word must be to a known one
+CACHE_SIZE = 1024
+
+# Extra ways of asking each question in Q_RESPONSES (the key itself is always included)
+INTENT_PHRASES = {
+    "who am i": ["what am i", "what is my name", "what is my rank", "tell me about myself"],
+    "what's my mission": ["what should i do", "what is my objective", "why am i here", "what are my orders"],
+    "where am i": ["what is this place", "where is this", "what is my location"],
+    "what is happening": ["what is going on", "what happened", "what is this game"],
+    "help": ["help me", "i need help", "can you help", "i am stuck"],
+    "advice": ["any advice", "give me advice", "what do you suggest", "how do i survive"],
+    "challenge": ["give me a challenge", "challenge me", "i want a challenge"],
+    "starfleet": ["tell me about starfleet", "what is starfleet", "what do you think of starfleet"],
+    "humans": ["what do you think of humans", "tell me about humans", "what are humans"],
+}
+
+# Word -> the word the intent phrases use for it
+SYNONYMS = {
+    "im": "i am", "whats": "what is", "wheres": "where is", "whos": "who is",
+    "objective": "mission", "goal": "mission", "task": "mission", "quest": "mission", "orders": "mission",
+    "location": "where", "place": "where",
+    "happened": "happening", "happen": "happening", "going": "happening",
+    "assist": "help", "assistance": "help", "hint": "help", "stuck": "help", "lost": "help",
+    "tip": "advice", "tips": "advice", "suggest": "advice", "suggestion": "advice", "survive": "advice",
+    "test": "challenge", "dare": "challenge", "challenging": "challenge",
+    "federation": "starfleet", "fleet": "starfleet",
+    "human": "humans", "humanity": "humans", "people": "humans", "mankind": "humans",
+    "name": "who", "rank": "who",
+}
+
+# Words that carry no meaning for matching
+STOP_WORDS = frozenset(("a", "an", "the", "is", "are", "do", "does", "to", "of", "about", "q",
+                        "please", "you", "can", "tell", "give", "any", "this", "my", "think"))
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+logger = get_logger(__name__)
+dialogue = stream("dialogue")
+
+
+def normalize(question):
+    """Lowercase words with apostrophes and punctuation dropped, e.g. "What's up?" -> "whats up"."""
+    text = question.lower().replace("’", "").replace("'", "")
+    return " ".join(_WORD_PATTERN.findall(text))
+
+
+def trigrams(word):
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class IntentIndex:
+    """TF-IDF vectors of the intent phrases in an inverted index."""
+
+    def __init__(self, intent_phrases, synonyms=SYNONYMS, stop_words=STOP_WORDS):
+        self.synonyms = synonyms
+        self.stop_words = stop_words
+        self.intents = []  # Example number -> its intent
+        documents = []
+        for intent, phrases in intent_phrases.items():
+            for phrase in phrases:
+                self.intents.append(intent)
+                documents.append(self.terms(normalize(phrase)))
+
+        document_frequency = {}
+        for terms in documents:
+            for term in set(terms):
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        self.idf = {term: math.log(1 + len(documents) / df) for term, df in document_frequency.items()}
+        self.unknown_idf = math.log(1 + len(documents))  # As rare as a word can be
+
+        self.postings = {}  # term -> [(example number, weight)]
+        for number, terms in enumerate(documents):
+            for term, weight in self.vector(terms).items():
+                self.postings.setdefault(term, []).append((number, weight))
+
+        self.trigram_index = {}  # trigram -> known terms containing it
+        for term in self.idf:
+            for gram in trigrams(term):
+                self.trigram_index.setdefault(gram, set()).add(term)
+
+    def terms(self, normalized):
+        """Words of a normalized question with synonyms folded and stop words dropped."""
+        terms = []
+        for word in normalized.split():
+            for term in self.synonyms.get(word, word).split():
+                if term not in self.stop_words:
+                    terms.append(term)
+        return terms
+
+    def vector(self, terms):
+        """
+        Unit-length TF-IDF vector.  Terms the index doesn't know are left out of it but still
+        count towards its length, weighted as the rarest known word.
+        """
+        weights = {}
+        for term in terms:
+            weights[term] = weights.get(term, 0.0) + self.idf.get(term, self.unknown_idf)
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        return {term: weight / norm for term, weight in weights.items() if term in self.idf} if norm else {}
+
+    def closest_term(self, word):
+        """Known term most like a misspelled word (by shared trigrams), or None."""
+        grams = trigrams(word)
+        shared = {}
+        for gram in grams:
+            for term in self.trigram_index.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+        best, best_similarity = None, MIN_TRIGRAM_SIMILARITY
+        for term, common in shared.items():
+            similarity = common / len(grams | trigrams(term))
+            if similarity >= best_similarity:
+                best, best_similarity = term, similarity
+        return best
+
+    def match(self, normalized):
+        """(intent, cosine score) of the best match for a normalized question; intent None if none."""
+        terms = []
+        for term in self.terms(normalized):
+            if term not in self.idf:
+                term = self.closest_term(term) or term
+            terms.append(term)
+        scores = {}
+        for term, weight in self.vector(terms).items():
+            for number, document_weight in self.postings[term]:
+                scores[number] = scores.get(number, 0.0) + weight * document_weight
+        if not scores:
+            return None, 0.0
+        number = max(scores, key=scores.get)
+        return self.intents[number], scores[number]
+
+
+INDEX = IntentIndex({intent: [intent] + INTENT_PHRASES.get(intent, []) for intent in Q_RESPONSES})
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _match_normalized(normalized):
+    return INDEX.match(normalized)
+
+
+def match(question):
+    """(intent, score) for a question; intent is None when nothing scores MIN_SCORE or more."""
+    intent, score = _match_normalized(normalize(question))
+    if score < MIN_SCORE:
+        intent = None
+    logger.debug("Question %r matched %r (score %.2f)", question, intent, score)
+    return intent, score
+
+
+def get_response(question):
+    """One of Q's responses for the best-matching intent, or a default response."""
+    intent, _ = match(question)
+    return dialogue.choice(Q_RESPONSES[intent] if intent else DEFAULT_RESPONSES)
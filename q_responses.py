@@ -1,5 +1,7 @@
 # q_responses.py
-import random
+from rng import stream
+
+dialogue = stream("dialogue")
 
 # Constants for default responses and Q responses
 DEFAULT_RESPONSES = [
@@ -68,4 +70,4 @@ def _sanitize_question(question):
 
 def _get_random_response(responses_dict, question, default_responses):
     """Retrieve a random response based on the given question."""
-    return random.choice(responses_dict.get(question, default_responses))
+    return dialogue.choice(responses_dict.get(question, default_responses))
@@ -0,0 +1,239 @@
+# rng.py
+"""
+Named random streams for the whole game.
+
+Every subsystem draws from its own stream: "map" for layouts and mission picks, "combat"
+for dice, "loot" for rewards, "dialogue" for what NPCs, Q and the story say, "character"
+for character creation, "choices" for simulated players and "dice" for the seeds of
+dice_batch's NumPy generators.  Each stream is seeded from
+the service's seed and its name, so reseeding the service (or restoring a saved state)
+makes every later draw repeat exactly, and one subsystem drawing more or less never shifts
+the others.  Streams are created on first use and kept, so modules can hold on to them:
+
+    combat = rng.stream("combat")
+    roll = combat.d20()
+
+d20 rolls come from a buffer filled BATCH_SIZE rolls at a time with one randbytes() call;
+the buffer is part of the stream's state, so saving and restoring stays exact.  A stream's
+on_roll, if set, is called with every d20 it hands out (session_log records them).
+
+A full state (snapshot()) takes close to 3 KB per stream.  Streams also count the words they
+draw, so counters() describes the same point in a few bytes per stream: advance() gets
+there again from an earlier state (or from the seed) by drawing and dropping the words in
+between.  Save journals record counters and leave full states to snapshots.
+"""
+
+import hashlib
+import random
+import struct
+
+STREAMS = ("map", "combat", "loot", "dialogue", "character", "choices", "dice")
+BATCH_SIZE = 256
+STATE_MAGIC = b"RNG1"
+COUNTERS_MAGIC = b"RNC1"
+SKIP_WORDS = 1 << 16  # Words drawn per call while a stream skips ahead
+
+# Bytes 0..239 map evenly onto 1..20; 240..255 are dropped so every face is equally likely
+D20_TABLE = bytes(value % 20 + 1 for value in range(256))
+D20_REJECTED = bytes(range(240, 256))
+
+STATE_HEADER = struct.Struct("<4sQH")  # magic, service seed, stream count
+MT_STATE = struct.Struct("<625I")  # Mersenne Twister words plus position
+# has gauss_next, gauss_next, buffer length, buffer position, words drawn, words drawn at the last fill
+STREAM_TAIL = struct.Struct("<?dHHQq")
+STREAM_COUNTERS = struct.Struct("<QqH")  # words drawn, words drawn at the last fill, buffer position
+
+
+def seed_for(seed, *parts):
+    """A 64-bit seed derived from seed and parts, e.g. one per stream, chunk or worker."""
+    key = ":".join(str(part) for part in (seed,) + parts).encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+class RandomStream(random.Random):
+    """
+    random.Random with buffered d20 rolls that are saved along with its state.  Every draw
+    goes through random() or getrandbits(), which count the 32-bit words used in draws.
+    """
+
+    on_roll = None
+
+    def seed(self, a=None, version=2):
+        super().seed(a, version)
+        self.rolls = b""
+        self.position = 0
+        self.draws = 0
+        self.filled_at = -1  # draws when the d20 buffer was filled; -1 if it never was
+
+    def random(self):
+        self.draws += 2
+        return super().random()
+
+    def getrandbits(self, k):
+        self.draws += (k + 31) // 32
+        return super().getrandbits(k)
+
+    def fill_rolls(self):
+        self.filled_at = self.draws
+        self.rolls = self.randbytes(BATCH_SIZE).translate(D20_TABLE, D20_REJECTED)
+        self.position = 0
+
+    def d20(self):
+        """One d20 roll (1-20)."""
+        if self.position >= len(self.rolls):
+            self.fill_rolls()
+        roll = self.rolls[self.position]
+        self.position += 1
+        if self.on_roll is not None:
+            self.on_roll(roll)
+        return roll
+
+    def getstate(self):
+        return super().getstate(), self.rolls, self.position, self.draws, self.filled_at
+
+    def setstate(self, state):
+        mt_state, self.rolls, self.position, self.draws, self.filled_at = state
+        super().setstate(mt_state)
+
+    def skip(self, words):
+        """Draw words 32-bit words and throw them away."""
+        while words > 0:
+            step = min(words, SKIP_WORDS)
+            self.getrandbits(32 * step)
+            words -= step
+
+    def skip_to(self, draws, filled_at, position):
+        """Move on to the point given by counters(); the stream must not have got past it."""
+        if filled_at >= self.draws:
+            self.skip(filled_at - self.draws)
+            self.fill_rolls()
+        self.skip(draws - self.draws)
+        self.position = position
+
+
+class RngService:
+    """Hands out named RandomStreams, all derived from one seed."""
+
+    def __init__(self, seed=None):
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(64)
+        self.streams = {}
+
+    def stream(self, name):
+        stream = self.streams.get(name)
+        if stream is None:
+            stream = self.streams[name] = RandomStream(seed_for(self.seed, name))
+        return stream
+
+    def reseed(self, seed):
+        """Start every stream over from a new seed; streams already handed out stay valid."""
+        self.seed = seed
+        for name, stream in self.streams.items():
+            stream.seed(seed_for(seed, name))
+
+    def spawn(self, *parts):
+        """An independent service, e.g. one per simulation worker or shard."""
+        return RngService(seed_for(self.seed, "spawn", *parts))
+
+    def to_bytes(self):
+        """The seed and the state of every stream, packed for a save."""
+        parts = [STATE_HEADER.pack(STATE_MAGIC, self.seed, len(self.streams))]
+        for name, stream in self.streams.items():
+            (version, words, gauss), rolls, position, draws, filled_at = stream.getstate()
+            encoded = name.encode("utf-8")
+            parts.append(bytes([len(encoded)]) + encoded)
+            parts.append(MT_STATE.pack(*words))
+            parts.append(STREAM_TAIL.pack(gauss is not None, gauss or 0.0, len(rolls), position, draws, filled_at))
+            parts.append(rolls)
+        return b"".join(parts)
+
+    def counters(self):
+        """The seed and how far every stream has got, packed; a few bytes per stream."""
+        parts = [STATE_HEADER.pack(COUNTERS_MAGIC, self.seed, len(self.streams))]
+        for name, stream in self.streams.items():
+            encoded = name.encode("utf-8")
+            parts.append(bytes([len(encoded)]) + encoded)
+            parts.append(STREAM_COUNTERS.pack(stream.draws, stream.filled_at, stream.position))
+        return b"".join(parts)
+
+    def advance(self, data):
+        """
+        Bring the streams to the point counters() recorded.  Streams already past it, or
+        on another seed, start over from the seed and skip ahead from there.
+        """
+        data = bytes(data)
+        magic, seed, count = STATE_HEADER.unpack_from(data)
+        if magic != COUNTERS_MAGIC:
+            raise ValueError("Not saved random counters.")
+        if seed != self.seed:
+            self.reseed(seed)
+        offset = STATE_HEADER.size
+        recorded = set()
+        for _ in range(count):
+            length = data[offset]
+            name = data[offset + 1:offset + 1 + length].decode("utf-8")
+            offset += 1 + length
+            draws, filled_at, position = STREAM_COUNTERS.unpack_from(data, offset)
+            offset += STREAM_COUNTERS.size
+            recorded.add(name)
+            stream = self.stream(name)
+            # The buffer only carries over if the stream hasn't refilled it since
+            if draws < stream.draws or (filled_at < stream.draws and filled_at != stream.filled_at):
+                stream.seed(seed_for(seed, name))
+            stream.skip_to(draws, filled_at, position)
+        for name, stream in self.streams.items():
+            if name not in recorded and stream.draws:  # Not created yet at that point, so unused
+                stream.seed(seed_for(seed, name))
+
+    def restore(self, data):
+        """Put the service back into a state from to_bytes()."""
+        data = bytes(data)
+        magic, seed, count = STATE_HEADER.unpack_from(data)
+        if magic != STATE_MAGIC:
+            raise ValueError("Not a saved random state.")
+        self.reseed(seed)
+        offset = STATE_HEADER.size
+        for _ in range(count):
+            length = data[offset]
+            name = data[offset + 1:offset + 1 + length].decode("utf-8")
+            offset += 1 + length
+            words = MT_STATE.unpack_from(data, offset)
+            offset += MT_STATE.size
+            has_gauss, gauss, roll_count, position, draws, filled_at = STREAM_TAIL.unpack_from(data, offset)
+            offset += STREAM_TAIL.size
+            rolls = data[offset:offset + roll_count]
+            offset += roll_count
+            mt_state = (3, words, gauss if has_gauss else None)
+            self.stream(name).setstate((mt_state, rolls, position, draws, filled_at))
+
+
+# The game's service; reseeded by seed() for reproducible runs
+RNG = RngService()
+
+
+def stream(name):
+    return RNG.stream(name)
+
+
+def seed(value):
+    RNG.reseed(value)
+
+
+def snapshot():
+    return RNG.to_bytes()
+
+
+def restore(data):
+    RNG.restore(data)
+
+
+def counters():
+    return RNG.counters()
+
+
+def advanced_state(state, data):
+    """A snapshot() state (None: start from the seed) moved on to the point data from counters() gives."""
+    service = RngService(0)
+    if state is not None:
+        service.restore(state)
+    service.advance(data)
+    return service.to_bytes()
@@ -0,0 +1,155 @@
+# room_grid.py
+"""
+Compact storage for map rooms.
+
+Every cell is one byte holding a RoomType code instead of a reference to a string in a
+list of lists.  grid[y][x] still reads and writes room names, so code written against the
+old nested lists keeps working, while hot paths can use the codes and the bulk queries.
+"""
+
+from enum import IntEnum
+
+
+class RoomType(IntEnum):
+    NONE = 0  # No room at all; drawn as an obstacle
+    EMPTY = 1
+    START = 2
+    OBJECTIVE = 3
+    EXIT = 4
+    ENEMY = 5
+    TRAP = 6
+    PUZZLE = 7
+    ITEM = 8
+    TREASURE = 9
+    NPC = 10
+    CLEARED = 11
+
+
+# Room names as the rest of the game spells them, indexed by code
+ROOM_NAMES = [None, "Empty", "Start", "Objective", "Exit", "Enemy", "Trap",
+              "Puzzle", "Item", "Treasure", "NPC", "Cleared"]
+ROOM_CODES = {name: code for code, name in enumerate(ROOM_NAMES)}
+
+
+class RoomGrid:
+    """width x height rooms stored row by row in a bytearray, one byte per cell."""
+
+    def __init__(self, width, height, fill=RoomType.NONE, cells=None):
+        self.width = width
+        self.height = height
+        if cells is None:
+            cells = bytearray([fill]) * (width * height)
+        elif len(cells) != width * height:
+            raise ValueError(f"Expected {width * height} cells, got {len(cells)}.")
+        self.cells = bytearray(cells)
+
+    @classmethod
+    def from_names(cls, rows):
+        """Build a grid from nested lists of room names (the old map_grid layout)."""
+        height = len(rows)
+        width = len(rows[0]) if height else 0
+        cells = bytearray(ROOM_CODES[name] for row in rows for name in row)
+        return cls(width, height, cells=cells)
+
+    def to_names(self):
+        """Nested lists of room names, e.g. for printing or old-style saves."""
+        return [list(row) for row in self]
+
+    def copy(self):
+        return RoomGrid(self.width, self.height, cells=self.cells)
+
+    def get(self, x, y):
+        """RoomType code at (x, y)."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"Cell ({x}, {y}) is outside the grid.")
+        return self.cells[y * self.width + x]
+
+    def set(self, x, y, code):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"Cell ({x}, {y}) is outside the grid.")
+        self.cells[y * self.width + x] = code
+
+    def get_name(self, x, y):
+        return ROOM_NAMES[self.get(x, y)]
+
+    def set_name(self, x, y, name):
+        self.set(x, y, ROOM_CODES[name])
+
+    def count(self, code):
+        """Number of cells holding the given RoomType."""
+        return self.cells.count(code)
+
+    def counts(self):
+        """{RoomType: number of cells} for every room type present."""
+        return {RoomType(code): self.cells.count(code)
+                for code in range(len(ROOM_NAMES)) if code in self.cells}
+
+    def positions(self, code):
+        """Yield the (x, y) of every cell holding the given RoomType, row by row."""
+        cells = self.cells
+        index = cells.find(code)
+        while index != -1:
+            yield index % self.width, index // self.width
+            index = cells.find(code, index + 1)
+
+    def replace(self, old_code, new_code):
+        """Turn every old_code cell into new_code in one pass."""
+        table = bytearray(range(256))
+        table[old_code] = new_code
+        self.cells[:] = self.cells.translate(table)
+
+    def row_bytes(self, y):
+        """The raw codes of one row, without copying."""
+        return memoryview(self.cells)[y * self.width:(y + 1) * self.width]
+
+    def as_numpy(self):
+        """A zero-copy (height, width) uint8 NumPy view of the cells."""
+        import numpy as np  # Only needed by callers that want array operations
+
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.height, self.width)
+
+    # Adapters for code that treats the grid as nested lists of room names
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, y):
+        if y < 0:
+            y += self.height
+        if not 0 <= y < self.height:
+            raise IndexError(f"Row {y} is outside the grid.")
+        return RoomRow(self, y)
+
+    def __iter__(self):
+        for y in range(self.height):
+            yield RoomRow(self, y)
+
+
+class RoomRow:
+    """One row of a RoomGrid, read and written with room names."""
+
+    def __init__(self, grid, y):
+        self.grid = grid
+        self.offset = y * grid.width
+
+    def __len__(self):
+        return self.grid.width
+
+    def __getitem__(self, x):
+        if x < 0:
+            x += self.grid.width
+        if not 0 <= x < self.grid.width:
+            raise IndexError(f"Column {x} is outside the grid.")
+        return ROOM_NAMES[self.grid.cells[self.offset + x]]
+
+    def __setitem__(self, x, name):
+        if x < 0:
+            x += self.grid.width
+        if not 0 <= x < self.grid.width:
+            raise IndexError(f"Column {x} is outside the grid.")
+        self.grid.cells[self.offset + x] = ROOM_CODES[name]
+
+    def __iter__(self):
+        cells = self.grid.cells
+        for index in range(self.offset, self.offset + self.grid.width):
+            yield ROOM_NAMES[cells[index]]
@@ -0,0 +1,574 @@
+# save_format.py
+"""
+Versioned binary save files.
+
+A save is a fixed header, a table of sections and then the sections themselves:
+
+    header    magic b"AMSV", schema version, flags, snapshot generation, section count
+    table     one (tag, key, offset, length, crc32) entry per section
+    CHAR      the character, JSON
+    MISN      mission progress, JSON
+    MAPH      map header (size, player, objective, seed), JSON
+    MAPG      RoomGrid cells of a GameMap, one byte per room
+    MAPC      rooms a ChunkedGameMap changed in one chunk (key = chunk), packed triples
+    HIST      the message history, UTF-8 lines
+    RNGS      the rng streams (rng.snapshot()), so a resumed game rolls what it would have
+
+Loading maps the file with mmap and reads only the header; the table is sorted by
+(tag, key), so a section is found by binary search without parsing the whole table.  It is
+CRC-checked when it is first read and handed out as a memoryview into the mapping, so the
+character and the map header are ready at once, chunk sections are unpacked when the map
+first touches that chunk and the history is decoded when someone reads it.  Resuming
+therefore costs the same whatever the size of the save.
+
+Snapshots go to a temporary file that is fsynced and then moved over the old save, so a
+crash leaves either the old save or the new one.  Between snapshots, changes are appended
+to a journal next to the save as small CRC-checked records (a move is 13 bytes), so
+autosaving does not re-serialize the whole game.  Loading replays the journal over the
+snapshot and stops at the first torn record.  The old pickled savegame.pkl (schema 0) is
+upgraded through MIGRATIONS, where later schema versions add their own steps.
+"""
+
+import io
+import json
+import mmap
+import os
+import pickle
+import struct
+import zlib
+
+import rng
+from character import Character
+from game_log import get_logger
+from map_bot import CHANGE_RECORD, UNIFORM_GENERATOR, ChunkedGameMap, GameMap
+from room_grid import ROOM_CODES, ROOM_NAMES, RoomGrid
+
+SAVE_FILE = 'savegame.ams'
+LEGACY_SAVE_FILE = 'savegame.pkl'
+JOURNAL_SUFFIX = '.journal'
+SCHEMA_VERSION = 1
+# The journal is folded into a fresh snapshot once it holds this many records
+COMPACT_AFTER_RECORDS = 4096
+
+MAGIC = b"AMSV"
+JOURNAL_MAGIC = b"AMJL"
+PREFIX = struct.Struct("<4sH")  # magic, schema version; the same in every version
+HEADER = struct.Struct("<4sHHQI")  # magic, schema version, flags, generation, section count
+SECTION = struct.Struct("<4sQQQI")  # tag, key, offset, length, crc32
+JOURNAL_HEADER = struct.Struct("<4sQ")  # magic, generation of the snapshot it follows
+RECORD = struct.Struct("<II")  # payload length, crc32 of the payload
+MOVE_RECORD = struct.Struct("<Bii")  # op, player x, player y
+ROOM_RECORD = struct.Struct("<BiiB")  # op, x, y, RoomType code
+
+OP_MOVE = 1
+OP_ROOM = 2
+OP_CHARACTER = 3
+OP_MISSION = 4
+OP_RNG = 5
+
+logger = get_logger(__name__)
+
+
+class SaveFormatError(ValueError):
+    """The file is not a save, is damaged, or was written by a newer version of the game."""
+
+
+class LegacyUnpickler(pickle.Unpickler):
+    """Reads old savegame.pkl files, refusing to build anything but a Character."""
+
+    def find_class(self, module, name):
+        if (module, name) == ("character", "Character"):
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"{module}.{name} is not allowed in a save file.")
+
+
+def new_generation():
+    return int.from_bytes(os.urandom(8), "little")
+
+
+def encode_json(value):
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def character_to_dict(character):
+    """JSON-ready form of a Character."""
+    return {"kind": "Character", "fields": character.to_dict()}
+
+
+CHARACTER_KINDS = ("Character", "dict")  # "dict": written before the Character model was unified
+
+
+def character_from_dict(data):
+    kind = data.get("kind")
+    if kind not in CHARACTER_KINDS:
+        raise SaveFormatError(f"Unknown character kind {kind!r}.")
+    return Character.from_dict(data["fields"])
+
+
+def chunk_key(chunk_x, chunk_y):
+    return chunk_y << 32 | chunk_x
+
+
+def encode_map(game_map):
+    """Sections describing a GameMap or ChunkedGameMap."""
+    header = {
+        "width": game_map.width,
+        "height": game_map.height,
+        "mission_type": game_map.mission_type,
+        "player": [game_map.player_x, game_map.player_y],
+        "objective": [game_map.objective_x, game_map.objective_y],
+    }
+    if isinstance(game_map, ChunkedGameMap):
+        # Generated rooms come back from the seed; only the changed ones are stored
+        header.update(chunked=True, seed=game_map.seed, chunk_size=game_map.chunk_size,
+                      generator=game_map.generator, densities=game_map.densities)
+        sections = {(b"MAPH", 0): encode_json(header)}
+        by_chunk = {}
+        for (x, y), code in game_map.all_changes().items():
+            key = chunk_key(x // game_map.chunk_size, y // game_map.chunk_size)
+            by_chunk.setdefault(key, []).append(CHANGE_RECORD.pack(x, y, code))
+        for key, records in by_chunk.items():
+            sections[(b"MAPC", key)] = b"".join(records)
+        return sections
+    return {(b"MAPH", 0): encode_json(header), (b"MAPG", 0): bytes(game_map.map_grid.cells)}
+
+
+class SavedChanges:
+    """The MAPC sections of a save, as the changed-room source of a ChunkedGameMap."""
+
+    def __init__(self, sections):
+        self.sections = sections
+
+    def read(self, chunk_x, chunk_y):
+        name = (b"MAPC", chunk_key(chunk_x, chunk_y))
+        return self.sections[name] if name in self.sections else None
+
+    def chunks(self):
+        return [(key & 0xFFFFFFFF, key >> 32) for tag, key in self.sections.keys() if tag == b"MAPC"]
+
+
+def decode_map(sections):
+    header = json.loads(bytes(sections[(b"MAPH", 0)]))
+    if header.get("chunked"):
+        game_map = ChunkedGameMap(header["width"], header["height"], header["mission_type"],
+                                  seed=header["seed"], chunk_size=header["chunk_size"],
+                                  generator=header.get("generator", UNIFORM_GENERATOR),
+                                  densities=header.get("densities"))
+        game_map.changes = {}  # The pinned rooms are part of the saved changes
+        game_map.use_saved_changes(SavedChanges(sections))
+    else:
+        grid = RoomGrid(header["width"], header["height"], cells=sections[(b"MAPG", 0)])
+        game_map = GameMap.from_grid(grid, header["mission_type"], header["objective"])
+    game_map.player_x, game_map.player_y = header["player"]
+    return game_map
+
+
+def capture_state(character, game_map=None, mission=None, history=None, rng_state=None):
+    """Copies of what a snapshot needs, taken where the game runs; encode_captured does the rest.
+
+    The character becomes a plain dict and the map its already packed sections, so the game can
+    carry on changing both while another thread encodes the copy.  history is kept as the list
+    of lines: joining and encoding it is the expensive part of a snapshot.
+    """
+    return {
+        "character": character_to_dict(character),
+        "mission": None if mission is None else dict(mission),
+        "map": None if game_map is None else encode_map(game_map),
+        "history": None if history is None else list(history),
+        "rng": rng_state,
+    }
+
+
+def encode_captured(state):
+    """Sections for a full snapshot from capture_state()."""
+    sections = {(b"CHAR", 0): encode_json(state["character"])}
+    if state["mission"] is not None:
+        sections[(b"MISN", 0)] = encode_json(state["mission"])
+    if state["map"] is not None:
+        sections.update(state["map"])
+    if state["history"] is not None:
+        sections[(b"HIST", 0)] = "\n".join(state["history"]).encode("utf-8")
+    if state["rng"] is not None:
+        sections[(b"RNGS", 0)] = state["rng"]
+    return sections
+
+
+def encode_state(character, game_map=None, mission=None, history=None, rng_state=None):
+    """Sections for a full snapshot; rng_state is rng.snapshot() so the session can continue exactly."""
+    return encode_captured(capture_state(character, game_map, mission, history, rng_state))
+
+
+def decode_state(sections):
+    """{"character", "game_map", "mission", "history", "rng"} from the sections of a snapshot."""
+    return {
+        "character": character_from_dict(json.loads(bytes(sections[(b"CHAR", 0)]))),
+        "game_map": decode_map(sections) if (b"MAPH", 0) in sections else None,
+        "mission": json.loads(bytes(sections[(b"MISN", 0)])) if (b"MISN", 0) in sections else None,
+        "history": LazyLines(sections, (b"HIST", 0)) if (b"HIST", 0) in sections else None,
+        "rng": bytes(sections[(b"RNGS", 0)]) if (b"RNGS", 0) in sections else None,
+    }
+
+
+def migrate_pickle(sections):
+    """Version 0 -> 1: the old save was nothing but a pickled character."""
+    character = LegacyUnpickler(io.BytesIO(sections[(b"PICK", 0)])).load()
+    if isinstance(character, dict):
+        character = Character.from_dict(character)
+    return {(b"CHAR", 0): encode_json(character_to_dict(character))}
+
+
+# Schema version -> function turning that version's sections into the next version's.
+# Sections are always keyed by (tag, key).
+MIGRATIONS = {
+    0: migrate_pickle,
+}
+
+
+def migrate(version, sections):
+    while version < SCHEMA_VERSION:
+        sections = MIGRATIONS[version](sections)
+        version += 1
+    return sections
+
+
+def fsync_directory(path):
+    """Make a rename in the directory durable (not possible, nor needed, on Windows)."""
+    if hasattr(os, "O_DIRECTORY"):
+        descriptor = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+def write_snapshot(path, sections, generation):
+    """Atomically replace path with a snapshot holding the given {(tag, key): bytes}."""
+    names = sorted(sections)  # SaveReader binary-searches the table
+    offset = HEADER.size + SECTION.size * len(names)
+    table = []
+    for tag, key in names:
+        data = sections[(tag, key)]
+        table.append(SECTION.pack(tag, key, offset, len(data), zlib.crc32(data)))
+        offset += len(data)
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as save_file:
+        save_file.write(HEADER.pack(MAGIC, SCHEMA_VERSION, 0, generation, len(sections)))
+        save_file.write(b"".join(table))
+        for name in names:
+            save_file.write(sections[name])
+        save_file.flush()
+        os.fsync(save_file.fileno())
+    os.replace(temp_path, path)
+    fsync_directory(path)
+
+
+class SaveReader:
+    """
+    A snapshot mapped into memory.  Opening it reads only the header; sections are looked
+    up by binary search in the sorted table, CRC-checked the first time they are read and
+    returned as memoryviews into the mapping, without copying.  Behaves as a read-only
+    mapping of (tag, key) -> memoryview.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as save_file:
+            try:
+                self.data = mmap.mmap(save_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise SaveFormatError(f"{path} is empty.")
+        self.view = memoryview(self.data)
+        self.checked = set()
+        self.entries = {}  # (tag, key) -> (offset, length, crc32) of the entries looked up so far
+        try:
+            self.read_table()
+        except (SaveFormatError, struct.error) as e:
+            self.close()
+            raise SaveFormatError(f"{path} is not a valid save file: {e}")
+
+    def read_table(self):
+        magic, self.version = PREFIX.unpack_from(self.view)
+        if magic != MAGIC:
+            raise SaveFormatError("wrong magic number")
+        if self.version > SCHEMA_VERSION:
+            raise SaveFormatError(f"written by a newer version of the game (schema {self.version})")
+        _, _, _, self.generation, self.section_count = HEADER.unpack_from(self.view)
+        if HEADER.size + self.section_count * SECTION.size > len(self.view):
+            raise SaveFormatError("section table is cut off")
+
+    def find(self, name):
+        """(offset, length, crc32) of a section, or None if the save doesn't have it."""
+        entry = self.entries.get(name)
+        if entry is not None:
+            return entry
+        low, high = 0, self.section_count
+        while low < high:
+            middle = (low + high) // 2
+            tag, key, offset, length, crc = SECTION.unpack_from(self.view, HEADER.size + middle * SECTION.size)
+            if (tag, key) < name:
+                low = middle + 1
+            elif (tag, key) > name:
+                high = middle
+            else:
+                entry = self.entries[name] = (offset, length, crc)
+                return entry
+        return None
+
+    def __contains__(self, name):
+        return self.find(name) is not None
+
+    def __getitem__(self, name):
+        entry = self.find(name)
+        if entry is None:
+            raise KeyError(name)
+        offset, length, crc = entry
+        section = self.view[offset:offset + length]
+        if name not in self.checked:
+            if len(section) != length or zlib.crc32(section) != crc:
+                raise SaveFormatError(f"Section {name[0].decode()} of {self.path} is damaged.")
+            self.checked.add(name)
+        return section
+
+    def keys(self):
+        """Every (tag, key) in the save; this one does walk the whole table."""
+        return [(tag, key) for tag, key, _, _, _ in
+                SECTION.iter_unpack(self.view[HEADER.size:HEADER.size + self.section_count * SECTION.size])]
+
+    def close(self):
+        """Unmap the file; sections still handed out keep the mapping alive until dropped."""
+        try:
+            self.view.release()
+            self.data.close()
+        except BufferError:
+            pass
+
+
+class LazyLines:
+    """The lines of a text section, decoded on first use."""
+
+    def __init__(self, sections, name):
+        self.sections = sections
+        self.name = name
+        self._lines = None
+
+    def lines(self):
+        if self._lines is None:
+            text = bytes(self.sections[self.name]).decode("utf-8")
+            self._lines = text.split("\n") if text else []
+            self.sections = None
+        return self._lines
+
+    def __iter__(self):
+        return iter(self.lines())
+
+    def __len__(self):
+        return len(self.lines())
+
+
+def read_journal(path, generation):
+    """
+    (payloads, end) for a journal that follows the given snapshot generation; end is the
+    offset just past the last intact record.  A journal of another generation is empty.
+    """
+    try:
+        with open(path, 'rb') as journal_file:
+            data = journal_file.read()
+    except FileNotFoundError:
+        return [], 0
+    if len(data) < JOURNAL_HEADER.size or JOURNAL_HEADER.unpack_from(data) != (JOURNAL_MAGIC, generation):
+        return [], 0
+
+    payloads = []
+    offset = JOURNAL_HEADER.size
+    while offset + RECORD.size <= len(data):
+        length, crc = RECORD.unpack_from(data, offset)
+        payload = data[offset + RECORD.size:offset + RECORD.size + length]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            break  # Torn write at the end of the journal; everything before it is good
+        payloads.append(payload)
+        offset += RECORD.size + length
+    return payloads, offset
+
+
+def move_record(game_map):
+    return MOVE_RECORD.pack(OP_MOVE, game_map.player_x, game_map.player_y)
+
+
+def room_record(x, y, room):
+    return ROOM_RECORD.pack(OP_ROOM, x, y, ROOM_CODES[room])
+
+
+def character_record(character):
+    return bytes([OP_CHARACTER]) + encode_json(character_to_dict(character))
+
+
+def mission_record(mission):
+    return bytes([OP_MISSION]) + encode_json(mission)
+
+
+def rng_record(rng_counters):
+    """The random streams' position as rng.counters() gives it; far smaller than a full state."""
+    return bytes([OP_RNG]) + rng_counters
+
+
+def apply_record(state, payload):
+    """Replay one journal record onto a decoded state."""
+    op = payload[0]
+    if op == OP_MOVE:
+        _, x, y = MOVE_RECORD.unpack(payload)
+        state["game_map"].player_x, state["game_map"].player_y = x, y
+    elif op == OP_ROOM:
+        _, x, y, code = ROOM_RECORD.unpack(payload)
+        state["game_map"].set_room(x, y, ROOM_NAMES[code])
+    elif op == OP_CHARACTER:
+        state["character"] = character_from_dict(json.loads(payload[1:]))
+    elif op == OP_MISSION:
+        state["mission"] = json.loads(payload[1:])
+    elif op == OP_RNG:
+        state["rng"] = rng.advanced_state(state["rng"], payload[1:])
+    else:
+        raise SaveFormatError(f"Unknown journal record type {op}.")
+
+
+class Journal:
+    """Append-only record file holding the changes made since one snapshot."""
+
+    def __init__(self, path, generation, records=0, end=0):
+        self.path = path
+        self.generation = generation
+        self.records = records
+        if end:
+            # Continue after the last intact record, dropping a torn one if there is one
+            self.file = open(path, 'r+b', buffering=0)
+            self.file.truncate(end)
+            self.file.seek(end)
+        else:
+            self.file = open(path, 'wb', buffering=0)
+            self.file.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, generation))
+
+    def append(self, payload):
+        # Unbuffered: one write() per record, so a crash of the game never loses a record
+        self.file.write(RECORD.pack(len(payload), zlib.crc32(payload)) + payload)
+        self.records += 1
+
+    def sync(self):
+        """Make the records durable against power loss as well."""
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+class SaveGame:
+    """
+    A save file with its journal: full snapshots plus cheap incremental records.
+    A loaded state keeps reading lazily from the mapped snapshot it came from.
+    """
+
+    def __init__(self, path=SAVE_FILE, compact_after=COMPACT_AFTER_RECORDS):
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.compact_after = compact_after
+        self.generation = None
+        self.journal = None
+        self.journal_records = 0
+        self.journal_end = 0
+        self.reader = None
+
+    def exists(self):
+        return os.path.exists(self.path) or os.path.exists(LEGACY_SAVE_FILE)
+
+    def save(self, character, game_map=None, mission=None, history=None, rng_state=None):
+        """Write a full snapshot and start an empty journal after it."""
+        self.write_sections(encode_state(character, game_map, mission, history, rng_state))
+        logger.info("Game successfully saved!")
+
+    def write_sections(self, sections):
+        """Write a snapshot of already encoded sections (see encode_state)."""
+        generation = new_generation()
+        self.release_reader()
+        write_snapshot(self.path, sections, generation)
+        self.close()
+        self.generation = generation
+        self.journal_records = self.journal_end = 0
+
+    def load(self):
+        """The saved state with the journal replayed over it, or None if there is no save."""
+        self.release_reader()
+        if os.path.exists(self.path):
+            self.reader = SaveReader(self.path)
+            version, generation, sections = self.reader.version, self.reader.generation, self.reader
+        elif os.path.exists(LEGACY_SAVE_FILE):
+            with open(LEGACY_SAVE_FILE, 'rb') as legacy_file:
+                version, generation, sections = 0, None, {(b"PICK", 0): legacy_file.read()}
+        else:
+            return None
+
+        if version < SCHEMA_VERSION:
+            sections = migrate(version, sections)
+        state = decode_state(sections)
+
+        payloads, end = read_journal(self.journal_path, generation)
+        for payload in payloads:
+            apply_record(state, payload)
+        if version < SCHEMA_VERSION:
+            # Rewrite in the current format, journal included, so the next load doesn't migrate again
+            self.save(state["character"], state["game_map"], state["mission"], state["history"], state["rng"])
+            return state
+        self.close()
+        self.generation = generation
+        self.journal_records, self.journal_end = len(payloads), end
+        return state
+
+    def _journal(self):
+        if self.journal is None:
+            if self.generation is None:
+                raise RuntimeError("Nothing to journal against: save() or load() a snapshot first.")
+            self.journal = Journal(self.journal_path, self.generation, self.journal_records, self.journal_end)
+        return self.journal
+
+    def has_snapshot(self):
+        return self.generation is not None
+
+    def append(self, record):
+        """Append an encoded journal record (move_record(), room_record(), ...)."""
+        self._journal().append(record)
+
+    def record_move(self, game_map):
+        self.append(move_record(game_map))
+
+    def record_room(self, x, y, room):
+        self.append(room_record(x, y, room))
+
+    def record_character(self, character):
+        self.append(character_record(character))
+
+    def record_mission(self, mission):
+        self.append(mission_record(mission))
+
+    def needs_compaction(self):
+        """True once the journal is long enough that a new snapshot should replace it."""
+        records = self.journal.records if self.journal is not None else self.journal_records
+        return records >= self.compact_after
+
+    def sync(self):
+        if self.journal is not None:
+            self.journal.sync()
+
+    def release_reader(self):
+        """
+        Stop reading from the current snapshot.  On POSIX the mapping of the old file stays
+        valid for whatever still reads from it; Windows can't replace a mapped file, so
+        there it is unmapped right away.
+        """
+        if self.reader is not None:
+            if os.name == "nt":
+                self.reader.close()
+            self.reader = None
+
+    def close(self):
+        if self.journal is not None:
+            self.journal_records, self.journal_end = self.journal.records, self.journal.file.tell()
+            self.journal.close()
+            self.journal = None
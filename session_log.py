@@ -0,0 +1,325 @@
+# session_log.py
+"""
+Recording and replaying play sessions.
+
+While the game runs, a SessionRecorder appends every command given to
+GameWindow.execute_command, every event choice made in a QInputDialog and every d20 roll
+to a compact binary log.  The first record holds the state play started from, including
+the random streams (rng.snapshot()).  Everything else the game decides (mission types,
+maps, loot) comes from those streams, so commands and choices are enough to play the
+session again exactly.  Dice are logged too: a replay checks each roll against the log and
+stops at the first one that differs, which points straight at the change that broke
+determinism.
+
+The file is a header followed by records, each an op byte and then:
+
+    STATE       u32 length, then sections as in a save: (tag, key, length) and the data
+    COMMAND     u8 index into COMMANDS
+    CHOICE      u8 index into the event's options, NO_CHOICE if the player backed out
+    DICE        u8 roll
+    CHARACTER   u32 length, then JSON {"name", "species"} of a newly created character
+
+A SessionReplayer re-applies a log headlessly, without Qt, speech or autosave, reusing
+headless.handle_room for the rooms.  Every CHECKPOINT_TURNS commands it keeps a copy of the
+state, so seek() to any turn replays at most that many commands.  Replaying takes over
+the game's random streams.
+
+Replay a log from the command line with:  python session_log.py [log file] [turn]
+"""
+
+import json
+import struct
+import sys
+import time
+
+import game_log
+import rng
+from character import Character
+from game_log import get_logger
+from headless import MISSION_TYPES, HeadlessSession, ListSink, NullSink, handle_room
+from map_bot import create_game_map
+from mission_constants import CHARACTER_SKILLS, MISSION_COMPLETE_PREFIX, STARTING_ITEMS
+from save_format import decode_state, encode_json, encode_state
+from story_bot import get_mission_story
+
+SESSION_FILE = "session.amlog"
+LOG_MAGIC = b"AMSL"
+LOG_VERSION = 1
+LOG_HEADER = struct.Struct("<4sH")  # magic, version
+LENGTH = struct.Struct("<I")
+SECTION_ENTRY = struct.Struct("<4sQI")  # tag, key, length
+CHECKPOINT_TURNS = 256
+
+EV_STATE = 1
+EV_COMMAND = 2
+EV_CHOICE = 3
+EV_DICE = 4
+EV_CHARACTER = 5
+NO_CHOICE = 255
+
+# Every command execute_command knows; a command is logged as its index here
+COMMANDS = ("Create Character", "Start Mission", "Explore", "Move North", "Move South",
+            "Move East", "Move West", "Hint", "End Mission", "Quit")
+COMMAND_CODES = {command: code for code, command in enumerate(COMMANDS)}
+DIRECTIONS = {"Move North": "up", "Move South": "down", "Move East": "right", "Move West": "left"}
+
+logger = get_logger(__name__)
+
+
+class SessionLogError(ValueError):
+    """The file is not a session log, or replaying it went differently from the recording."""
+
+
+def encode_session_state(character=None, game_map=None, mission=None, map_size=None):
+    """The sections of a STATE record: what encode_state saves, the random streams and the map size."""
+    sections = encode_state(character, game_map, mission) if character is not None else {}
+    sections[(b"RNGS", 0)] = rng.snapshot()
+    sections[(b"SESS", 0)] = encode_json({"map_size": map_size})
+    return sections
+
+
+def decode_session_state(sections):
+    """{"character", "game_map", "mission", "rng", "map_size"} from STATE sections."""
+    if (b"CHAR", 0) in sections:
+        state = decode_state(sections)
+    else:
+        state = {"character": None, "game_map": None, "mission": None, "rng": sections[(b"RNGS", 0)]}
+    state["map_size"] = json.loads(sections[(b"SESS", 0)])["map_size"]
+    return state
+
+
+def pack_sections(sections):
+    parts = [LENGTH.pack(len(sections))]
+    for (tag, key), data in sections.items():
+        parts.append(SECTION_ENTRY.pack(tag, key, len(data)))
+        parts.append(bytes(data))
+    return b"".join(parts)
+
+
+def unpack_sections(data):
+    (count,) = LENGTH.unpack_from(data)
+    offset = LENGTH.size
+    sections = {}
+    for _ in range(count):
+        tag, key, length = SECTION_ENTRY.unpack_from(data, offset)
+        offset += SECTION_ENTRY.size
+        sections[(tag, key)] = data[offset:offset + length]
+        offset += length
+    return sections
+
+
+class SessionRecorder:
+    """Appends one session's commands, choices and dice to a log file."""
+
+    def __init__(self, path=SESSION_FILE):
+        self.path = path
+        self.file = None
+        self.combat = rng.stream("combat")
+
+    def started(self):
+        return self.file is not None
+
+    def start(self, character=None, game_map=None, mission=None, map_size=None):
+        """Begin a new log (replacing an old one) that starts from the given state."""
+        self.close()
+        self.file = open(self.path, 'wb')
+        self.file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION))
+        self._write_blob(EV_STATE, pack_sections(encode_session_state(character, game_map, mission, map_size)))
+        self.combat.on_roll = self.dice
+        logger.debug("Recording the session to %s", self.path)
+
+    def _write_blob(self, op, data):
+        self.file.write(bytes([op]) + LENGTH.pack(len(data)) + data)
+
+    def command(self, command):
+        # Flushed per command, so a log sent in after a crash holds everything up to it
+        self.file.write(bytes((EV_COMMAND, COMMAND_CODES[command])))
+        self.file.flush()
+
+    def choice(self, choices, player_choice):
+        self.file.write(bytes((EV_CHOICE, NO_CHOICE if player_choice is None else choices.index(player_choice))))
+
+    def dice(self, roll):
+        self.file.write(bytes((EV_DICE, roll)))
+
+    def character_created(self, name, species):
+        self._write_blob(EV_CHARACTER, encode_json({"name": name, "species": species}))
+
+    def close(self):
+        if self.file is not None:
+            self.combat.on_roll = None
+            self.file.close()
+            self.file = None
+
+
+def read_log(path):
+    """
+    The events of a log as (op, value) pairs; value is a number, or the raw data of a STATE
+    or CHARACTER record.  A record cut off at the end of the file (a crash) is dropped.
+    """
+    with open(path, 'rb') as log_file:
+        data = log_file.read()
+    if len(data) < LOG_HEADER.size or LOG_HEADER.unpack_from(data) != (LOG_MAGIC, LOG_VERSION):
+        raise SessionLogError(f"{path} is not a version {LOG_VERSION} session log.")
+    events = []
+    offset = LOG_HEADER.size
+    end = len(data)
+    while offset < end:
+        op = data[offset]
+        if op == EV_STATE or op == EV_CHARACTER:
+            if offset + 1 + LENGTH.size > end:
+                break
+            (length,) = LENGTH.unpack_from(data, offset + 1)
+            start = offset + 1 + LENGTH.size
+            if start + length > end:
+                break
+            events.append((op, data[start:start + length]))
+            offset = start + length
+        elif op in (EV_COMMAND, EV_CHOICE, EV_DICE):
+            if offset + 2 > end:
+                break
+            events.append((op, data[offset + 1]))
+            offset += 2
+        else:
+            raise SessionLogError(f"Unknown record type {op} at byte {offset} of {path}.")
+    if not events or events[0][0] != EV_STATE:
+        raise SessionLogError(f"{path} does not start with the session's state.")
+    return events
+
+
+class SessionReplayer:
+    """
+    Re-applies a recorded session headlessly.  turn counts the commands applied so far;
+    character, game_map and mission_type are the state after them.
+    """
+
+    def __init__(self, events, sink=None, checkpoint_turns=CHECKPOINT_TURNS):
+        self.events = events
+        self.session = HeadlessSession(sink)
+        self.checkpoint_turns = checkpoint_turns
+        self.checkpoints = {}  # turn -> (event position, STATE sections)
+        self.turns = sum(1 for op, _ in events if op == EV_COMMAND)
+        self.restore(0, 1, unpack_sections(events[0][1]))
+
+    @classmethod
+    def from_file(cls, path=SESSION_FILE, sink=None):
+        return cls(read_log(path), sink)
+
+    def restore(self, turn, position, sections):
+        state = decode_session_state(sections)
+        rng.restore(state["rng"])
+        self.character = state["character"]
+        self.game_map = state["game_map"]
+        self.mission_type = (state["mission"] or {}).get("mission_type")
+        self.map_size = state["map_size"]
+        self.turn = turn
+        self.position = position
+        self.checkpoints.setdefault(turn, (position, sections))
+
+    def checkpoint(self):
+        sections = encode_session_state(self.character, self.game_map,
+                                        {"mission_type": self.mission_type}, self.map_size)
+        self.checkpoints[self.turn] = (self.position, sections)
+
+    def next_event(self, expected):
+        if self.position >= len(self.events):
+            raise SessionLogError(f"The log ends in the middle of turn {self.turn}.")
+        op, value = self.events[self.position]
+        if op != expected:
+            raise SessionLogError(f"Turn {self.turn}: the replay expected record type {expected}, the log has {op}.")
+        self.position += 1
+        return value
+
+    def choose_option(self, game_window, prompt, choices):
+        """Choice policy for trigger_event that answers with the recorded choice."""
+        picked = self.next_event(EV_CHOICE)
+        return None if picked == NO_CHOICE else choices[picked]
+
+    def check_roll(self, roll):
+        recorded = self.next_event(EV_DICE)
+        if roll != recorded:
+            raise SessionLogError(f"Turn {self.turn}: the log rolled {recorded} but the replay rolled {roll}.")
+
+    def run(self, until=None):
+        """Replay up to turn until (the end of the log if None) and return the turn reached."""
+        until = self.turns if until is None else until
+        events = self.events
+        combat = rng.stream("combat")
+        combat.on_roll = self.check_roll
+        try:
+            with game_log.quiet():
+                while self.position < len(events):
+                    op, value = events[self.position]
+                    if op == EV_COMMAND and self.turn >= until:
+                        break
+                    self.position += 1
+                    if op == EV_COMMAND:
+                        self.apply_command(COMMANDS[value])
+                        self.turn += 1
+                        if self.turn % self.checkpoint_turns == 0 and self.turn not in self.checkpoints:
+                            self.checkpoint()
+                    elif op == EV_CHARACTER:
+                        self.create_character(json.loads(value))
+                    elif op == EV_STATE:
+                        self.restore(self.turn, self.position, unpack_sections(value))
+                    else:
+                        raise SessionLogError(f"Turn {self.turn}: record type {op} outside of a command.")
+        finally:
+            combat.on_roll = None
+        return self.turn
+
+    def seek(self, turn):
+        """Go to the state after the given number of commands, backwards or forwards."""
+        turn = max(0, min(turn, self.turns))
+        start = max(saved for saved in self.checkpoints if saved <= turn)
+        if turn < self.turn or start > self.turn:
+            position, sections = self.checkpoints[start]
+            self.restore(start, position, sections)
+        return self.run(turn)
+
+    def create_character(self, details):
+        """Mirrors GameWindow.confirm_character_creation."""
+        character_stream = rng.stream("character")
+        skills = {skill: character_stream.randint(5, 15) for skill in CHARACTER_SKILLS}
+        self.character = Character(details["name"], details["species"], skills=skills, items=STARTING_ITEMS)
+
+    def apply_command(self, command):
+        """Mirrors GameWindow.execute_command for everything that changes the game's state."""
+        sink = self.session.interactive_window
+        if command in ("Start Mission", "Explore") and self.character is None:
+            return
+        if command == "Start Mission":
+            self.mission_type = rng.stream("map").choice(MISSION_TYPES)
+            sink.append(f"Mission Start: {get_mission_story(self.mission_type, 'start')}")
+            self.game_map = create_game_map(self.map_size[0], self.map_size[1], self.mission_type)
+        elif command in DIRECTIONS and self.game_map is not None:
+            result = self.game_map.move_player(DIRECTIONS[command])
+            if result is None:
+                sink.append("You can't move in that direction.")
+                return
+            sink.append(f"You moved to a {result} room.")
+            room_type = handle_room(self.game_map, self.character, self.session, self.choose_option)
+            if room_type == "Objective":
+                sink.append(f"{MISSION_COMPLETE_PREFIX}{get_mission_story(self.mission_type, 'end')}")
+
+
+def main(path=SESSION_FILE, turn=None):
+    events = read_log(path)
+    replayer = SessionReplayer(events, ListSink() if turn is not None else NullSink())
+    start = time.perf_counter()
+    reached = replayer.seek(int(turn)) if turn is not None else replayer.run()
+    elapsed = time.perf_counter() - start
+    applied = replayer.position
+    print(f"Replayed {applied} events ({reached} of {replayer.turns} turns) in {elapsed:.3f}s "
+          f"({applied / max(elapsed, 1e-9):.0f} events/s)")
+    character, game_map = replayer.character, replayer.game_map
+    if character is not None:
+        print(f"{character.name}: health {character.health}, XP {character.xp}, items {character.items.labels()}")
+    if game_map is not None:
+        print(f"{replayer.mission_type} mission, player at ({game_map.player_x}, {game_map.player_y})")
+    if turn is not None:
+        print("\n".join(replayer.session.interactive_window.lines[-10:]))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:3])
@@ -0,0 +1,177 @@
+# speech_queue.py
+"""
+Text-to-speech off the GUI thread.
+
+pyttsx3's runAndWait blocks until a phrase has been spoken, so the engine lives on its
+own worker thread and GameWindow only drops text into a small priority queue.  Repeated
+lines are coalesced, lines that waited too long are skipped, and a new mission can
+cancel whatever is still queued (and cut off the phrase being spoken).
+Lines found in a tts_cache.TtsCache are played from disk through pygame.mixer instead of
+being synthesized.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+from game_log import get_logger
+
+PRIORITY_HIGH = 0  # Mission briefings and results; never dropped as stale
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2  # Chatter such as "Moving North"; first to go when the queue is full
+
+MAX_QUEUED = 8
+STALE_AFTER = 6.0  # Seconds a non-high-priority line may wait before it is skipped
+MAX_LOADED_SOUNDS = 32
+PLAYBACK_POLL_SECONDS = 0.02
+
+logger = get_logger(__name__)
+
+
+def create_pyttsx3_engine(rate, volume):
+    import pyttsx3  # Imported on the worker thread so startup doesn't pay for it
+
+    engine = pyttsx3.init()
+    engine.setProperty('rate', rate)
+    engine.setProperty('volume', volume)
+    return engine
+
+
+class SpeechQueue:
+    """Bounded priority queue of phrases spoken one at a time by a background thread."""
+
+    def __init__(self, rate=150, volume=1, engine_factory=create_pyttsx3_engine,
+                 max_queued=MAX_QUEUED, stale_after=STALE_AFTER, audio_cache=None):
+        self.rate = rate
+        self.volume = volume
+        self.engine_factory = engine_factory
+        self.max_queued = max_queued
+        self.stale_after = stale_after
+        self.audio_cache = audio_cache
+        self.sounds = {}  # path -> pygame Sound, so repeated lines aren't decoded again
+        self.engine = None
+        self.spoken = 0
+        self.played = 0
+        self.dropped = 0
+        self._queue = []  # heap of (priority, sequence, queued_at, text)
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._interrupt = False
+        self._closed = False
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="speech-queue", daemon=True)
+        self._thread.start()
+
+    def say(self, text, priority=PRIORITY_NORMAL):
+        """Queue text to be spoken; returns immediately."""
+        with self._condition:
+            if self._closed:
+                return
+            # Coalesce: a line that is already waiting is not queued twice
+            for index, entry in enumerate(self._queue):
+                if entry[3] == text:
+                    if entry[0] <= priority:
+                        return
+                    self._queue.pop(index)
+                    heapq.heapify(self._queue)
+                    break
+            heapq.heappush(self._queue, (priority, next(self._sequence), time.monotonic(), text))
+            while len(self._queue) > self.max_queued:
+                self._queue.remove(max(self._queue))  # Lowest priority, newest first
+                heapq.heapify(self._queue)
+                self.dropped += 1
+            self._condition.notify()
+
+    def cancel_pending(self, interrupt=True):
+        """Forget every queued line and, with interrupt, stop the one being spoken."""
+        with self._condition:
+            self.dropped += len(self._queue)
+            self._queue.clear()
+            self._interrupt = interrupt
+
+    def wait_until_ready(self, timeout=None):
+        """Block until the engine finished initializing (or failed to)."""
+        return self._ready.wait(timeout)
+
+    def pending(self):
+        with self._condition:
+            return len(self._queue)
+
+    def close(self):
+        """Stop the worker after the phrase currently being spoken."""
+        with self._condition:
+            self._closed = True
+            self._queue.clear()
+            self._condition.notify()
+
+    def _on_word(self, name, location, length):
+        if self._interrupt:
+            self.engine.stop()
+
+    def _next_text(self):
+        """Wait for the next line worth speaking; None once the queue is closed."""
+        with self._condition:
+            while True:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return None
+                priority, _, queued_at, text = heapq.heappop(self._queue)
+                if priority != PRIORITY_HIGH and time.monotonic() - queued_at > self.stale_after:
+                    self.dropped += 1
+                    continue
+                self._interrupt = False
+                return text
+
+    def _play_cached(self, text):
+        """Play text from the audio cache; False if it isn't cached or the mixer isn't up."""
+        path = self.audio_cache.lookup(text) if self.audio_cache is not None else None
+        if path is None:
+            return False
+        import pygame
+
+        if not pygame.mixer.get_init():
+            return False
+        sound = self.sounds.get(path)
+        if sound is None:
+            if len(self.sounds) >= MAX_LOADED_SOUNDS:
+                self.sounds.pop(next(iter(self.sounds)))
+            sound = self.sounds[path] = pygame.mixer.Sound(path)
+        channel = sound.play()
+        while channel is not None and channel.get_busy():
+            if self._interrupt:
+                channel.stop()
+                break
+            time.sleep(PLAYBACK_POLL_SECONDS)
+        self.played += 1
+        return True
+
+    def _run(self):
+        try:
+            self.engine = self.engine_factory(self.rate, self.volume)
+            self.engine.connect('started-word', self._on_word)
+        except Exception as e:
+            logger.warning("Text-to-speech unavailable: %s", e)
+            self.engine = None
+        finally:
+            self._ready.set()
+
+        while True:
+            text = self._next_text()
+            if text is None:
+                break
+            try:
+                if self._play_cached(text):
+                    continue
+            except Exception as e:
+                logger.error("Error playing cached speech: %s", e)
+            if self.engine is None:
+                self.dropped += 1
+                continue
+            try:
+                self.engine.say(text)
+                self.engine.runAndWait()
+                self.spoken += 1
+            except Exception as e:
+                logger.error("Error speaking text: %s", e)
@@ -0,0 +1,46 @@
+# startup.py
+"""
+Staged startup: the game window is shown first and the slow subsystems (audio, speech)
+start on a background thread afterwards.  Progress goes out through Qt signals, so the
+splash screen can show it and close as soon as the work is actually done.
+"""
+
+import threading
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from game_log import get_logger
+from instrumentation import span
+
+logger = get_logger(__name__)
+
+
+class StartupPipeline(QObject):
+    """Runs (label, callable) stages one after another on a background thread."""
+
+    progress = pyqtSignal(str, int)  # stage label, percent done
+    finished = pyqtSignal(dict)  # stage label -> seconds it took
+
+    def __init__(self, stages, parent=None):
+        super().__init__(parent)
+        self.stages = list(stages)
+        self.timings = {}
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="startup", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        for index, (label, stage) in enumerate(self.stages):
+            self.progress.emit(label, index * 100 // len(self.stages))
+            started = time.perf_counter()
+            try:
+                with span(f"startup.{label}"):
+                    stage()
+            except Exception as e:
+                logger.error("Startup stage '%s' failed: %s", label, e)
+            self.timings[label] = time.perf_counter() - started
+        self.progress.emit("Ready", 100)
+        self.finished.emit(dict(self.timings))
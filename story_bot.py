@@ -1,5 +1,7 @@
 # story_bot.py
-import random
+from rng import stream
+
+dialogue = stream("dialogue")
 
 # Sample lore and story elements
 story_elements = {
@@ -29,7 +31,7 @@ story_elements = {
 
 def get_random_intro():
     """Return a random introduction element for the game."""
-    return random.choice(story_elements["intro"])
+    return dialogue.choice(story_elements["intro"])
 
 def get_mission_story(mission_type, stage):
     """Get the story for a given mission type and stage (start, mid, end)."""
@@ -0,0 +1,108 @@
+# tests/test_autosave.py
+
+import threading
+import time
+
+import autosave
+from autosave import AutosaveService
+from character import Character
+from map_bot import GameMap
+from save_format import SaveGame
+
+
+def start(tmp_path, debounce=60, max_delay=60):
+    game_map = GameMap(8, 8, "rescue", seed=3)
+    service = AutosaveService(SaveGame(str(tmp_path / "game.ams")), debounce=debounce, max_delay=max_delay)
+    assert service.snapshot_wanted
+    return service, Character("Worf", "Klingon"), game_map
+
+
+def load(tmp_path):
+    return SaveGame(str(tmp_path / "game.ams")).load()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_snapshot_is_encoded_on_the_writer_from_a_copy(tmp_path, monkeypatch):
+    encoded_on = []
+    real_encode = autosave.encode_captured
+
+    def encode_captured(state):
+        encoded_on.append(threading.current_thread().name)
+        return real_encode(state)
+
+    monkeypatch.setattr(autosave, "encode_captured", encode_captured)
+    service, character, game_map = start(tmp_path)
+    history = ["Welcome aboard."]
+    service.snapshot(character, game_map, {"mission_type": "rescue"}, history)
+    assert encoded_on == [] and not service.snapshot_wanted
+
+    character.gain_xp(40)  # Changes after the snapshot was queued are not part of it
+    game_map.player_x = 5
+    history.append("Later line")
+    assert service.flush(5)
+    assert encoded_on == ["autosave"]
+    state = load(tmp_path)
+    assert state["character"].xp == 0
+    assert state["game_map"].player_x != 5
+    assert list(state["history"]) == ["Welcome aboard."]
+    service.close()
+
+
+def test_changes_wait_for_the_player_to_pause(tmp_path):
+    service, character, game_map = start(tmp_path, debounce=0.3)
+    service.snapshot(character, game_map)
+    assert service.flush(5) and service.batches == 1
+    for x in range(1, 4):
+        game_map.player_x = x
+        service.moved(game_map)
+    assert service.queue_depth() == 1  # Repeated moves collapse into the newest one
+    time.sleep(0.1)
+    assert service.batches == 1
+    assert wait_for(lambda: service.batches == 2)
+    assert service.queue_depth() == 0 and service.status()["errors"] == 0
+    assert load(tmp_path)["game_map"].player_x == 3
+    service.close()
+
+
+def test_max_delay_writes_while_the_player_keeps_moving(tmp_path):
+    service, character, game_map = start(tmp_path, debounce=0.2, max_delay=0.4)
+    service.snapshot(character, game_map)
+    assert service.flush(5)
+    started = time.monotonic()
+    while service.batches == 1 and time.monotonic() - started < 5:
+        game_map.player_x = (game_map.player_x + 1) % 8
+        service.moved(game_map)
+        time.sleep(0.05)  # Never quiet for the whole debounce
+    assert service.batches == 2
+    assert time.monotonic() - started < 2
+    service.close()
+
+
+def test_flush_and_close_write_what_is_queued(tmp_path):
+    service, character, game_map = start(tmp_path)
+    service.snapshot(character, game_map)
+    game_map.set_room(2, 2, "Cleared")
+    service.room_changed(2, 2, "Cleared")
+    assert service.queue_depth() == 2
+    assert service.flush(5)
+    assert service.queue_depth() == 0 and service.snapshots == 1
+    assert load(tmp_path)["game_map"].get_room(2, 2) == "Cleared"
+
+    character.gain_xp(25)
+    service.character_changed(character)
+    service.close()  # Long debounce, but closing still writes the queued record
+    assert load(tmp_path)["character"].xp == 25
+
+
+def test_records_without_a_snapshot_are_not_written(tmp_path):
+    service, character, game_map = start(tmp_path)
+    service.moved(game_map)
+    assert service.flush(5)
+    assert not service.save_game.has_snapshot()
+    service.close()
@@ -0,0 +1,27 @@
+# tests/test_balance_sim.py
+
+from balance_sim import simulate
+from events import event_data
+
+CELL = {"mission_types": ["rescue", "stealth"],
+        "profiles": {"weak": {"Strength": 5, "Agility": 5, "Intelligence": 5},
+                     "strong": {"Strength": 15, "Agility": 15, "Intelligence": 15}}}
+
+
+def test_worker_count_does_not_change_the_results():
+    one = simulate(60, master_seed=5, workers=1, shard_size=25, **CELL)
+    two = simulate(60, master_seed=5, workers=2, shard_size=25, **CELL)
+    assert one == two
+    assert simulate(60, master_seed=6, workers=2, shard_size=25, **CELL) != one
+
+
+def test_event_overrides_reach_the_workers():
+    before = {room: dict(values) for room, values in event_data.items()}
+    overrides = {room: {"xp_reward": 0, "failure_penalty": 0} for room in event_data}
+    report = simulate(40, master_seed=1, workers=2, shard_size=10, overrides=overrides, **CELL)
+    for summary in report.values():
+        assert summary["xp_per_hour"] == 0
+        assert summary["damage_histogram"] == {0: 40}
+    assert event_data == before
+    plain = simulate(40, master_seed=1, workers=2, shard_size=10, **CELL)
+    assert any(summary["xp_per_hour"] > 0 for summary in plain.values())
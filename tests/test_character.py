@@ -0,0 +1,77 @@
+# tests/test_character.py
+
+import pickle
+
+import pytest
+
+from character import Character
+from inventory import Inventory
+
+
+def make_character():
+    character = Character("Kira", "Bajoran", health=70, xp=30, gold=12,
+                          skills={"Strength": 12, "Agility": 9, "Intelligence": 11})
+    character.add_item("Healing Potion")
+    character.add_item("Healing Potion")
+    return character
+
+
+def test_pickle_round_trip_uses_the_plain_state():
+    character = make_character()
+    state = character.__getstate__()
+    assert state == character.to_dict()
+    assert state["items"] == {"basic_sword": 1, "health_potion": 1, "healing_potion": 2}
+    copy = pickle.loads(pickle.dumps(character))
+    assert copy.to_dict() == character.to_dict()
+    assert isinstance(copy.items, Inventory) and copy.listeners == []
+    assert not hasattr(copy, "__dict__")
+
+
+def test_setstate_accepts_old_dict_state():
+    character = Character.__new__(Character)
+    character.__setstate__({"name": "Odo", "species": "Changeling", "health": "55", "items": ["Shield"],
+                            "inventory_size": 3})  # Unknown keys from old pickles are ignored
+    assert (character.name, character.health, character.level) == ("Odo", 55, 1)
+    assert character.items.count("Shield") == 1
+
+
+def test_mapping_shim():
+    character = make_character()
+    assert character["health"] == 70 and character.get("xp") == 30
+    assert character.get("mana", 5) == 5
+    assert "gold" in character and "mana" not in character
+    assert list(character.keys()) == list(Character.FIELDS)
+    character["gold"] = 40
+    assert character.gold == 40
+    with pytest.raises(KeyError):
+        character["mana"]
+    with pytest.raises(KeyError):
+        character["mana"] = 1
+    with pytest.raises(AttributeError):
+        character.mana = 1  # __slots__: no stray attributes
+
+
+def test_watched_fields_notify_listeners():
+    character = make_character()
+    heard = []
+    listener = lambda who, field: heard.append(field)
+    character.subscribe(listener)
+
+    character.health = 50
+    character["name"] = "Nerys"
+    character.skill_points = 1
+    character.increase_skill("Agility")
+    character.add_item("Shield")
+    character.use_item("Healing Potion")
+    character.items = ["Basic Sword"]
+    assert heard == ["health", "name", "skills", "items", "health", "items", "items"]
+
+    heard.clear()
+    character.xp = 10  # Not shown on the character sheet: no notification
+    character.gold = 99
+    character.energy = 20
+    assert heard == []
+
+    character.unsubscribe(listener)
+    character.health = 10
+    assert heard == []
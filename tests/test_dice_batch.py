@@ -0,0 +1,33 @@
+# tests/test_dice_batch.py
+
+import numpy as np
+
+from dice_batch import event_check_batch, make_rng, roll_dice_batch, skill_check_batch, threshold_check_batch
+from dice_roll import is_successful
+from events import event_data
+
+
+def test_rolls_are_int16_d20s():
+    rolls = roll_dice_batch(100_000, make_rng(1))
+    assert rolls.dtype == np.int16
+    assert rolls.min() == 1 and rolls.max() == 20
+    assert len(np.unique(rolls)) == 20
+
+
+def test_threshold_checks_agree_with_is_successful():
+    skills = np.arange(1000, dtype=np.int16) % 21
+    success, rolls, totals = threshold_check_batch(skills, make_rng(2))
+    assert (totals == rolls + skills).all()
+    assert success.tolist() == [is_successful(int(roll), int(skill)) for roll, skill in zip(rolls, skills)]
+
+
+def test_skill_checks_agree_with_perform_skill_check_rule():
+    skills = np.arange(1000, dtype=np.int16) % 16
+    difficulties = np.arange(1000, dtype=np.int16) % 25
+    success, rolls, _ = skill_check_batch(skills, difficulties, make_rng(3))
+    assert success.tolist() == [int(roll) + int(skill) >= int(difficulty)
+                                for roll, skill, difficulty in zip(rolls, skills, difficulties)]
+    success, rolls, _ = event_check_batch("Enemy", skills, make_rng(3))
+    assert success.tolist() == [int(roll) + int(skill) >= event_data["Enemy"]["difficulty"]
+                                for roll, skill in zip(rolls, skills)]
+
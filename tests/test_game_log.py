@@ -0,0 +1,62 @@
+# tests/test_game_log.py
+
+import logging
+
+import pytest
+
+import game_log
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "game.log"
+    yield path
+    game_log.configure()  # Back to the default stdout writer for the other tests
+
+
+def read_messages(path):
+    game_log.shutdown()  # Stops the listener, which flushes everything queued
+    return [line.split(": ", 1)[1] for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_records_below_the_level_are_dropped(log_file):
+    game_log.configure("WARNING", str(log_file))
+    logger = game_log.get_logger("test")
+    assert not logger.isEnabledFor(logging.INFO)
+    logger.info("hidden %s", "info")
+    logger.warning("shown %s", "warning")
+    game_log.set_level(logging.DEBUG)
+    logger.debug("shown debug")
+    assert read_messages(log_file) == ["shown warning", "shown debug"]
+
+
+def test_file_records_carry_level_and_module(log_file):
+    game_log.configure("INFO", str(log_file))
+    game_log.get_logger("map_bot").error("Lost the map")
+    game_log.shutdown()
+    assert log_file.read_text(encoding="utf-8").rstrip().endswith(
+        "ERROR away_mission.map_bot: Lost the map")
+
+
+def test_quiet_drops_chatter_and_restores_the_level(log_file):
+    game_log.configure("INFO", str(log_file))
+    logger = game_log.get_logger("test")
+    with game_log.quiet():
+        logger.info("during quiet")
+        logger.warning("warning during quiet")
+    logger.info("after quiet")
+    with pytest.raises(RuntimeError):
+        with game_log.quiet(logging.CRITICAL):
+            raise RuntimeError
+    assert logging.getLogger(game_log.ROOT_LOGGER_NAME).level == logging.INFO
+    assert read_messages(log_file) == ["warning during quiet", "after quiet"]
+
+
+def test_level_comes_from_the_environment(log_file, monkeypatch):
+    monkeypatch.setenv(game_log.LOG_LEVEL_ENV_VAR, "error")
+    monkeypatch.setenv(game_log.LOG_FILE_ENV_VAR, str(log_file))
+    game_log.configure()
+    logger = game_log.get_logger("test")
+    logger.warning("hidden")
+    logger.error("shown")
+    assert read_messages(log_file) == ["shown"]
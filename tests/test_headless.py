@@ -0,0 +1,62 @@
+# tests/test_headless.py
+
+from headless import (
+    HeadlessSession, ListSink, RandomChoicePolicy, along_shortest_path, handle_room, new_character,
+    run_mission, run_missions
+)
+from map_bot import GameMap
+from rng import seed as seed_streams
+
+
+def test_mission_runs_to_the_objective():
+    seed_streams(1)
+    sink = ListSink()
+    result = run_mission(new_character(), "exploration", 9, 9, sink=sink)
+    assert result["completed"] and not result["died"]
+    assert result["xp_gained"] >= 0
+    assert sink.lines[0].startswith("Mission Start: ")
+    assert sink.lines[-1].startswith("Mission Complete: ")
+    assert sum(result["encounters"].values()) <= result["turns"]
+
+
+def test_seeded_runs_repeat_exactly():
+    def play():
+        sink = ListSink()
+        results = run_missions(20, seed=7, choose_option=RandomChoicePolicy(), sink=sink)
+        return results, sink.lines
+
+    assert play() == play()
+
+
+def test_xp_gained_is_only_this_missions_xp():
+    seed_streams(3)
+    character = new_character()
+    character.xp = 50
+    result = run_mission(character, "rescue", 7, 7)
+    assert character.level == 1
+    assert result["xp_gained"] == character.xp - 50
+
+
+def test_encounter_rooms_are_cleared():
+    seed_streams(2)
+    game_map = GameMap(5, 5, "rescue")
+    game_map.set_room(0, 0, "Trap")
+    sink = ListSink()
+    assert handle_room(game_map, new_character(), HeadlessSession(sink)) == "Trap"
+    assert game_map.get_room(0, 0) == "Cleared"
+    assert handle_room(game_map, new_character(), HeadlessSession(sink)) == "Cleared"
+
+
+def test_shortest_path_policy_walks_around_walls():
+    game_map = GameMap(6, 6, "exploration", seed=4)
+    for y in range(6):
+        for x in range(6):
+            game_map.set_room(x, y, "Empty")
+    for y in range(5):
+        game_map.set_room(2, y, None)  # A wall with one gap, at the bottom
+    game_map.objective_x, game_map.objective_y = 5, 0
+    steps = 0
+    while (game_map.player_x, game_map.player_y) != (5, 0):
+        assert game_map.move_player(along_shortest_path(game_map)) is not None
+        steps += 1
+    assert steps == 15
@@ -0,0 +1,60 @@
+# tests/test_instrumentation.py
+
+import os
+import subprocess
+import sys
+
+import instrumentation
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import instrumentation
+
+def work(value):
+    return value * 2
+
+timed_work = instrumentation.timed("work")(work)
+with instrumentation.span("block"):
+    timed_work(3)
+instrumentation.count("rooms", 2)
+print(timed_work is work, timed_work(4), instrumentation.span("x") is instrumentation._NULL_SPAN)
+print(sorted(instrumentation._durations), instrumentation._counters)
+"""
+
+
+def run_probe(tmp_path, mode):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop(instrumentation.PROFILE_ENV_VAR, None)
+    if mode is not None:
+        env[instrumentation.PROFILE_ENV_VAR] = mode
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=60, check=True)
+    return result.stdout.splitlines()
+
+
+def test_disabled_instrumentation_leaves_functions_untouched(tmp_path, monkeypatch):
+    assert run_probe(tmp_path, None)[:2] == ["True 8 True", "[] {}"]
+    assert run_probe(tmp_path, "off")[:2] == ["True 8 True", "[] {}"]
+    assert not (tmp_path / instrumentation.REPORT_FILE).exists()
+
+    monkeypatch.setattr(instrumentation, "ENABLED", False)
+
+    def work():
+        return 1
+
+    assert instrumentation.timed()(work) is work
+
+
+def test_report_mode_times_calls_and_writes_a_report(tmp_path):
+    lines = run_probe(tmp_path, "report")
+    assert lines[:2] == ["False 8 False", "['block', 'work'] {'rooms': 2}"]
+    report = (tmp_path / instrumentation.REPORT_FILE).read_text()
+    assert "work" in report and "block" in report and "rooms" in report
+    assert not (tmp_path / instrumentation.TRACE_FILE).exists()
+
+
+def test_percentile():
+    values = [5, 1, 4, 2, 3]
+    assert instrumentation.percentile(values, 0.5) == 3
+    assert instrumentation.percentile(values, 0.95) == 5
@@ -0,0 +1,46 @@
+# tests/test_inventory.py
+
+import pytest
+
+from inventory import Inventory, item_id, item_name, item_price
+
+
+def test_items_stack_by_id():
+    inventory = Inventory(["Health Potion", "health_potion", "Shield"])
+    inventory.add("Health Potion", 2)
+    assert inventory.count("health_potion") == 4
+    assert inventory.stacks() == [("Health Potion", 4), ("Shield", 1)]
+    assert inventory.labels() == ["Health Potion x4", "Shield"]
+    assert len(inventory) == 5
+    assert list(inventory).count("Health Potion") == 4
+
+
+def test_remove_takes_from_the_stack():
+    inventory = Inventory({"shield": 2})
+    inventory.remove("Shield")
+    assert inventory.count("Shield") == 1 and "Shield" in inventory
+    inventory.remove("Shield")
+    assert "Shield" not in inventory and inventory.to_dict() == {} and len(inventory) == 0
+    with pytest.raises(ValueError):
+        inventory.remove("Shield")
+
+
+def test_adding_nothing_leaves_no_entry():
+    changes = []
+    inventory = Inventory({"shield": 0, "gold": 3})
+    inventory.on_change = lambda: changes.append(1)
+    inventory.add("Health Potion", 0)
+    assert "Health Potion" not in inventory and "Shield" not in inventory
+    assert inventory.to_dict() == {"gold": 3} and changes == []
+    with pytest.raises(ValueError):
+        inventory.add("Gold", -1)
+    assert inventory.count("Gold") == 3 and len(inventory) == 3
+
+
+def test_unknown_items_get_derived_ids():
+    assert item_id("Phaser Rifle") == "phaser_rifle"
+    assert item_name("phaser_rifle") == "Phaser Rifle"
+    assert item_price("Phaser Rifle") == 0
+    inventory = Inventory(["Phaser Rifle", "phaser rifle"])
+    assert inventory.stacks() == [("Phaser Rifle", 2)]
+    assert Inventory(inventory) == inventory
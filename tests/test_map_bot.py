@@ -0,0 +1,36 @@
+# tests/test_map_bot.py
+
+import pytest
+
+from map_bot import OBSTACLE_LABEL, ChunkedGameMap, GameMap
+from room_grid import RoomType
+
+
+def test_display_map_prints_obstacles(capsys):
+    game_map = GameMap(8, 8, "stealth", seed=2)
+    game_map.map_grid.set(3, 4, RoomType.NONE)
+    game_map.display_map()
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 8
+    assert lines[4].split(" | ")[3] == OBSTACLE_LABEL
+
+
+def test_chunked_display_map_prints_obstacles(capsys):
+    game_map = ChunkedGameMap(1000, 1000, "stealth", seed=4)
+    game_map.player_x = game_map.player_y = 500
+    game_map.set_room(499, 500, None)
+    game_map.set_room(500, 500, "Cleared")
+    game_map.set_room(501, 500, "Empty")
+    game_map.display_map(radius=1)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1].split(" | ") == [OBSTACLE_LABEL, "Cleared", "Empty"]
+
+
+@pytest.mark.parametrize("seed", [0, 7, 123])
+@pytest.mark.parametrize("chunk_size", [64, 50, 128])
+def test_chunked_map_has_the_same_rooms_as_a_full_map(seed, chunk_size):
+    for mission_type in ("rescue", "exploration", "stealth"):
+        full = GameMap(300, 170, mission_type, seed=seed)
+        chunked = ChunkedGameMap(300, 170, mission_type, seed=seed, chunk_size=chunk_size, max_resident_chunks=4)
+        assert chunked.region_codes(0, 0, 300, 170) == bytes(full.map_grid.cells)
+        assert (chunked.objective_x, chunked.objective_y) == (full.objective_x, full.objective_y)
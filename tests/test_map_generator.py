@@ -0,0 +1,72 @@
+# tests/test_map_generator.py
+
+import random
+from collections import deque
+
+import pytest
+
+from map_bot import GameMap
+from map_generator import LAYOUT_CHUNK, MISSION_PROFILES, MapLayout
+from room_grid import RoomType
+
+MISSION_TYPES = list(MISSION_PROFILES) + ["survey"]  # "survey" falls back to the default profile
+
+
+def reachable(grid):
+    """Every cell connected to the start corner through cells that aren't walls."""
+    width, height, cells = grid.width, grid.height, grid.cells
+    seen = bytearray(width * height)
+    seen[0] = 1
+    queue = deque([0])
+    while queue:
+        index = queue.popleft()
+        x, y = index % width, index // width
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= nx < width and 0 <= ny < height:
+                neighbour = ny * width + nx
+                if not seen[neighbour] and cells[neighbour] != RoomType.NONE:
+                    seen[neighbour] = 1
+                    queue.append(neighbour)
+    return seen
+
+
+def assert_solvable(layout):
+    grid = layout.grid()
+    seen = reachable(grid)
+    x, y = layout.objective
+    assert grid.get(x, y) == RoomType.OBJECTIVE
+    assert grid.get(0, 0) == RoomType.START and grid.get(layout.width - 1, layout.height - 1) == RoomType.EXIT
+    assert seen[y * layout.width + x], f"objective cut off: {layout.width}x{layout.height} seed {layout.seed}"
+    assert seen[-1], f"exit cut off: {layout.width}x{layout.height} seed {layout.seed}"
+
+
+def test_random_layouts_are_solvable():
+    picker = random.Random(2024)
+    for _ in range(600):
+        width = picker.choice([2, 3, picker.randint(4, 40), picker.randint(40, 200)])
+        height = picker.choice([2, 3, picker.randint(4, 40), picker.randint(40, 200)])
+        layout = MapLayout(width, height, picker.choice(MISSION_TYPES), picker.getrandbits(64))
+        assert_solvable(layout)
+
+
+@pytest.mark.parametrize("obstacles", [0.5, 0.8, 1.0])
+def test_walled_in_layouts_are_still_solvable(obstacles):
+    picker = random.Random(int(obstacles * 10))
+    for _ in range(40):
+        width, height = picker.randint(2, 150), picker.randint(2, 150)
+        layout = MapLayout(width, height, picker.choice(MISSION_TYPES), picker.getrandbits(64),
+                           densities={"obstacles": obstacles})
+        assert_solvable(layout)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_routes_across_many_chunks_are_solvable(seed):
+    size = LAYOUT_CHUNK * 6 + 7  # Legs and corridors cross several chunk edges
+    assert_solvable(MapLayout(size, size // 2, "stealth", seed, densities={"obstacles": 0.7}))
+
+
+def test_pathfinder_agrees():
+    for seed in range(20):
+        game_map = GameMap(30, 20, MISSION_TYPES[seed % len(MISSION_TYPES)], seed=seed,
+                           densities={"obstacles": 0.6})
+        assert game_map.paths().is_solvable()
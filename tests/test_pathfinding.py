@@ -0,0 +1,94 @@
+# tests/test_pathfinding.py
+
+import random
+from collections import deque
+
+import pytest
+
+import pathfinding
+from map_bot import ChunkedGameMap, GameMap
+from pathfinding import DIRECTIONS, PASSABLE, UNREACHABLE, DistanceField, path_hint
+
+
+def bfs_distances(game_map, goal):
+    """Plain BFS over get_code, to check the pathfinder against."""
+    distances = {goal: 0}
+    queue = deque([goal])
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in DIRECTIONS.values():
+            cell = (x + dx, y + dy)
+            if (0 <= cell[0] < game_map.width and 0 <= cell[1] < game_map.height and cell not in distances
+                    and PASSABLE[game_map.get_code(*cell)]):
+                distances[cell] = distances[(x, y)] + 1
+                queue.append(cell)
+    return distances
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_repaired_field_matches_a_rebuilt_one(seed):
+    picker = random.Random(seed)
+    width, height = 30, 20
+    mask = bytearray(picker.random() > 0.3 for _ in range(width * height))
+    target = picker.randrange(width * height)
+    mask[target] = 1
+    field = DistanceField(mask, width, height, target)
+    for _ in range(300):
+        index = picker.randrange(width * height)
+        if mask[index]:
+            mask[index] = 0
+            field.closed(index)
+        else:
+            mask[index] = 1
+            field.opened(index)
+        assert field.distances == DistanceField(bytearray(mask), width, height, target).distances
+
+
+def test_distances_and_steps_match_bfs_as_rooms_change():
+    picker = random.Random(1)
+    game_map = GameMap(25, 18, "stealth", seed=3)
+    paths = game_map.paths()
+    for _ in range(200):
+        goal = (picker.randrange(25), picker.randrange(18))
+        start = (picker.randrange(25), picker.randrange(18))
+        if PASSABLE[game_map.get_code(*goal)] and PASSABLE[game_map.get_code(*start)]:
+            expected = bfs_distances(game_map, goal)
+            assert paths.distance(start, goal) == expected.get(start)
+            if expected.get(start):
+                dx, dy = DIRECTIONS[paths.next_step(start, goal)]
+                assert expected[(start[0] + dx, start[1] + dy)] == expected[start] - 1
+        game_map.set_room(picker.randrange(25), picker.randrange(18), picker.choice([None, "Empty"]))
+
+
+def test_windowed_distances_match_a_full_field():
+    picker = random.Random(2)
+    game_map = GameMap(400, 400, "stealth", seed=5)  # Past FULL_MASK_CELLS, so searches use windows
+    mask = bytearray(game_map.region_codes(0, 0, 400, 400).translate(PASSABLE))
+    paths = game_map.paths()
+    paths.distance((200, 200), (210, 205))
+    assert paths.window[2] * paths.window[3] < 400 * 400
+    for _ in range(5):
+        goal = (picker.randrange(400), picker.randrange(400))
+        field = DistanceField(mask, 400, 400, goal[1] * 400 + goal[0])
+        for _ in range(5):
+            start = (min(max(goal[0] + picker.randint(-100, 100), 0), 399),
+                     min(max(goal[1] + picker.randint(-100, 100), 0), 399))
+            expected = field[start[1] * 400 + start[0]]
+            assert paths.distance(start, goal) == (None if expected == UNREACHABLE else expected)
+
+
+def test_hint_near_the_objective_only_generates_nearby_chunks():
+    game_map = ChunkedGameMap(20000, 20000, "rescue", seed=1)
+    game_map.player_x, game_map.player_y = game_map.objective_x - 30, game_map.objective_y
+    assert "steps away" in path_hint(game_map)
+    assert len(game_map.chunks) <= 16
+
+
+def test_goals_too_far_to_search_get_a_lower_bound(monkeypatch):
+    monkeypatch.setattr(pathfinding, "MAX_WINDOW_CELLS", 100 * 100)
+    monkeypatch.setattr(pathfinding, "MAX_ROUTE_CELLS", 1000)
+    game_map = ChunkedGameMap(5000, 5000, "rescue", seed=2)
+    game_map.objective_x, game_map.objective_y = 4000, 100
+    assert path_hint(game_map) == "The objective is at least 4100 steps away. Head East."
+    with pytest.raises(pathfinding.SearchTooLarge):
+        game_map.paths().distance((0, 0), (4000, 100))
@@ -0,0 +1,52 @@
+# tests/test_probability.py
+
+from fractions import Fraction
+
+import game_log
+from dice_roll import SUCCESS_THRESHOLD
+from headless import HeadlessSession, along_shortest_path, handle_room, new_character
+from map_bot import GameMap
+from probability import check_probability, event_probability_table, mission_outlook, threshold_probability
+from rng import seed as seed_streams
+
+
+def test_exact_threshold_chances():
+    assert SUCCESS_THRESHOLD == 15
+    assert threshold_probability(0) == Fraction(1, 4)  # 16..20
+    assert threshold_probability(10) == Fraction(3, 4)
+    assert threshold_probability(14) == Fraction(19, 20)
+    assert threshold_probability(15) == 1
+    assert threshold_probability(-5) == 0
+
+
+def test_exact_check_chances():
+    assert check_probability(0, 12) == Fraction(9, 20)  # 12..20
+    assert check_probability(10, 12) == Fraction(19, 20)
+    assert check_probability(11, 12) == 1
+    assert check_probability(0, 21) == 0
+    assert event_probability_table()["Puzzle"][8] == Fraction(15, 20)
+
+
+def test_expected_xp_matches_played_missions():
+    game_map = GameMap(9, 9, "rescue", seed=21)
+    character = new_character()
+    outlook = mission_outlook(game_map, character)
+
+    trials = 4000
+    seed_streams(4)
+    total_xp = 0
+    total_health = 0
+    with game_log.quiet():
+        for _ in range(trials):
+            played = GameMap(9, 9, "rescue", seed=21)
+            player = new_character()
+            session = HeadlessSession()
+            while player.health > 0:
+                played.move_player(along_shortest_path(played))
+                if handle_room(played, player, session) == "Objective":
+                    break
+            total_xp += player.xp
+            total_health += max(player.health, 0)
+    assert outlook["rooms"] > 5
+    assert abs(total_xp / trials - outlook["expected_xp"]) < 0.03 * outlook["expected_xp"]
+    assert abs(total_health / trials - outlook["expected_health"]) < 0.5
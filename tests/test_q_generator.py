@@ -0,0 +1,61 @@
+# tests/test_q_generator.py
+
+import os
+import subprocess
+import sys
+import zlib
+
+import pytest
+
+import q_generator
+import rng
+from q_generator import MarkovModel, generate, load_model, save_model, training_lines
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_model_round_trips_through_bytes(tmp_path):
+    model = MarkovModel.train(training_lines())
+    loaded = MarkovModel.from_bytes(model.to_bytes())
+    assert loaded.words == model.words
+    assert loaded.transitions == model.transitions
+
+    path = str(tmp_path / "q_model.bin")
+    save_model(model, path)
+    assert load_model(path).transitions == model.transitions
+    with pytest.raises(ValueError):
+        MarkovModel.from_bytes(zlib.compress(b"XXXX" + bytes(10)))
+
+
+def test_unreadable_model_is_trained_instead(tmp_path):
+    path = tmp_path / "q_model.bin"
+    path.write_bytes(b"not a model")
+    trained = MarkovModel.train(training_lines())
+    assert load_model(str(path)).transitions == trained.transitions
+    assert load_model(str(tmp_path / "missing.bin")).transitions == trained.transitions
+
+
+def test_replies_leave_the_streams_alone_whether_cached_or_not():
+    rng.seed(5)
+    counters = rng.counters()
+    q_generator._generate.cache_clear()
+    reply = generate("sing me a song")
+    assert reply
+    assert generate("sing me a song") == reply  # From the cache
+    assert rng.counters() == counters
+    q_generator._generate.cache_clear()
+    assert generate("sing me a song") == reply  # Generated again: the same words
+    assert rng.counters() == counters
+
+    questions = ["sing me a song", "tell me a joke", "what is the meaning of life", "i like pizza"]
+    replies = [generate(question) for question in questions]
+    rng.seed(6)
+    assert [generate(question) for question in questions] != replies
+
+
+def test_importing_q_bot_does_not_load_the_model(tmp_path):
+    probe = ("import q_bot, q_generator; print(q_generator.get_model.cache_info().currsize); "
+             "q_bot.query_chatbot('sing me a song'); print(q_generator.get_model.cache_info().currsize)")
+    result = subprocess.run([sys.executable, "-c", probe], cwd=tmp_path, env=dict(os.environ, PYTHONPATH=ROOT),
+                            capture_output=True, text=True, timeout=60, check=True)
+    assert result.stdout.split()[-2:] == ["0", "1"]
@@ -0,0 +1,55 @@
+# tests/test_q_intents.py
+
+import pytest
+
+from q_intents import MIN_SCORE, get_response, match, normalize
+from q_responses import DEFAULT_RESPONSES, Q_RESPONSES
+
+
+def test_normalize_drops_case_apostrophes_and_punctuation():
+    assert normalize("What's my   MISSION?!") == "whats my mission"
+
+
+@pytest.mark.parametrize("question, intent", [
+    ("Who am I?", "who am i"),
+    ("What's my objective", "what's my mission"),
+    ("where is this place", "where am i"),
+    ("what is going on", "what is happening"),
+    ("Q, can you help me please?", "help"),
+    ("any tips", "advice"),
+    ("give me a challenge", "challenge"),
+    ("tell me about starfleet", "starfleet"),
+    ("what do you think of humanity", "humans"),
+])
+def test_paraphrases_match_their_intent(question, intent):
+    matched, score = match(question)
+    assert matched == intent
+    assert score >= MIN_SCORE
+
+
+def test_typos_are_forgiven():
+    assert match("whats my mision")[0] == "what's my mission"
+
+
+@pytest.mark.parametrize("question", [
+    "I like pizza",
+    "sing me a song",
+    "tell me a joke",
+    "where can I buy a sandwich",
+    "what is the meaning of life",
+])
+def test_near_misses_score_below_the_threshold(question):
+    matched, score = match(question)
+    assert matched is None
+    assert score < MIN_SCORE
+
+
+def test_unknown_words_lower_the_score():
+    _, exact = match("where am i")
+    _, diluted = match("where am i on this strange ship")
+    assert diluted < exact
+
+
+def test_get_response_falls_back_to_the_defaults():
+    assert get_response("who am i") in Q_RESPONSES["who am i"]
+    assert get_response("sing me a song") in DEFAULT_RESPONSES
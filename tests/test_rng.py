@@ -0,0 +1,120 @@
+# tests/test_rng.py
+
+from collections import Counter
+
+import pytest
+
+import rng
+from dice_batch import roll_dice_batch
+from rng import BATCH_SIZE, D20_REJECTED, D20_TABLE, RngService
+
+
+def mixed_draws(service, turns):
+    """A bit of everything the game draws, in an uneven pattern."""
+    values = []
+    for turn in range(turns):
+        values.append(service.stream("combat").d20())
+        if turn % 3 == 0:
+            values.append(service.stream("dialogue").choice(["Trader", "QuestGiver"]))
+        if turn % 7 == 0:
+            values.append(service.stream("loot").random())
+            values.append(service.stream("map").getrandbits(100))
+    return values
+
+
+def test_draws_count_32_bit_words():
+    stream = RngService(1).stream("loot")
+    stream.random()
+    assert stream.draws == 2
+    stream.getrandbits(33)
+    assert stream.draws == 4
+    stream.randbytes(8)
+    assert stream.draws == 6
+    stream.d20()
+    assert stream.filled_at == 6 and stream.draws == 6 + BATCH_SIZE // 4
+
+
+def test_d20_is_rejection_sampled_and_fair():
+    assert all(D20_TABLE[value] == value % 20 + 1 for value in range(240))
+    assert len(D20_REJECTED) == 16 and min(D20_REJECTED) == 240
+    stream = RngService(2).stream("combat")
+    rolls = Counter(stream.d20() for _ in range(100_000))
+    assert set(rolls) == set(range(1, 21))
+    assert max(rolls.values()) / min(rolls.values()) < 1.1
+
+
+@pytest.mark.parametrize("turns", [0, 1, 40, 700])
+def test_restored_counters_reproduce_the_next_draws(turns):
+    played = RngService(3)
+    mixed_draws(played, turns)
+    counters = played.counters()
+    upcoming = mixed_draws(played, 60)
+
+    from_seed = RngService(3)
+    from_seed.advance(counters)
+    assert mixed_draws(from_seed, 60) == upcoming
+
+    ahead = RngService(3)
+    mixed_draws(ahead, turns + 30)  # Already past the point: starts over from the seed
+    ahead.advance(counters)
+    assert mixed_draws(ahead, 60) == upcoming
+
+    elsewhere = RngService(99)
+    elsewhere.advance(counters)
+    assert elsewhere.seed == 3
+    assert mixed_draws(elsewhere, 60) == upcoming
+
+
+def test_advance_from_an_earlier_snapshot():
+    played = RngService(4)
+    mixed_draws(played, 25)
+    state = played.to_bytes()
+    mixed_draws(played, 300)
+    counters = played.counters()
+    upcoming = mixed_draws(played, 50)
+
+    resumed = RngService(0)
+    resumed.restore(state)
+    resumed.advance(counters)
+    assert mixed_draws(resumed, 50) == upcoming
+    assert len(counters) < 200 < len(state)
+
+
+def test_to_bytes_and_restore_are_exact():
+    played = RngService(5)
+    mixed_draws(played, 10)
+    state = played.to_bytes()
+    upcoming = mixed_draws(played, 80)
+    restored = RngService(6)
+    restored.restore(state)
+    assert restored.to_bytes() == state
+    assert mixed_draws(restored, 80) == upcoming
+    with pytest.raises(ValueError):
+        restored.restore(played.counters())
+    with pytest.raises(ValueError):
+        restored.advance(state)
+
+
+def test_streams_do_not_shift_each_other():
+    quiet = RngService(7)
+    busy = RngService(7)
+    for _ in range(500):
+        busy.stream("dialogue").random()
+    assert [quiet.stream("combat").d20() for _ in range(50)] == [busy.stream("combat").d20() for _ in range(50)]
+
+
+def test_module_service_and_advanced_state():
+    rng.seed(8)
+    state = rng.snapshot()
+    mixed_draws(rng.RNG, 20)
+    counters = rng.counters()
+    upcoming = mixed_draws(rng.RNG, 20)
+    rng.restore(rng.advanced_state(state, counters))
+    assert mixed_draws(rng.RNG, 20) == upcoming
+
+
+def test_unseeded_generators_follow_the_dice_stream():
+    rng.seed(8)
+    first = roll_dice_batch(50)
+    rng.seed(8)
+    assert (roll_dice_batch(50) == first).all()
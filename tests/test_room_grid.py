@@ -0,0 +1,52 @@
+# tests/test_room_grid.py
+
+import pytest
+
+from room_grid import ROOM_CODES, RoomGrid, RoomType
+
+
+def make_grid():
+    return RoomGrid.from_names([
+        ["Start", "Enemy", "Empty"],
+        ["Trap", "Enemy", None],
+        ["Empty", "Item", "Exit"],
+    ])
+
+
+def test_names_round_trip_through_codes():
+    grid = make_grid()
+    assert grid.to_names()[1] == ["Trap", "Enemy", None]
+    assert grid.get(1, 0) == RoomType.ENEMY == ROOM_CODES["Enemy"]
+    grid[2][0] = "Puzzle"
+    assert grid.get_name(0, 2) == "Puzzle"
+    with pytest.raises(IndexError):
+        grid.get(3, 0)
+    with pytest.raises(IndexError):
+        grid[0][-4]
+
+
+def test_counts_and_positions():
+    grid = make_grid()
+    assert grid.count(RoomType.ENEMY) == 2
+    assert grid.counts() == {RoomType.NONE: 1, RoomType.EMPTY: 2, RoomType.START: 1, RoomType.EXIT: 1,
+                             RoomType.ENEMY: 2, RoomType.TRAP: 1, RoomType.ITEM: 1}
+    assert list(grid.positions(RoomType.ENEMY)) == [(1, 0), (1, 1)]
+    assert list(grid.positions(RoomType.TREASURE)) == []
+
+
+def test_replace_touches_only_one_code():
+    grid = make_grid()
+    grid.replace(RoomType.ENEMY, RoomType.CLEARED)
+    assert grid.count(RoomType.ENEMY) == 0
+    assert list(grid.positions(RoomType.CLEARED)) == [(1, 0), (1, 1)]
+    assert grid.get_name(0, 1) == "Trap"
+
+
+def test_as_numpy_is_a_view():
+    grid = make_grid()
+    array = grid.as_numpy()
+    assert array.shape == (3, 3)
+    assert array[1, 0] == RoomType.TRAP
+    grid.set(0, 1, RoomType.ITEM)
+    assert array[1, 0] == RoomType.ITEM
+    assert bytes(grid.row_bytes(2)) == bytes([RoomType.EMPTY, RoomType.ITEM, RoomType.EXIT])
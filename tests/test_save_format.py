@@ -0,0 +1,108 @@
+# tests/test_save_format.py
+
+import pickle
+
+import pytest
+
+import rng
+from character import Character
+from map_bot import ChunkedGameMap, GameMap
+from save_format import SaveFormatError, SaveGame, character_from_dict, character_to_dict, rng_record
+
+
+def make_character():
+    character = Character("Data", "Android", health=80, xp=40, gold=12,
+                          skills={"Strength": 14, "Intelligence": 18})
+    character.add_item("Healing Potion")
+    return character
+
+
+def test_snapshot_round_trip(tmp_path):
+    rng.seed(11)
+    character = make_character()
+    game_map = GameMap(12, 9, "stealth", seed=5)
+    game_map.player_x, game_map.player_y = 3, 4
+    save = SaveGame(str(tmp_path / "game.ams"))
+    save.save(character, game_map, {"mission_type": "stealth"}, ["one", "two"], rng.snapshot())
+
+    state = SaveGame(str(tmp_path / "game.ams")).load()
+    assert state["character"].to_dict() == character.to_dict()
+    loaded_map = state["game_map"]
+    assert bytes(loaded_map.map_grid.cells) == bytes(game_map.map_grid.cells)
+    assert (loaded_map.player_x, loaded_map.player_y) == (3, 4)
+    assert (loaded_map.objective_x, loaded_map.objective_y) == (game_map.objective_x, game_map.objective_y)
+    assert state["mission"] == {"mission_type": "stealth"}
+    assert list(state["history"]) == ["one", "two"]
+    assert state["rng"] == rng.snapshot()
+
+
+def test_journal_is_replayed_over_the_snapshot(tmp_path):
+    rng.seed(12)
+    character = make_character()
+    game_map = ChunkedGameMap(2000, 2000, "rescue", seed=6)
+    save = SaveGame(str(tmp_path / "game.ams"))
+    save.save(character, game_map, {"mission_type": "rescue"}, [], rng.snapshot())
+
+    game_map.player_x, game_map.player_y = 1500, 40
+    save.record_move(game_map)
+    game_map.set_room(1500, 40, "Cleared")
+    save.record_room(1500, 40, "Cleared")
+    character.gain_xp(30)
+    character.add_item("Shield")
+    save.record_character(character)
+    save.record_mission({"mission_type": "rescue", "turns": 3})
+    for _ in range(600):
+        rng.stream("combat").d20()
+    save.append(rng_record(rng.counters()))
+    save.sync()
+
+    state = SaveGame(str(tmp_path / "game.ams")).load()
+    loaded_map = state["game_map"]
+    assert (loaded_map.player_x, loaded_map.player_y) == (1500, 40)
+    assert loaded_map.get_room(1500, 40) == "Cleared"
+    assert loaded_map.get_room(1499, 40) == game_map.get_room(1499, 40)
+    assert state["character"].to_dict() == character.to_dict()
+    assert state["mission"] == {"mission_type": "rescue", "turns": 3}
+    assert state["rng"] == rng.snapshot()
+
+
+def test_torn_journal_record_is_dropped(tmp_path):
+    path = tmp_path / "game.ams"
+    game_map = GameMap(6, 6, "rescue", seed=1)
+    save = SaveGame(str(path))
+    save.save(make_character(), game_map)
+    game_map.player_x = 2
+    save.record_move(game_map)
+    game_map.player_x = 4
+    save.record_move(game_map)
+    save.close()
+    journal = tmp_path / "game.ams.journal"
+    journal.write_bytes(journal.read_bytes()[:-3])
+
+    reloaded = SaveGame(str(path))
+    assert reloaded.load()["game_map"].player_x == 2
+    game_map.player_x = 5
+    reloaded.record_move(game_map)  # Written where the torn record was
+    reloaded.close()
+    assert SaveGame(str(path)).load()["game_map"].player_x == 5
+
+
+def test_pickled_save_is_migrated(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    character = make_character()
+    with open("savegame.pkl", "wb") as legacy_file:
+        pickle.dump(character.to_dict(), legacy_file)
+
+    save = SaveGame("game.ams")
+    assert save.load()["character"].to_dict() == character.to_dict()
+    assert (tmp_path / "game.ams").exists()
+    assert SaveGame("game.ams").load()["character"].to_dict() == character.to_dict()
+
+
+def test_character_kinds():
+    character = Character("Ro", "Bajoran")
+    assert character_from_dict(character_to_dict(character)).to_dict() == character.to_dict()
+    old = {"kind": "dict", "fields": {"name": "Ro", "species": "Bajoran", "health": 40}}
+    assert character_from_dict(old).health == 40
+    with pytest.raises(SaveFormatError):
+        character_from_dict({"kind": "Ship", "fields": {}})
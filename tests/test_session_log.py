@@ -0,0 +1,95 @@
+# tests/test_session_log.py
+
+import pytest
+
+import rng
+from session_log import (
+    EV_DICE, EV_STATE, SessionLogError, SessionRecorder, SessionReplayer, encode_session_state,
+    pack_sections, read_log
+)
+
+MAP_SIZE = (9, 9)
+MOVES = ["Move North", "Move South", "Move East", "Move West"]
+
+
+class RecordingGame(SessionReplayer):
+    """Plays live on the replayer's own rules while a SessionRecorder logs it, like GameWindow does."""
+
+    def __init__(self, recorder, picker):
+        super().__init__([(EV_STATE, pack_sections(encode_session_state(map_size=MAP_SIZE)))])
+        self.recorder = recorder
+        self.picker = picker
+
+    def choose_option(self, game_window, prompt, choices):
+        picked = self.picker.choice(choices + [None])
+        self.recorder.choice(choices, picked)
+        return picked
+
+    def play(self, command):
+        self.recorder.command(command)
+        if command == "Create Character":
+            self.recorder.character_created("Kirk", "Human")
+            self.create_character({"name": "Kirk", "species": "Human"})
+        else:
+            self.apply_command(command)
+        self.turn += 1
+
+
+def state_of(game):
+    character, game_map = game.character, game.game_map
+    return (character.health, character.xp, tuple(character.items.labels()), game.mission_type,
+            game_map.player_x, game_map.player_y, bytes(game_map.map_grid.cells))
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    """A 300-turn session log and the state after every turn."""
+    path = str(tmp_path / "session.amlog")
+    rng.seed(99)
+    recorder = SessionRecorder(path)
+    recorder.start(map_size=MAP_SIZE)
+    game = RecordingGame(recorder, rng.RandomStream(5))
+    picker = rng.RandomStream(6)
+    game.play("Create Character")
+    states = [None]
+    for turn in range(1, 300):
+        game.play("Start Mission" if turn % 40 == 1 else picker.choice(MOVES))
+        states.append(state_of(game))
+    recorder.close()
+    return path, states
+
+
+def test_replay_ends_in_the_recorded_state(recorded):
+    path, states = recorded
+    replayer = SessionReplayer.from_file(path)
+    assert replayer.run() == len(states)
+    assert state_of(replayer) == states[-1]
+
+
+def test_seek_backwards_and_forwards(recorded):
+    path, states = recorded
+    replayer = SessionReplayer(read_log(path), checkpoint_turns=64)
+    replayer.run()
+    # states[n - 1] is the state after n commands
+    for turn in (5, 250, 64, 63, 300, 2, 130, 131):
+        assert replayer.seek(turn) == turn
+        assert state_of(replayer) == states[turn - 1]
+
+
+def test_changed_dice_stop_the_replay(recorded):
+    path, _ = recorded
+    events = read_log(path)
+    dice = next(index for index, (op, _) in enumerate(events) if op == EV_DICE)
+    events[dice] = (EV_DICE, events[dice][1] % 20 + 1)
+    with pytest.raises(SessionLogError, match="rolled"):
+        SessionReplayer(events).run()
+
+
+def test_torn_log_keeps_the_complete_records(recorded):
+    path, _ = recorded
+    complete = read_log(path)
+    with open(path, "rb") as log_file:
+        data = log_file.read()
+    with open(path, "wb") as log_file:
+        log_file.write(data[:-1])
+    assert read_log(path) == complete[:-1]
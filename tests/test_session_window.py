@@ -0,0 +1,62 @@
+# tests/test_session_window.py
+
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+
+import rng  # noqa: E402
+import ui  # noqa: E402
+from session_log import SessionReplayer  # noqa: E402
+
+MOVES = ["Move North", "Move South", "Move East", "Move West"]
+
+
+@pytest.fixture
+def window(tmp_path, monkeypatch):
+    """A GameWindow recording to tmp_path, with the event dialog answered by a seeded picker."""
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ui, "AUTOSAVE", False)
+    monkeypatch.setattr(ui, "RECORD_SESSION", True)
+    monkeypatch.setattr(ui.GameWindow, "initialize_background_music", lambda self: None)
+    answers = rng.RandomStream(5)
+    monkeypatch.setattr(ui, "ask_player", lambda game_window, prompt, choices: answers.choice(choices + [None]))
+    rng.seed(99)
+    game_window = ui.GameWindow(None, run_startup=False)
+    yield game_window
+    game_window.deleteLater()
+    app.processEvents()
+
+
+def window_state(character, game_map, mission_type):
+    return (character.health, character.xp, tuple(character.items.labels()), mission_type,
+            game_map.player_x, game_map.player_y, bytes(game_map.map_grid.cells))
+
+
+def test_window_session_replays_turn_for_turn(window, tmp_path):
+    window.execute_command("Create Character")
+    window.name_input.setText("Kirk")
+    window.confirm_character_creation()
+    picker = rng.RandomStream(6)
+    states = {}
+    for turn in range(2, 152):  # The character creation was turn 1
+        if turn % 40 == 2:
+            window.execute_command("Start Mission")
+        elif turn % 37 == 0:
+            window.execute_command("Hint")
+        else:
+            window.execute_command(picker.choice(MOVES))
+        states[turn] = window_state(window.character, window.game_map, window.current_mission_type)
+    window.session_log.close()
+    assert os.path.exists(tmp_path / "session.amlog")
+
+    replayer = SessionReplayer.from_file()
+    replayer.run()
+    assert window_state(replayer.character, replayer.game_map, replayer.mission_type) == states[151]
+    for turn in (2, 3, 41, 42, 90, 120, 151, 60):  # Ending with a seek backwards
+        replayer.seek(turn)
+        assert window_state(replayer.character, replayer.game_map, replayer.mission_type) == states[turn]
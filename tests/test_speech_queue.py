@@ -0,0 +1,114 @@
+# tests/test_speech_queue.py
+
+import threading
+import time
+
+from speech_queue import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, SpeechQueue
+
+
+class FakeEngine:
+    """Stands in for pyttsx3: each phrase is "spoken" once the test lets it finish."""
+
+    def __init__(self):
+        self.spoken = []
+        self.interrupted = []
+        self.speaking = threading.Event()
+        self.gate = threading.Semaphore(0)
+        self.callbacks = []
+        self.stopped = False
+
+    def connect(self, name, callback):
+        self.callbacks.append(callback)
+
+    def say(self, text):
+        self.text = text
+        self.stopped = False
+
+    def runAndWait(self):
+        self.speaking.set()
+        while not self.gate.acquire(timeout=0.005):
+            for callback in self.callbacks:
+                callback("started-word", 0, 0)
+            if self.stopped:
+                self.interrupted.append(self.text)
+                break
+        else:
+            self.spoken.append(self.text)
+        self.speaking.clear()
+
+    def stop(self):
+        self.stopped = True
+
+
+def start_queue(**options):
+    engine = FakeEngine()
+    queue = SpeechQueue(engine_factory=lambda rate, volume: engine, **options)
+    assert queue.wait_until_ready(5)
+    queue.say("first")
+    assert engine.speaking.wait(5)  # The worker is now busy with "first"
+    return queue, engine
+
+
+def finish(queue, engine, count):
+    for _ in range(count):
+        engine.gate.release()
+    deadline = time.monotonic() + 5
+    while len(engine.spoken) + len(engine.interrupted) < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+    queue.close()
+
+
+def test_lines_are_spoken_by_priority_then_order():
+    queue, engine = start_queue()
+    queue.say("chatter", PRIORITY_LOW)
+    queue.say("normal one")
+    queue.say("briefing", PRIORITY_HIGH)
+    queue.say("normal two", PRIORITY_NORMAL)
+    finish(queue, engine, 5)
+    assert engine.spoken == ["first", "briefing", "normal one", "normal two", "chatter"]
+
+
+def test_repeated_lines_are_coalesced():
+    queue, engine = start_queue()
+    queue.say("Moving North", PRIORITY_LOW)
+    queue.say("Moving North", PRIORITY_LOW)
+    queue.say("other")
+    queue.say("Moving North", PRIORITY_HIGH)  # Moves the waiting line up instead of adding one
+    assert queue.pending() == 2
+    finish(queue, engine, 3)
+    assert engine.spoken == ["first", "Moving North", "other"]
+
+
+def test_full_queue_drops_the_lowest_priority_newest_line():
+    queue, engine = start_queue(max_queued=2)
+    queue.say("low one", PRIORITY_LOW)
+    queue.say("high", PRIORITY_HIGH)
+    queue.say("low two", PRIORITY_LOW)
+    assert queue.pending() == 2 and queue.dropped == 1
+    finish(queue, engine, 3)
+    assert engine.spoken == ["first", "high", "low one"]
+
+
+def test_stale_lines_are_skipped_but_high_priority_ones_are_not():
+    queue, engine = start_queue(stale_after=0.01)
+    queue.say("old chatter", PRIORITY_LOW)
+    queue.say("old briefing", PRIORITY_HIGH)
+    time.sleep(0.05)
+    finish(queue, engine, 2)
+    assert engine.spoken == ["first", "old briefing"]
+    assert queue.dropped == 1
+
+
+def test_cancel_pending_clears_the_queue_and_cuts_off_the_current_line():
+    queue, engine = start_queue()
+    queue.say("one")
+    queue.say("two")
+    queue.cancel_pending()
+    deadline = time.monotonic() + 5
+    while not engine.interrupted and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert engine.interrupted == ["first"]
+    assert queue.pending() == 0 and queue.dropped == 2
+    queue.say("after")
+    finish(queue, engine, 2)
+    assert engine.spoken == ["after"]
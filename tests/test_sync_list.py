@@ -0,0 +1,49 @@
+# tests/test_sync_list.py
+
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+
+from PyQt6.QtCore import Qt  # noqa: E402
+
+from ui import sync_list  # noqa: E402
+
+MARKER = Qt.ItemDataRole.UserRole
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def texts(list_widget):
+    return [list_widget.item(row).text() for row in range(list_widget.count())]
+
+
+def test_only_changed_rows_are_touched(app):
+    list_widget = QtWidgets.QListWidget()
+    sync_list(list_widget, ["Basic Sword", "Health Potion", "Shield"])
+    assert texts(list_widget) == ["Basic Sword", "Health Potion", "Shield"]
+    first, second, third = (list_widget.item(row) for row in range(3))
+    second.setData(MARKER, "marker")  # Lost if the row were rebuilt
+
+    sync_list(list_widget, ["Basic Sword", "Health Potion x2", "Shield"])
+    assert texts(list_widget) == ["Basic Sword", "Health Potion x2", "Shield"]
+    assert list_widget.item(1) is second and second.data(MARKER) == "marker"
+    assert list_widget.item(0) is first and list_widget.item(2) is third
+
+
+def test_rows_are_added_and_removed_at_the_end(app):
+    list_widget = QtWidgets.QListWidget()
+    sync_list(list_widget, ["a", "b"])
+    first = list_widget.item(0)
+    sync_list(list_widget, ["a", "b", "c", "d"])
+    assert texts(list_widget) == ["a", "b", "c", "d"]
+    sync_list(list_widget, ["a"])
+    assert texts(list_widget) == ["a"] and list_widget.item(0) is first
+    sync_list(list_widget, [])
+    assert list_widget.count() == 0
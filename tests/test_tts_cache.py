@@ -0,0 +1,71 @@
+# tests/test_tts_cache.py
+
+import os
+import sys
+
+import tts_cache
+from tts_cache import TtsCache, static_lines
+
+
+class FileEngine:
+    """Stands in for pyttsx3 by writing the text itself as the "audio"."""
+
+    def __init__(self):
+        self.properties = {}
+        self.queued = []
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def save_to_file(self, text, path):
+        self.queued.append((text, path))
+
+    def runAndWait(self):
+        for text, path in self.queued:
+            with open(path, "w", encoding="utf-8") as audio:
+                audio.write(text)
+        self.queued = []
+
+
+def test_file_name_follows_text_and_voice_settings(tmp_path):
+    cache = TtsCache(str(tmp_path))
+    name = cache.file_name("Hello")
+    assert name.endswith(tts_cache.AUDIO_EXTENSION)
+    assert cache.file_name("Hello") == name
+    assert cache.file_name("Hello!") != name
+    assert TtsCache(str(tmp_path)).file_name("Hello") == name
+    assert TtsCache(str(tmp_path), rate=180).file_name("Hello") != name
+    assert TtsCache(str(tmp_path), volume=0.5).file_name("Hello") != name
+    assert TtsCache(str(tmp_path), voice="other").file_name("Hello") != name
+
+
+def test_build_then_prune_stale_files(tmp_path):
+    directory = str(tmp_path / "cache")
+    old = TtsCache(directory, rate=120)
+    assert old.build(["Hello", "Goodbye"], FileEngine()) == 2
+
+    cache = TtsCache(directory)
+    assert cache.lookup("Hello") is None  # Different voice settings, so nothing matches yet
+    engine = FileEngine()
+    assert cache.build(["Hello", "Welcome"], engine) == 2
+    assert engine.properties == {"rate": 150, "volume": 1}
+    assert cache.build(["Hello", "Welcome"], FileEngine()) == 0
+    assert len(os.listdir(directory)) == 4
+
+    (tmp_path / "cache" / "notes.txt").write_text("kept")
+    assert cache.prune(["Hello"]) == 3
+    assert sorted(os.listdir(directory)) == sorted([cache.file_name("Hello"), "notes.txt"])
+    with open(cache.lookup("Hello"), encoding="utf-8") as audio:
+        assert audio.read() == "Hello"
+    assert cache.lookup("Welcome") is None
+
+
+def test_cache_is_found_inside_a_frozen_bundle(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "_MEIPASS", str(tmp_path), raising=False)
+    assert TtsCache().directory == os.path.join(str(tmp_path), tts_cache.CACHE_DIR)
+
+
+def test_static_lines_have_no_duplicates():
+    lines = static_lines()
+    assert len(lines) == len(set(lines))
+    assert all(isinstance(line, str) and line for line in lines)
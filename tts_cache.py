@@ -0,0 +1,124 @@
+# tts_cache.py
+"""
+Pre-rendered speech for the game's fixed lines.
+
+Story text, event messages, Q's lines and the window's fixed prompts never change, so they
+can be synthesized once ahead of time.  Each line is stored as <hash>.wav, where the hash
+covers the text and the voice settings; changing either simply produces a new file name,
+and prune() removes files no longer referenced.  At runtime SpeechQueue plays these files
+through pygame.mixer and only synthesizes dynamic lines (names, skill lists) live.
+
+Build the cache with:  python tts_cache.py  (before running PyInstaller, which bundles the
+directory next to images/ and music/)
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+from events import event_data
+from mission_constants import MISSION_COMPLETE_PREFIX, SPOKEN_UI_LINES
+from q_responses import DEFAULT_RESPONSES, Q_RESPONSES
+from story_bot import story_elements
+
+CACHE_DIR = "tts_cache"
+AUDIO_EXTENSION = ".wav"
+
+
+def cache_directory(directory=CACHE_DIR):
+    """Where the cache lives: inside PyInstaller's bundle when frozen, else the working directory."""
+    return os.path.join(getattr(sys, '_MEIPASS', os.getcwd()), directory)
+
+
+def static_lines():
+    """Every fixed line the game can speak, without duplicates."""
+    lines = list(story_elements["intro"])
+    for stages in story_elements["missions"].values():
+        lines += stages.values()
+        lines.append(f"{MISSION_COMPLETE_PREFIX}{stages['end']}")
+    for event in event_data.values():
+        lines += [event["prompt"], event["success_message"], event["failure_message"]]
+    for responses in Q_RESPONSES.values():
+        lines += responses
+    lines += DEFAULT_RESPONSES
+    lines += SPOKEN_UI_LINES
+    return list(dict.fromkeys(lines))
+
+
+class TtsCache:
+    """Content-hashed directory of pre-rendered lines for one set of voice settings."""
+
+    def __init__(self, directory=None, rate=150, volume=1, voice=None):
+        self.directory = cache_directory() if directory is None else directory
+        self.settings = {"rate": rate, "volume": volume, "voice": voice}
+        self._hashes = {}  # text -> file name, so lookups hash each line only once
+        self.refresh()
+
+    def refresh(self):
+        """Re-read which files exist; lookups only consult this set, never the disk."""
+        if os.path.isdir(self.directory):
+            self.available = set(os.listdir(self.directory))
+        else:
+            self.available = set()
+
+    def file_name(self, text):
+        name = self._hashes.get(text)
+        if name is None:
+            key = json.dumps({"text": text, **self.settings}, sort_keys=True).encode("utf-8")
+            name = hashlib.sha256(key).hexdigest() + AUDIO_EXTENSION
+            self._hashes[text] = name
+        return name
+
+    def lookup(self, text):
+        """Path of the pre-rendered audio for text, or None if it has to be synthesized."""
+        name = self.file_name(text)
+        if name in self.available:
+            return os.path.join(self.directory, name)
+        return None
+
+    def build(self, lines=None, engine=None):
+        """Render every line that isn't cached yet. Returns how many files were written."""
+        lines = static_lines() if lines is None else lines
+        missing = [text for text in lines if self.lookup(text) is None]
+        if not missing:
+            return 0
+        if engine is None:
+            import pyttsx3
+
+            engine = pyttsx3.init()
+        engine.setProperty('rate', self.settings["rate"])
+        engine.setProperty('volume', self.settings["volume"])
+        if self.settings["voice"] is not None:
+            engine.setProperty('voice', self.settings["voice"])
+
+        os.makedirs(self.directory, exist_ok=True)
+        for text in missing:
+            engine.save_to_file(text, os.path.join(self.directory, self.file_name(text)))
+        engine.runAndWait()
+        self.refresh()
+        return len(missing)
+
+    def prune(self, lines=None):
+        """Delete cached files that no current line and voice setting maps to."""
+        lines = static_lines() if lines is None else lines
+        wanted = {self.file_name(text) for text in lines}
+        removed = 0
+        for name in self.available - wanted:
+            if name.endswith(AUDIO_EXTENSION):
+                os.remove(os.path.join(self.directory, name))
+                removed += 1
+        self.refresh()
+        return removed
+
+
+def main(directory=CACHE_DIR):
+    cache = TtsCache(directory)
+    written = cache.build()
+    removed = cache.prune()
+    print(f"Rendered {written} new lines, removed {removed} stale files, "
+          f"{len(static_lines())} lines cached in {directory}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -1,20 +1,50 @@
 import os
-import random
 import sys
-import pygame  # For background music
-import pyttsx3
-from map_bot import GameMap  # Import GameMap from map_bot.py
-from PyQt6.QtCore import Qt
+from map_bot import create_game_map  # Import the map factory from map_bot.py
+from map_renderer import MapView, PLAYER_COLOR, TILE_COLORS, TILE_SIZE
+from speech_queue import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, SpeechQueue
+from tts_cache import TtsCache
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QColor, QBrush, QPixmap
 from PyQt6.QtWidgets import (
     QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QLabel,
     QPushButton, QTextEdit, QProgressBar, QListWidget,
-    QGraphicsView, QGraphicsScene, QLineEdit, QComboBox, QApplication, QGraphicsRectItem
+    QGraphicsScene, QLineEdit, QComboBox, QApplication, QGraphicsRectItem
+)
+from autosave import AutosaveService
+from character import Character
+from events import ask_player, trigger_event
+from game_log import get_logger
+from instrumentation import count, timed
+from mission_constants import (
+    CHARACTER_SKILLS, CREATE_CHARACTER_PROMPT, EMPTY_NAME_MESSAGE, EXIT_MESSAGE, MISSION_COMPLETE_PREFIX,
+    MISSION_ENDED_MESSAGE, MISSION_STARTED_MESSAGE, MOVE_MESSAGES, NEED_CHARACTER_MESSAGE, STARTING_ITEMS
 )
-from events import trigger_event
 from npc_bot import interact_with_npc
+import rng
+from pathfinding import path_hint
+from save_format import SAVE_FILE, SaveGame
+from session_log import SessionRecorder
 from story_bot import get_random_intro, get_mission_story
 
+# Mission map dimensions; maps past map_bot.CHUNKED_MAP_THRESHOLD cells are generated lazily
+MAP_WIDTH = 7
+MAP_HEIGHT = 7
+# Drop queued speech (and stop the current phrase) when a new mission starts
+CANCEL_SPEECH_ON_NEW_MISSION = True
+# Maps with more cells than this are painted by MapView instead of one item per tile
+ITEM_RENDER_LIMIT = 64 * 64
+# Save moves, cleared rooms and the character in the background as the game is played
+AUTOSAVE = True
+# Log commands, event choices and dice to session_log.SESSION_FILE so the session can be replayed
+RECORD_SESSION = True
+# Character fields shown on the character sheet
+SHEET_FIELDS = ("name", "species", "health", "skills", "items")
+# Command buttons while a mission is running
+MISSION_COMMANDS = ['Move North', 'Move South', 'Move East', 'Move West', 'Hint', 'End Mission']
+
+logger = get_logger(__name__)
+
 
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -23,15 +53,40 @@ def resource_path(relative_path):
     return os.path.join(os.getcwd(), relative_path)  # Use current working directory in dev
 
 
+def sync_list(list_widget, labels):
+    """Make a QListWidget show labels, touching only the rows that differ."""
+    for row, label in enumerate(labels):
+        if row < list_widget.count():
+            item = list_widget.item(row)
+            if item.text() != label:
+                item.setText(label)
+        else:
+            list_widget.addItem(label)
+    while list_widget.count() > len(labels):
+        list_widget.takeItem(list_widget.count() - 1)
+
+
 class GameWindow(QMainWindow):
-    def __init__(self, character=None):
+    @timed("GameWindow.__init__")
+    def __init__(self, character=None, run_startup=True, save_game=None):
+        """
+        With run_startup=False the slow subsystems in startup_stages() are left for the
+        caller (main.start_game runs them in the background) and so is the intro.
+        save_game is the SaveGame to autosave to, e.g. the one the game was loaded from.
+        """
         super().__init__()
+        self.dirty_sheet_fields = set()
+        self.sheet_repaint_scheduled = False
+        self._character = None
         self.character = character
         self.game_map = None
         self.current_mission_type = None
+        self.autosave = None
+        if AUTOSAVE:
+            self.autosave = AutosaveService(save_game if save_game is not None else SaveGame(SAVE_FILE))
+        self.session_log = SessionRecorder() if RECORD_SESSION else None
 
         self.initialize_voice_engine()
-        self.initialize_background_music()
 
         # Set window properties
         self.setWindowTitle('Interactive Game with Graphical Map')
@@ -63,10 +118,14 @@ class GameWindow(QMainWindow):
         top_layout.addLayout(self.character_layout, 1)
 
         # Graphics View for the map
-        self.graphics_view = QGraphicsView()
+        self.graphics_view = MapView()
         self.graphics_scene = QGraphicsScene()
         self.graphics_view.setScene(self.graphics_scene)
         top_layout.addWidget(self.graphics_view, 2)
+        self.tile_items = {}  # (x, y) -> QGraphicsRectItem of the current map
+        self.tile_brushes = {room: QBrush(QColor(color)) for room, color in TILE_COLORS.items()}
+        self.default_tile_brush = QBrush(QColor("white"))
+        self.player_tile_brush = QBrush(QColor(PLAYER_COLOR))
 
         # Command buttons layout
         self.command_button_layout = QHBoxLayout()
@@ -79,17 +138,30 @@ class GameWindow(QMainWindow):
         # Display the window
         self.show()
 
-        # Start the introduction from Q
-        self.introduce_game()
+        if run_startup:
+            for _, stage in self.startup_stages():
+                stage()
+            # Start the introduction from Q
+            self.introduce_game()
+
+    def startup_stages(self):
+        """Slow initialization steps that can run off the GUI thread, as (label, callable)."""
+        return [
+            ("Starting music", self.initialize_background_music),
+            ("Starting voice", self.speech.wait_until_ready)
+        ]
 
+    @timed("GameWindow.initialize_voice_engine")
     def initialize_voice_engine(self):
-        """Initialize text-to-speech engine."""
-        self.voice_engine = pyttsx3.init()
-        self.voice_engine.setProperty('rate', 150)
-        self.voice_engine.setProperty('volume', 1)
+        """Initialize the text-to-speech worker; the engine itself starts on its own thread."""
+        audio_cache = TtsCache(rate=150, volume=1)
+        self.speech = SpeechQueue(rate=150, volume=1, audio_cache=audio_cache)
 
+    @timed("GameWindow.initialize_background_music")
     def initialize_background_music(self):
         """Initialize and play background music."""
+        import pygame  # For background music; imported here to keep it off the startup path
+
         if not pygame.mixer.get_init():  # Check if mixer is already initialized
             pygame.mixer.init()
         music_path = resource_path(os.path.join("music", "Starbound Journey.mp3"))
@@ -98,7 +170,7 @@ class GameWindow(QMainWindow):
             pygame.mixer.music.set_volume(0.5)
             pygame.mixer.music.play(-1)
         else:
-            print("Background music file not found at:", music_path)
+            logger.warning("Background music file not found at: %s", music_path)
 
     def create_character_gui(self):
         """Interface for creating a character."""
@@ -132,45 +204,79 @@ class GameWindow(QMainWindow):
         name = self.name_input.text()
         species = self.species_input.currentText()
         if not name:
-            self.interactive_window.append("Character name cannot be empty.")
-            self.speak("Character name cannot be empty.")
+            self.interactive_window.append(EMPTY_NAME_MESSAGE)
+            self.speak(EMPTY_NAME_MESSAGE)
             return
 
+        if self.session_log is not None:
+            self.start_session_log()
+            self.session_log.character_created(name, species)
+
         # Define a basic skill set with random values
-        skills = ["Strength", "Agility", "Intelligence", "Charisma", "Endurance", "Dexterity"]
-        character_skills = {skill: random.randint(5, 15) for skill in skills}  # Random values between 5 and 15
+        character_skills = {skill: rng.stream("character").randint(5, 15) for skill in CHARACTER_SKILLS}  # Random values between 5 and 15
 
         # Create the character with the generated skill set
-        self.character = {
-            'name': name,
-            'species': species,
-            'health': 100,
-            'skills': character_skills,
-            'items': ["Basic Sword", "Shield"]  # Add some default starting items if desired
-        }
+        self.character = Character(name, species, skills=character_skills, items=STARTING_ITEMS)
 
         self.initialize_character()
+        self.autosave_snapshot()
         self.character_creation_window.close()
         self.update_command_buttons(['Start Mission', 'Explore', 'End Mission', 'Quit'])
         self.interactive_window.append(f"Character {name} the {species} created with skills: {character_skills}!")
         self.speak(f"Character {name} the {species} has been created with a unique skill set!")
 
-    def initialize_character(self):
-        """Update character sheet details after character creation."""
+    @property
+    def character(self):
+        return self._character
+
+    @character.setter
+    def character(self, character):
+        """Switch characters; the sheet then follows the new one's change notifications."""
+        if self._character is not None:
+            self._character.unsubscribe(self.character_changed)
+        self._character = character
+        if character is not None:
+            character.subscribe(self.character_changed)
+            self.dirty_sheet_fields.update(SHEET_FIELDS)
+            self.schedule_sheet_repaint()
+
+    def character_changed(self, character, field):
+        if field in SHEET_FIELDS:
+            self.dirty_sheet_fields.add(field)
+            self.schedule_sheet_repaint()
+
+    def schedule_sheet_repaint(self):
+        """Repaint the sheet on the next event-loop tick, once for any number of changes."""
+        if not self.sheet_repaint_scheduled:
+            self.sheet_repaint_scheduled = True
+            QTimer.singleShot(0, self.repaint_character_sheet)
+
+    @timed("GameWindow.repaint_character_sheet")
+    def repaint_character_sheet(self):
+        """Update only the sheet widgets whose character fields changed."""
+        self.sheet_repaint_scheduled = False
+        fields, self.dirty_sheet_fields = self.dirty_sheet_fields, set()
+        if self.character is None or not fields:
+            return
         if not hasattr(self, 'character_name_label'):
             self.init_character_sheet()  # Ensure the character sheet is initialized
+            fields = SHEET_FIELDS
+
+        if "name" in fields:
+            self.character_name_label.setText(f"Name: {self.character.name}")
+        if "species" in fields:
+            self.character_species_label.setText(f"Species: {self.character.species}")
+        if "health" in fields:
+            self.health_bar.setValue(self.character.health)
+        if "skills" in fields:
+            sync_list(self.skills_list, [f"{skill}: {level}" for skill, level in self.character.skills.items()])
+        if "items" in fields:
+            sync_list(self.items_list, self.character.items.labels())  # One row per stack, not per duplicate
 
-        self.character_name_label.setText(f"Name: {self.character['name']}")
-        self.character_species_label.setText(f"Species: {self.character['species']}")
-        self.health_bar.setValue(self.character['health'])
-
-        self.skills_list.clear()
-        for skill, level in self.character.get('skills', {}).items():
-            self.skills_list.addItem(f"{skill}: {level}")
-
-        self.items_list.clear()
-        for item in self.character.get('items', []):
-            self.items_list.addItem(item)
+    def initialize_character(self):
+        """Fill in the whole character sheet right away, e.g. after character creation."""
+        self.dirty_sheet_fields.update(SHEET_FIELDS)
+        self.repaint_character_sheet()
 
     def introduce_game(self):
         """Introduction from Q."""
@@ -178,6 +284,7 @@ class GameWindow(QMainWindow):
         self.interactive_window.append(f"Q: {intro_text}")
         self.speak(intro_text)  # Make Q's introduction spoken
 
+    @timed("GameWindow.init_character_sheet")
     def init_character_sheet(self):
         """Initialize character sheet display."""
         # Clear existing widgets if already initialized
@@ -232,51 +339,54 @@ class GameWindow(QMainWindow):
             self.command_button_layout.addWidget(btn)
             self.command_buttons.append(btn)
 
+    @timed("GameWindow.execute_command")
     def execute_command(self, command):
         """Handle command execution."""
+        if self.session_log is not None:
+            self.start_session_log()
+            self.session_log.command(command)
         self.interactive_window.append(f"Executing command: {command}")
         if command in ["Start Mission", "Explore"] and self.character is None:
-            self.interactive_window.append("You need to create a character before starting a mission or exploring.")
-            self.speak("You need to create a character before starting a mission or exploring.")  # Add voice
+            self.interactive_window.append(NEED_CHARACTER_MESSAGE)
+            self.speak(NEED_CHARACTER_MESSAGE)  # Add voice
             return
         if command == "Create Character":
             self.create_character_gui()
-            self.speak("Please create your character.")  # Voice prompt
+            self.speak(CREATE_CHARACTER_PROMPT)  # Voice prompt
         elif command == "Start Mission":
             self.start_mission()
-            self.speak("Mission started. Good luck!")
+            self.speak(MISSION_STARTED_MESSAGE)
         elif command in ["Move North", "Move South", "Move East", "Move West"]:
             self.move_player(command)
-            self.speak(f"Moving {command.split()[1]}")
+            self.speak(MOVE_MESSAGES[command], PRIORITY_LOW)
+        elif command == "Hint":
+            hint = path_hint(self.game_map)
+            self.interactive_window.append(hint)
+            self.speak(hint)
         elif command == "End Mission":
-            self.interactive_window.append("Mission ended.")
-            self.speak("Mission ended.")
+            self.interactive_window.append(MISSION_ENDED_MESSAGE)
+            self.speak(MISSION_ENDED_MESSAGE)
             self.update_command_buttons(['Create Character', 'Start Mission', 'Explore', 'Quit'])
         elif command == "Quit":
             self.interactive_window.append("Exiting game...")
-            self.speak("Exiting game.")
+            self.speak(EXIT_MESSAGE)
+            self.speech.close()
+            if self.autosave is not None:
+                self.autosave.close()
+            if self.session_log is not None:
+                self.session_log.close()
             self.stop_background_music()
             QApplication.quit()
 
+    @timed("GameWindow.update_character_sheet")
     def update_character_sheet(self):
-        """Update character sheet details."""
-        try:
-            if self.character:
-                self.character_name_label.setText(f"Name: {self.character['name']}")
-                self.character_species_label.setText(f"Species: {self.character['species']}")
-                self.health_bar.setValue(self.character['health'])
-
-                self.skills_list.clear()
-                for skill, level in self.character.get('skills', {}).items():
-                    self.skills_list.addItem(f"{skill}: {level}")
-
-                self.items_list.clear()
-                for item in self.character.get('items', []):
-                    self.items_list.addItem(item)
-                print("Character sheet updated successfully.")
-        except Exception as e:
-            print(f"Error updating character sheet: {e}")
+        """
+        Kept for the events, which call it after changing the character.  The character
+        already reported its changes, so this only makes sure a repaint is scheduled.
+        """
+        self.schedule_sheet_repaint()
 
+    @timed("GameWindow.load_q_image")
     def load_q_image(self):
         """Load Q's image and display it in the QLabel."""
         q_image_path = resource_path(os.path.join("images", "q.jpg"))
@@ -285,62 +395,118 @@ class GameWindow(QMainWindow):
             self.q_image_label.setPixmap(pixmap.scaled(200, 200, Qt.AspectRatioMode.KeepAspectRatio))
         else:
             self.interactive_window.append("Q's image not found at the expected location.")
-            print("Q's image not found at:", q_image_path)
+            logger.warning("Q's image not found at: %s", q_image_path)
 
-    def speak(self, text):
-        """Use text-to-speech to speak a given text."""
-        self.voice_engine.say(text)
-        self.voice_engine.runAndWait()
+    @timed("GameWindow.speak")
+    def speak(self, text, priority=PRIORITY_NORMAL):
+        """Queue text for text-to-speech without blocking the GUI."""
+        self.speech.say(text, priority)
 
     def start_mission(self):
         """Initialize and draw a new mission map with a storyline."""
-        self.current_mission_type = random.choice(["rescue", "exploration", "stealth"])
+        self.current_mission_type = rng.stream("map").choice(["rescue", "exploration", "stealth"])
         mission_start_story = get_mission_story(self.current_mission_type, "start")
         self.interactive_window.append(f"Mission Start: {mission_start_story}")
-        self.speak(mission_start_story)  # Make the voice read out the mission start message
+        if CANCEL_SPEECH_ON_NEW_MISSION:
+            self.speech.cancel_pending()
+        self.speak(mission_start_story, PRIORITY_HIGH)  # Make the voice read out the mission start message
         # Initialize the GameMap instance
-        self.game_map = GameMap(7, 7, self.current_mission_type)  # You can adjust dimensions (7x7 is used here)
+        self.game_map = create_game_map(MAP_WIDTH, MAP_HEIGHT, self.current_mission_type)
 
         self.draw_graphical_map()
-        self.update_command_buttons(['Move North', 'Move South', 'Move East', 'Move West', 'End Mission'])
+        self.autosave_snapshot()
+        self.update_command_buttons(MISSION_COMMANDS)
+
+    def resume_mission(self, game_map, mission, history=None):
+        """Continue a mission restored from a save."""
+        if history is not None:
+            self.interactive_window.append("\n".join(history))
+        self.game_map = game_map
+        self.current_mission_type = (mission or {}).get("mission_type", game_map.mission_type)
+        self.draw_graphical_map()
+        self.update_command_buttons(MISSION_COMMANDS)
+
+    def mission_state(self):
+        """Mission progress as saved next to the character and the map."""
+        if self.game_map is None:
+            return None
+        return {"mission_type": self.current_mission_type}
+
+    def start_session_log(self):
+        """Open the session log on the first thing worth recording, from the state play is in now."""
+        if not self.session_log.started():
+            self.session_log.start(self.character, self.game_map, self.mission_state(), (MAP_WIDTH, MAP_HEIGHT))
+
+    def choose_option(self, game_window, prompt, choices):
+        """Ask the player through the event dialog and log the answer."""
+        player_choice = ask_player(game_window, prompt, choices)
+        if self.session_log is not None:
+            self.session_log.choice(choices, player_choice)
+        return player_choice
+
+    def autosave_snapshot(self):
+        """Queue a full autosave of the character, map, mission and messages."""
+        if self.autosave is not None and self.character is not None:
+            self.autosave.snapshot(self.character, self.game_map, self.mission_state(), self.history_lines(),
+                                   rng.snapshot())
+
+    def autosave_move(self):
+        """Autosave the player's new position; a journal record unless a snapshot is due."""
+        if self.autosave is None or self.character is None:
+            return
+        if self.autosave.snapshot_wanted:
+            self.autosave_snapshot()
+        else:
+            self.autosave.moved(self.game_map)
+
+    def history_lines(self):
+        """The messages shown so far, for saving with the game."""
+        return self.interactive_window.toPlainText().split("\n")
 
+    @timed("GameWindow.draw_graphical_map")
     def draw_graphical_map(self):
-        """Draw the map graphically in the QGraphicsView."""
+        """Draw the whole map graphically in the QGraphicsView; used when a new map is shown."""
         if not self.game_map:
             return
 
         self.graphics_scene.clear()  # Clear existing map
-        tile_size = 40
+        self.tile_items = {}
+
+        if self.game_map.width * self.game_map.height > ITEM_RENDER_LIMIT:
+            self.graphics_view.set_map(self.game_map)  # Large maps are painted chunk by chunk
+            return
+        self.graphics_view.set_map(None)
 
         for y, row in enumerate(self.game_map.map_grid):
             for x, cell in enumerate(row):
                 if cell is None:
                     continue  # Skip if the cell is None (represents an obstacle)
 
-                rect_item = QGraphicsRectItem(x * tile_size, y * tile_size, tile_size, tile_size)
-
-                color_map = {
-                    "Start": QColor("blue"),
-                    "Objective": QColor("green"),
-                    "Exit": QColor("green"),
-                    "Enemy": QColor("red"),
-                    "Trap": QColor("black"),
-                    "Treasure": QColor("yellow"),
-                    "Item": QColor("orange"),
-                    "Cleared": QColor("lightgray"),
-                    "Empty": QColor("white"),
-                    "NPC": QColor("purple")
-                }
-
-                rect_item.setBrush(QBrush(color_map.get(cell, QColor("white"))))
-
-                if (x, y) == (self.game_map.player_x, self.game_map.player_y):
-                    rect_item.setBrush(QBrush(QColor("darkmagenta")))  # Player position
-
+                rect_item = QGraphicsRectItem(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+                rect_item.setBrush(self.tile_brush(x, y, cell))
                 self.graphics_scene.addItem(rect_item)
+                self.tile_items[(x, y)] = rect_item
 
         self.graphics_view.setScene(self.graphics_scene)
 
+    def tile_brush(self, x, y, cell):
+        """Shared brush for a map tile, with the player's position highlighted."""
+        if (x, y) == (self.game_map.player_x, self.game_map.player_y):
+            return self.player_tile_brush
+        return self.tile_brushes.get(cell, self.default_tile_brush)
+
+    @timed("GameWindow.update_tiles")
+    def update_tiles(self, cells):
+        """Repaint only the given (x, y) tiles after the player moves or a room changes."""
+        if self.graphics_view.game_map is not None:
+            self.graphics_view.invalidate_cells(cells)
+            self.graphics_view.center_on_player()
+            return
+        for x, y in cells:
+            rect_item = self.tile_items.get((x, y))
+            if rect_item is not None:
+                rect_item.setBrush(self.tile_brush(x, y, self.game_map.map_grid[y][x]))
+
     def move_player(self, direction):
         """Move the player using the GameMap's logic."""
         direction_mapping = {
@@ -350,15 +516,19 @@ class GameWindow(QMainWindow):
             "Move West": "left"
         }
 
+        count("GameWindow.moves")
+        previous_position = (self.game_map.player_x, self.game_map.player_y)
         result = self.game_map.move_player(direction_mapping[direction])
 
         if result is None:
             self.interactive_window.append("You can't move in that direction.")
         else:
             self.interactive_window.append(f"You moved to a {result} room.")
-            self.draw_graphical_map()
+            self.update_tiles([previous_position, (self.game_map.player_x, self.game_map.player_y)])
+            self.autosave_move()
             self.check_room_encounter()
 
+    @timed("GameWindow.check_room_encounter")
     def check_room_encounter(self):
         """Check what type of room the player has entered and handle it using trigger_event."""
         x, y = self.game_map.player_x, self.game_map.player_y
@@ -369,22 +539,33 @@ class GameWindow(QMainWindow):
             return
 
         if room_type == "NPC":
-            npc_name = random.choice(["Trader", "QuestGiver"])
+            npc_name = rng.stream("dialogue").choice(["Trader", "QuestGiver"])
             dialogue = interact_with_npc(npc_name)
             self.interactive_window.append(f"{npc_name}: {dialogue}")
+            if self.autosave is not None:
+                self.autosave.rng_changed(rng.counters())  # The NPC and their line were drawn
         else:
-            if not trigger_event(room_type, self.character, self):
+            if not trigger_event(room_type, self.character, self, self.choose_option):
                 self.interactive_window.append("The event failed or no further action was required.")
+            if self.autosave is not None:
+                self.autosave.character_changed(self.character)
+                self.autosave.rng_changed(rng.counters())  # The encounter rolled dice
 
         if room_type in ["Enemy", "Trap", "Puzzle", "Item", "NPC"]:
-            self.game_map.map_grid[y][x] = "Cleared"
+            self.game_map.set_room(x, y, "Cleared")
+            self.update_tiles([(x, y)])
+            if self.autosave is not None:
+                self.autosave.room_changed(x, y, "Cleared")
 
         if room_type == "Objective":
             mission_end_story = get_mission_story(self.current_mission_type, "end")
-            self.interactive_window.append(f"Mission Complete: {mission_end_story}")
-            self.speak(f"Mission Complete: {mission_end_story}")  # Make the voice read out the mission success message
+            self.interactive_window.append(f"{MISSION_COMPLETE_PREFIX}{mission_end_story}")
+            self.speak(f"{MISSION_COMPLETE_PREFIX}{mission_end_story}", PRIORITY_HIGH)  # Make the voice read out the mission success message
             self.update_command_buttons(['Create Character', 'Start Mission', 'Explore', 'Quit'])
 
     def stop_background_music(self):
         """Stop the background music."""
-        pygame.mixer.music.stop()
+        import pygame
+
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop()